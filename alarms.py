@@ -0,0 +1,210 @@
+"""Контроль пределов напряжения: векторная проверка правил над каждой пачкой отсчетов"""
+import os
+import subprocess
+import time
+
+import numpy as np
+
+from recording import ALARMS_SUFFIX
+
+RAISED = "raised"
+CLEARED = "cleared"
+
+
+class AlarmEvent:
+    """Срабатывание или снятие тревоги"""
+
+    def __init__(self, time_val, rule, state, value, message):
+        self.time = time_val
+        self.rule = rule
+        self.state = state
+        self.value = value
+        self.message = message
+
+    def __str__(self):
+        prefix = "ТРЕВОГА" if self.state == RAISED else "Норма"
+        return f"{prefix}: {self.message} (t = {self.time:.2f} с, {self.value:.2f} мВ)"
+
+
+def _latched_state(enter, leave, initial):
+    """Состояние триггера по маскам включения и выключения.
+
+    Для каждого отсчета берется последнее событие (enter -> True,
+    leave -> False) до него включительно, без цикла по отсчетам.
+    """
+    marks = np.where(enter, 1, np.where(leave, 0, -1))
+    positions = np.where(marks >= 0, np.arange(len(marks)), -1)
+    last = np.maximum.accumulate(positions)
+    state = np.where(last >= 0, marks[np.maximum(last, 0)] == 1, initial)
+    return state
+
+
+def _transitions(state, initial):
+    """Индексы, где состояние становится True и где False"""
+    previous = np.concatenate(([initial], state[:-1]))
+    return np.flatnonzero(state & ~previous), np.flatnonzero(~state & previous)
+
+
+class ThresholdRule:
+    """Выход за нижний/верхний предел с гистерезисом на возврат"""
+
+    def __init__(self, name, low=None, high=None, hysteresis=0.0):
+        self.name = name
+        self.low = low
+        self.high = high
+        self.hysteresis = hysteresis
+        self.active_low = False
+        self.active_high = False
+
+    def evaluate(self, times, values):
+        events = []
+        if self.high is not None:
+            state = _latched_state(values > self.high, values < self.high - self.hysteresis, self.active_high)
+            raised, cleared = _transitions(state, self.active_high)
+            events += [(i, RAISED, f"превышен верхний предел {self.high:g} мВ") for i in raised]
+            events += [(i, CLEARED, f"напряжение ниже {self.high - self.hysteresis:g} мВ") for i in cleared]
+            self.active_high = bool(state[-1])
+        if self.low is not None:
+            state = _latched_state(values < self.low, values > self.low + self.hysteresis, self.active_low)
+            raised, cleared = _transitions(state, self.active_low)
+            events += [(i, RAISED, f"напряжение ниже нижнего предела {self.low:g} мВ") for i in raised]
+            events += [(i, CLEARED, f"напряжение выше {self.low + self.hysteresis:g} мВ") for i in cleared]
+            self.active_low = bool(state[-1])
+        return events
+
+
+class RateOfChangeRule:
+    """Скорость изменения напряжения по модулю больше max_rate, мВ/с"""
+
+    def __init__(self, name, max_rate):
+        self.name = name
+        self.max_rate = max_rate
+        self.last_time = None
+        self.last_value = None
+        self.active = False
+
+    def evaluate(self, times, values):
+        # Последний отсчет прошлой пачки связывает производную через границу пачек
+        if self.last_time is None:
+            prev_times = np.concatenate(([times[0]], times[:-1]))
+            prev_values = np.concatenate(([values[0]], values[:-1]))
+        else:
+            prev_times = np.concatenate(([self.last_time], times[:-1]))
+            prev_values = np.concatenate(([self.last_value], values[:-1]))
+        self.last_time = times[-1]
+        self.last_value = values[-1]
+
+        dt = times - prev_times
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = np.where(dt > 0, np.abs(values - prev_values) / dt, 0.0)
+        state = rate > self.max_rate
+        raised, cleared = _transitions(state, self.active)
+        self.active = bool(state[-1])
+        return (
+            [(i, RAISED, f"скорость изменения {rate[i]:.0f} мВ/с больше {self.max_rate:g} мВ/с") for i in raised]
+            + [(i, CLEARED, "скорость изменения в норме") for i in cleared]
+        )
+
+
+class SustainedDeviationRule:
+    """Отклонение от опорного значения больше deviation дольше duration секунд"""
+
+    def __init__(self, name, reference, deviation, duration):
+        self.name = name
+        self.reference = reference
+        self.deviation = deviation
+        self.duration = duration
+        self.run_start = None  # Начало текущего отклонения (может начаться в прошлой пачке)
+        self.active = False
+
+    def evaluate(self, times, values):
+        outside = np.abs(values - self.reference) > self.deviation
+        previous = np.concatenate(([self.run_start is not None], outside[:-1]))
+        starts = outside & ~previous
+        # Время начала текущего отклонения для каждого отсчета
+        start_positions = np.maximum.accumulate(np.where(starts, np.arange(len(values)), -1))
+        carried = self.run_start if self.run_start is not None else np.nan
+        run_start = np.where(start_positions >= 0, times[np.maximum(start_positions, 0)], carried)
+        state = outside & (times - run_start >= self.duration)
+
+        raised, cleared = _transitions(state, self.active)
+        self.active = bool(state[-1])
+        self.run_start = float(run_start[-1]) if outside[-1] else None
+        return (
+            [(i, RAISED, f"отклонение от {self.reference:g} мВ больше {self.deviation:g} мВ "
+                         f"дольше {self.duration:g} с") for i in raised]
+            + [(i, CLEARED, f"напряжение вернулось к {self.reference:g} мВ") for i in cleared]
+        )
+
+
+class AlarmEngine:
+    """Набор правил, проверяемых над каждой пачкой отсчетов"""
+
+    def __init__(self, rules=None, hook_command=""):
+        self.rules = rules or []
+        self.hook_command = hook_command
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+    @classmethod
+    def from_config(cls, config):
+        """Создает правила из словаря настроек (значения None отключают правило)"""
+        rules = []
+        if config.get("low") is not None or config.get("high") is not None:
+            rules.append(ThresholdRule("threshold", config.get("low"), config.get("high"),
+                                       config.get("hysteresis") or 0.0))
+        if config.get("max_rate") is not None:
+            rules.append(RateOfChangeRule("rate", config["max_rate"]))
+        if config.get("deviation") is not None:
+            rules.append(SustainedDeviationRule("deviation", config.get("reference") or 0.0,
+                                                config["deviation"], config.get("duration") or 0.0))
+        return cls(rules, config.get("hook_command") or "")
+
+    def process(self, times, values):
+        """Проверяет пачку и возвращает события в порядке времени"""
+        started = time.perf_counter()
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        events = []
+        if len(times):
+            for rule in self.rules:
+                for i, state, message in rule.evaluate(times, values):
+                    events.append(AlarmEvent(float(times[i]), rule.name, state, float(values[i]), message))
+            events.sort(key=lambda event: event.time)
+        self.last_latency = time.perf_counter() - started
+        self.max_latency = max(self.max_latency, self.last_latency)
+        return events
+
+    def run_hook(self, event):
+        """Запускает внешнюю команду без ожидания ее завершения"""
+        if not self.hook_command:
+            return
+        env = dict(os.environ)
+        env.update({
+            "SV_ALARM_RULE": event.rule,
+            "SV_ALARM_STATE": event.state,
+            "SV_ALARM_TIME": f"{event.time:.3f}",
+            "SV_ALARM_VALUE": f"{event.value:.3f}",
+            "SV_ALARM_MESSAGE": event.message,
+        })
+        subprocess.Popen(self.hook_command, shell=True, env=env)
+
+
+class AlarmLog:
+    """Журнал событий тревог рядом с файлом записи"""
+
+    def __init__(self, csv_path):
+        self.file = open(csv_path + ALARMS_SUFFIX, "w", newline="", encoding="utf-8")
+        self.file.write("time,rule,state,value,message\n")
+        self.file.flush()
+
+    def write(self, events, time_offset=0.0):
+        for event in events:
+            message = event.message.replace('"', "'")
+            self.file.write(
+                f'{event.time - time_offset},{event.rule},{event.state},{event.value},"{message}"\n'
+            )
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
@@ -4,24 +4,40 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
+from matplotlib.widgets import SpanSelector
 import matplotlib
 from PyQt5 import QtWidgets, uic, QtCore
-from PyQt5.QtCore import QIODevice, QTimer
-from PyQt5.QtSerialPort import QSerialPort
+from PyQt5.QtCore import QTimer
 import time
 import serial.tools.list_ports
 import datetime
-import shutil
 import os
 import pandas as pd
 import csv
 import sys
 import pyqtgraph as pg
 import math
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 matplotlib.use('Qt5Agg')
 
-from models import TimeUnits
+from models import TimeUnits, VoltageRange
+import port_probe
+from instrumentation import Instrumentation
+from render_scheduler import RenderScheduler
+import recording
+import stream_server
+import sources
+import export
+import finalize
+import alarms
+import sample_bus
+import calibration
+import catalog
+import events
+from overview import OverviewAggregator
+from sample_store import SampleStore
 
 
 def resource_path(relative_path):
@@ -37,8 +53,37 @@ def resource_path(relative_path):
 class FileViewerWindow(QtWidgets.QDialog):
     """Окно для просмотра файла записи с полным графиком и элементами навигации"""
     
+    LARGE_FILE_SIZE = 100 * 1024 * 1024  # Файлы больше этого размера открываются интервалом, байт
+    LARGE_FILE_SPAN = 600.0  # Длина интервала, открываемого в большом файле, с
+    LARGE_FILE_POINTS = 200000  # Точек в обзоре большого файла, загруженного целиком при наложении
+    MAX_TRACE_POINTS = 4000  # Предел точек на одну кривую при наложении записей
+    ALIGN_MODES = ["Без выравнивания", "По началу", "По триггеру"]
+    EVENT_LABELS = {
+        events.PEAK: "Пик",
+        events.STEP: "Ступенька",
+        events.FLAT: "Залипание",
+        events.DROPOUT: "Пропуск данных",
+    }
+    EVENT_MARGIN = 1.0  # Минимальный запас по краям события при переходе к нему, с
+    FOLLOW_INTERVAL_MS = 500  # Период проверки размера файла в режиме слежения
+    
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.filename = None
+        self.filenames = []  # Файлы, наложенные на общий график
+        self.traces = []  # Загруженные кривые: имя файла, время, напряжение, линия графика
+        self.overlay_xlim_cid = None  # Подписка на изменение масштаба при наложении
+        self.events = None  # Найденные в записи события (массив events.EVENT_DTYPE)
+        self.events_thread = None
+        self.times = np.empty(0)  # Загруженные отсчеты одной записи
+        self.data = np.empty(0)
+        self.data_line = None
+        # Слежение за записью, которая еще идет: дочитываются только новые строки
+        self.follow_tail = None
+        self.follow_count = 0  # Число отсчетов в буферах слежения
+        self.follow_xlim_cid = None
+        self.follow_timer = QTimer(self)
+        self.follow_timer.timeout.connect(self.poll_follow)
         self.setWindowTitle("Просмотр данных")
         # Устанавливаем начальный размер окна
         self.resize(900, 600)
@@ -55,6 +100,9 @@ class FileViewerWindow(QtWidgets.QDialog):
         self.setSizeGripEnabled(True)
         
         self.setup_ui()
+        
+        # Перерисовка при изменении размера объединяется в один кадр
+        self.render_scheduler = RenderScheduler(self.render, self.canvas, parent=self)
     
     def setup_ui(self):
         # Создаем основной layout
@@ -85,6 +133,72 @@ class FileViewerWindow(QtWidgets.QDialog):
         
         layout.addLayout(info_layout)
         
+        # Панель выбора интервала времени: читаются только нужные строки файла
+        range_layout = QtWidgets.QHBoxLayout()
+        self.range_start = QtWidgets.QDoubleSpinBox()
+        self.range_end = QtWidgets.QDoubleSpinBox()
+        for spin_box in (self.range_start, self.range_end):
+            spin_box.setDecimals(2)
+            spin_box.setRange(0, 1e9)
+            spin_box.setSuffix(" с")
+        self.range_button = QtWidgets.QPushButton("Показать интервал")
+        self.range_button.clicked.connect(self.on_range_requested)
+        self.full_range_button = QtWidgets.QPushButton("Весь файл")
+        self.full_range_button.clicked.connect(self.on_full_range_requested)
+        
+        range_layout.addWidget(QtWidgets.QLabel("Интервал с"))
+        range_layout.addWidget(self.range_start)
+        range_layout.addWidget(QtWidgets.QLabel("по"))
+        range_layout.addWidget(self.range_end)
+        range_layout.addWidget(self.range_button)
+        range_layout.addWidget(self.full_range_button)
+        self.follow_checkbox = QtWidgets.QCheckBox("Следить за записью")
+        self.follow_checkbox.toggled.connect(self.on_follow_toggled)
+        range_layout.addWidget(self.follow_checkbox)
+        range_layout.addStretch()
+        
+        layout.addLayout(range_layout)
+        
+        # Панель выравнивания наложенных записей (видна только при нескольких файлах)
+        self.overlay_widget = QtWidgets.QWidget()
+        overlay_layout = QtWidgets.QHBoxLayout()
+        overlay_layout.setContentsMargins(0, 0, 0, 0)
+        self.overlay_widget.setLayout(overlay_layout)
+        self.align_mode = QtWidgets.QComboBox()
+        self.align_mode.addItems(self.ALIGN_MODES)
+        self.align_mode.setCurrentIndex(1)
+        self.align_mode.currentIndexChanged.connect(self.plot_overlay)
+        self.trigger_level = QtWidgets.QDoubleSpinBox()
+        self.trigger_level.setRange(-100000, 100000)
+        self.trigger_level.setSuffix(" мВ")
+        self.trigger_level.valueChanged.connect(self.on_trigger_level_changed)
+        overlay_layout.addWidget(QtWidgets.QLabel("Выравнивание:"))
+        overlay_layout.addWidget(self.align_mode)
+        overlay_layout.addWidget(QtWidgets.QLabel("Уровень триггера:"))
+        overlay_layout.addWidget(self.trigger_level)
+        overlay_layout.addStretch()
+        self.overlay_widget.setVisible(False)
+        
+        layout.addWidget(self.overlay_widget)
+        
+        # Список найденных событий: щелчок открывает окрестность события
+        events_layout = QtWidgets.QHBoxLayout()
+        events_buttons = QtWidgets.QVBoxLayout()
+        self.find_events_button = QtWidgets.QPushButton("Найти события")
+        self.find_events_button.clicked.connect(self.find_events)
+        self.events_progress = QtWidgets.QProgressBar()
+        self.events_progress.setVisible(False)
+        events_buttons.addWidget(self.find_events_button)
+        events_buttons.addWidget(self.events_progress)
+        events_buttons.addStretch()
+        self.events_list = QtWidgets.QListWidget()
+        self.events_list.setMaximumHeight(120)
+        self.events_list.currentRowChanged.connect(self.on_event_selected)
+        events_layout.addLayout(events_buttons)
+        events_layout.addWidget(self.events_list)
+        
+        layout.addLayout(events_layout)
+        
         # Устанавливаем политику размера для canvas, чтобы он растягивался вместе с окном
         self.canvas.setSizePolicy(
             QtWidgets.QSizePolicy.Expanding,
@@ -94,45 +208,373 @@ class FileViewerWindow(QtWidgets.QDialog):
         # Устанавливаем минимальный размер окна
         self.setMinimumSize(600, 400)
     
+    def find_events(self):
+        """Ищет события в открытой записи в фоновом потоке"""
+        if not self.filename or self.events_thread is not None:
+            return
+        self.find_events_button.setEnabled(False)
+        self.events_progress.setValue(0)
+        self.events_progress.setVisible(True)
+        self.events_thread = EventsThread(self.filename, self)
+        self.events_thread.progress.connect(self.events_progress.setValue)
+        self.events_thread.done.connect(self.on_events_found)
+        self.events_thread.start()
+    
+    def on_events_found(self, found, message):
+        self.events_thread = None
+        self.find_events_button.setEnabled(True)
+        self.events_progress.setVisible(False)
+        if found is None:
+            if message:
+                QtWidgets.QMessageBox.warning(self, "Ошибка", message)
+            return
+        self.events = found
+        self.events_list.clear()
+        for kind, start, end, value in found.tolist():
+            label = self.EVENT_LABELS.get(kind, kind)
+            if kind == events.PEAK:
+                text = f"{start:.2f} с - {label}: {value:.2f} мВ"
+            elif kind == events.STEP:
+                text = f"{start:.2f} с - {label}: {value:+.2f} мВ"
+            elif kind == events.FLAT:
+                text = f"{start:.2f}-{end:.2f} с - {label} на {value:.2f} мВ"
+            else:
+                text = f"{start:.2f}-{end:.2f} с - {label} ({value:.2f} с)"
+            self.events_list.addItem(text)
+        if not len(found):
+            self.events_list.addItem("События не найдены")
+    
+    def on_event_selected(self, row):
+        """Загружает окрестность события и выделяет его на графике"""
+        if self.events is None or not 0 <= row < len(self.events):
+            return
+        event = self.events[row]
+        start, end = float(event["start"]), float(event["end"])
+        margin = max(self.EVENT_MARGIN, (end - start) * 0.5)
+        if self.load_data(self.filename, start - margin, end + margin):
+            if end > start:
+                self.ax.axvspan(start, end, color='red', alpha=0.2)
+            else:
+                self.ax.axvline(start, color='red', linestyle='--', linewidth=1)
+            self.canvas.draw()
+    
+    def on_follow_toggled(self, checked):
+        if checked:
+            self.start_follow()
+        else:
+            self.stop_follow()
+    
+    def start_follow(self):
+        """Включает слежение: загружает конец записи и дальше дочитывает новые строки"""
+        if not self.filename:
+            self.follow_checkbox.setChecked(False)
+            return
+        try:
+            # Позиция берется до загрузки, чтобы не пропустить строки, дописанные во время нее
+            rec = recording.open_recording(self.filename)
+            tail = rec.tail()
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Ошибка", f"Не удалось открыть файл: {str(e)}")
+            self.follow_checkbox.setChecked(False)
+            return
+        end_time = rec.end_time
+        if end_time is None or not len(self.times) or self.times[-1] < end_time:
+            t0 = end_time - self.LARGE_FILE_SPAN if end_time is not None and rec.size > self.LARGE_FILE_SIZE else None
+            if end_time is not None and not self.load_data(self.filename, t0):
+                self.follow_checkbox.setChecked(False)
+                return
+        
+        # Буферы с запасом: новые отсчеты дописываются без копирования всего массива
+        self.follow_count = len(self.times)
+        capacity = max(2 * self.follow_count, 4096)
+        times = np.empty(capacity)
+        data = np.empty(capacity)
+        times[:self.follow_count] = self.times
+        data[:self.follow_count] = self.data
+        self.follow_buffers = (times, data)
+        self.times = times[:self.follow_count]
+        self.data = data[:self.follow_count]
+        
+        if self.data_line is None:
+            self.data_line, = self.ax.plot([], [], '-', linewidth=1)
+            self.ax.set_xlabel('Время, с')
+            self.ax.set_ylabel('Напряжение, мВ')
+            self.ax.grid(True)
+        self.follow_tail = tail
+        self.follow_xlim_cid = self.ax.callbacks.connect('xlim_changed', self.on_follow_xlim_changed)
+        self.update_follow_line()
+        self.follow_timer.start(self.FOLLOW_INTERVAL_MS)
+    
+    def stop_follow(self):
+        if self.follow_tail is None:
+            return
+        self.follow_timer.stop()
+        self.follow_tail = None
+        if self.follow_xlim_cid is not None:
+            self.ax.callbacks.disconnect(self.follow_xlim_cid)
+            self.follow_xlim_cid = None
+        if self.follow_checkbox.isChecked():
+            self.follow_checkbox.blockSignals(True)
+            self.follow_checkbox.setChecked(False)
+            self.follow_checkbox.blockSignals(False)
+    
+    def poll_follow(self):
+        """Дочитывает новые строки и дорисовывает их"""
+        try:
+            new = self.follow_tail.poll()
+        except OSError:
+            # Файл переименован или удален (например, запись сохранена под другим именем)
+            self.stop_follow()
+            self.time_info_label.setText("Слежение остановлено: файл недоступен")
+            return
+        if not len(new):
+            return
+        # Строки, успевшие попасть в первоначальную загрузку, пропускаем
+        if self.follow_count:
+            new = new.slice_time(np.nextafter(self.times[-1], np.inf))
+        if not len(new):
+            return
+        
+        times, data = self.follow_buffers
+        needed = self.follow_count + len(new)
+        if needed > len(times):
+            capacity = max(2 * len(times), needed)
+            times = np.resize(times, capacity)
+            data = np.resize(data, capacity)
+            self.follow_buffers = (times, data)
+        previous_last = self.times[-1] if self.follow_count else None
+        times[self.follow_count:needed] = new.times
+        data[self.follow_count:needed] = new.voltages
+        self.follow_count = needed
+        self.times = times[:needed]
+        self.data = data[:needed]
+        
+        # Прокручиваем график, только если был виден конец записи
+        x_min, x_max = self.ax.get_xlim()
+        if previous_last is None or x_max >= previous_last:
+            if previous_last is None or x_min <= self.times[0]:
+                x_min = self.times[0]
+            else:
+                x_min += self.times[-1] - x_max
+            self.ax.set_xlim(x_min, self.times[-1])  # Вызывает перерисовку линии
+        else:
+            self.canvas.draw_idle()
+        
+        self.data_info_label.setText(f"Точек: {self.follow_count}")
+        self.time_info_label.setText(f"Время записи: {self.times[-1]:.1f} с")
+        self.range_end.setValue(self.times[-1])
+    
+    def on_follow_xlim_changed(self, ax):
+        self.update_follow_line()
+    
+    def update_follow_line(self):
+        """Перерисовывает видимый участок с прореживанием и подстраивает ось Y"""
+        if not self.follow_count:
+            return
+        x_min, x_max = self.ax.get_xlim()
+        start = max(np.searchsorted(self.times, x_min) - 1, 0)
+        end = np.searchsorted(self.times, x_max) + 1
+        times, data = recording.decimate_minmax(self.times[start:end], self.data[start:end], self.MAX_TRACE_POINTS)
+        self.data_line.set_data(times, data)
+        if len(data):
+            padding = max((data.max() - data.min()) * 0.1, 10)
+            self.ax.set_ylim(data.min() - padding, data.max() + padding)
+        self.canvas.draw_idle()
+    
+    def closeEvent(self, event):
+        self.stop_follow()
+        if self.events_thread is not None:
+            self.events_thread.cancel_requested = True
+            self.events_thread.wait()
+        super().closeEvent(event)
+    
     def resizeEvent(self, event):
         """Обработчик изменения размера окна"""
         super().resizeEvent(event)
-        # Обновляем график при изменении размера окна
+        # Планируем перерисовку: серия событий изменения размера даст один кадр
+        self.render_scheduler.mark_dirty()
+    
+    def render(self):
+        """Пересчитывает компоновку и перерисовывает график"""
         self.figure.tight_layout()
         self.canvas.draw()
     
-    def load_data(self, filename):
-        """Загружает данные из файла CSV и отображает их на графике"""
+    def on_range_requested(self):
+        """Загружает выбранный интервал времени"""
+        if len(self.filenames) > 1:
+            self.load_files(self.filenames, self.range_start.value(), self.range_end.value())
+        elif self.filename:
+            self.load_data(self.filename, self.range_start.value(), self.range_end.value())
+    
+    def on_full_range_requested(self):
+        """Загружает файл целиком"""
+        if len(self.filenames) > 1:
+            self.load_files(self.filenames, full=True)
+        elif self.filename:
+            self.load_data(self.filename, full=True)
+    
+    def on_trigger_level_changed(self, value):
+        """Перестраивает наложение, если выбрано выравнивание по триггеру"""
+        if self.align_mode.currentIndex() == 2:
+            self.plot_overlay()
+    
+    def load_files(self, filenames, t0=None, t1=None, full=False):
+        """Загружает несколько записей параллельно и накладывает их на общий график.
+        
+        Большие файлы без указанного интервала, как и в load_data, открываются
+        с начала на LARGE_FILE_SPAN секунд, а с full - прореженным обзором.
+        """
+        self.stop_follow()
         try:
-            # Загружаем данные из CSV
-            data = []
-            times = []
+            self.filenames = list(filenames)
+            self.filename = None
+            self.events = None
+            self.events_list.clear()
+            self.find_events_button.setEnabled(False)  # События ищутся в одной записи
             
-            with open(filename, 'r') as f:
-                # Пропускаем заголовок
-                header = next(f)
-                
-                # Читаем данные
-                reader = csv.reader(f)
-                for row in reader:
-                    if len(row) >= 2:
-                        try:
-                            time_val = float(row[0])
-                            voltage = float(row[1])
-                            times.append(time_val)
-                            data.append(voltage)
-                        except (ValueError, IndexError):
-                            pass
-            
-            if not times or not data:
-                QtWidgets.QMessageBox.warning(self, "Ошибка", "Файл не содержит данных или имеет неверный формат")
+            # Каждый файл разбирается в отдельном процессе, время загрузки
+            # определяется числом ядер, а не суммарным размером файлов
+            workers = min(len(self.filenames), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [self.submit_load(executor, name, t0, t1, full) for name in self.filenames]
+                while not all(future.done() for future in futures):
+                    QtWidgets.QApplication.processEvents()
+                    time.sleep(0.01)
+                results = [future.result() for future in futures]
+            
+            self.traces = [
+                {"name": name, "times": times, "data": data, "line": None}
+                for name, times, data in results if len(times)
+            ]
+            if not self.traces:
+                QtWidgets.QMessageBox.warning(self, "Ошибка", "Файлы не содержат данных в выбранном интервале")
+                return False
+            
+            self.overlay_widget.setVisible(True)
+            self.plot_overlay()
+            
+            # Обновляем информационные метки
+            total_points = sum(len(trace["times"]) for trace in self.traces)
+            self.file_info_label.setText(f"Файлов: {len(self.traces)}")
+            self.data_info_label.setText(f"Точек: {total_points}")
+            longest = max(trace["times"][-1] - trace["times"][0] for trace in self.traces)
+            self.time_info_label.setText(f"Самая длинная запись: {longest:.1f} с")
+            return True
+        
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить файлы: {str(e)}")
+            return False
+    
+    def submit_load(self, executor, filename, t0, t1, full):
+        """Ставит в пул чтение одной записи для наложения"""
+        if t0 is None and t1 is None and os.path.getsize(filename) > self.LARGE_FILE_SIZE:
+            # Целиком большой файл в память (и через pickle обратно) не передаем
+            if full:
+                return executor.submit(recording.load_decimated, filename, self.LARGE_FILE_POINTS)
+            t0, t1 = 0.0, self.LARGE_FILE_SPAN
+        return executor.submit(
+            recording.load_recording, filename,
+            -np.inf if t0 is None else t0, np.inf if t1 is None else t1
+        )
+    
+    def trace_offset(self, trace):
+        """Сдвиг времени кривой для выбранного режима выравнивания"""
+        mode = self.align_mode.currentIndex()
+        if mode == 1:
+            return trace["times"][0]
+        if mode == 2:
+            trigger = recording.trigger_time(trace["times"], trace["data"], self.trigger_level.value())
+            # Если уровень не достигнут, выравниваем такую запись по началу
+            return trigger if trigger is not None else trace["times"][0]
+        return 0.0
+    
+    def plot_overlay(self):
+        """Строит наложенные кривые с прореживанием каждой из них"""
+        if not self.traces:
+            return
+        if self.overlay_xlim_cid is not None:
+            self.ax.callbacks.disconnect(self.overlay_xlim_cid)
+        self.ax.clear()
+        self.times, self.data, self.data_line = np.empty(0), np.empty(0), None
+        for trace in self.traces:
+            trace["offset"] = self.trace_offset(trace)
+            times, data = recording.decimate_minmax(trace["times"], trace["data"], self.MAX_TRACE_POINTS)
+            trace["line"], = self.ax.plot(
+                times - trace["offset"], data, '-', linewidth=1, label=os.path.basename(trace["name"])
+            )
+        
+        self.ax.set_xlabel('Время, с')
+        self.ax.set_ylabel('Напряжение, мВ')
+        self.ax.grid(True)
+        self.ax.legend(loc='upper right', fontsize='small')
+        self.ax.set_title(f'Наложение записей ({len(self.traces)})')
+        self.ax.relim()
+        self.ax.autoscale_view()
+        # При масштабировании заново прореживаем видимую часть каждой кривой
+        self.overlay_xlim_cid = self.ax.callbacks.connect('xlim_changed', self.on_overlay_xlim_changed)
+        self.canvas.draw()
+    
+    def on_overlay_xlim_changed(self, ax):
+        """Прореживает только видимый участок кривых, чтобы при увеличении были видны детали"""
+        if not self.traces:
+            return
+        x_min, x_max = ax.get_xlim()
+        for trace in self.traces:
+            times = trace["times"]
+            offset = trace["offset"]
+            start = max(np.searchsorted(times, x_min + offset) - 1, 0)
+            end = np.searchsorted(times, x_max + offset) + 1
+            visible_times, visible_data = recording.decimate_minmax(
+                times[start:end], trace["data"][start:end], self.MAX_TRACE_POINTS
+            )
+            trace["line"].set_data(visible_times - offset, visible_data)
+        self.canvas.draw_idle()
+    
+    def load_data(self, filename, t0=None, t1=None, full=False):
+        """Загружает данные из файла CSV и отображает их на графике.
+        
+        Если задан интервал [t0, t1], по индексу смещений читаются только его строки.
+        Большие файлы без указанного интервала открываются с начала, на LARGE_FILE_SPAN секунд,
+        а с full - прореженным обзором, как в load_files.
+        """
+        self.stop_follow()
+        try:
+            if filename != self.filename:
+                self.events = None
+                self.events_list.clear()
+            self.filename = filename
+            self.filenames = [filename]
+            self.find_events_button.setEnabled(self.events_thread is None)
+            self.traces = []
+            self.overlay_widget.setVisible(False)
+            rec = recording.open_recording(filename)
+            duration = rec.end_time or 0.0
+            
+            overview = False
+            if t0 is None and t1 is None and rec.size > self.LARGE_FILE_SIZE:
+                if full:
+                    # Весь большой файл в память не читаем: потоковое прореживание с сохранением пиков
+                    overview = True
+                else:
+                    t0, t1 = 0.0, self.LARGE_FILE_SPAN
+            
+            if overview:
+                _, times, data = recording.load_decimated(filename, self.LARGE_FILE_POINTS)
+            else:
+                # Загружаем данные из CSV (по индексу читаются только строки интервала)
+                part = rec.slice_time(-np.inf if t0 is None else t0, np.inf if t1 is None else t1)
+                times, data = part.times, part.voltages
+            
+            if not len(times):
+                QtWidgets.QMessageBox.warning(self, "Ошибка", "Файл не содержит данных в выбранном интервале или имеет неверный формат")
                 return False
             
             # Очищаем график
             self.ax.clear()
             
             # Строим график
-            self.ax.plot(times, data, '-', linewidth=1)
+            self.times, self.data = times, data
+            self.data_line, = self.ax.plot(times, data, '-', linewidth=1)
             
             # Настраиваем оси
             self.ax.set_xlabel('Время, с')
@@ -140,11 +582,11 @@ class FileViewerWindow(QtWidgets.QDialog):
             self.ax.grid(True)
             
             # Масштабируем график, чтобы видеть все данные
-            self.ax.set_xlim(min(times), max(times))
+            self.ax.set_xlim(times[0], times[-1])
             
             if len(data) > 1:
-                min_voltage = min(data)
-                max_voltage = max(data)
+                min_voltage = data.min()
+                max_voltage = data.max()
                 padding = (max_voltage - min_voltage) * 0.1
                 if padding < 10:
                     padding = 10
@@ -155,11 +597,12 @@ class FileViewerWindow(QtWidgets.QDialog):
             
             # Обновляем информационные метки
             self.file_info_label.setText(f"Файл: {os.path.basename(filename)}")
-            self.data_info_label.setText(f"Точек: {len(data)}")
+            self.data_info_label.setText(f"Точек: {len(data)}" + (" (прореженный обзор)" if overview else ""))
+            self.time_info_label.setText(f"Время записи: {duration:.1f} с")
             
-            if times:
-                duration = max(times)
-                self.time_info_label.setText(f"Время записи: {duration:.1f} с")
+            # Показываем загруженный интервал в полях выбора
+            self.range_start.setValue(times[0])
+            self.range_end.setValue(times[-1])
             
             # Обновляем canvas
             self.canvas.draw()
@@ -171,6 +614,410 @@ class FileViewerWindow(QtWidgets.QDialog):
             return False
 
 
+class StatsWindow(QtWidgets.QDialog):
+    """Панель метрик горячего пути: таймеры стадий, очереди, потери отсчетов"""
+    
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle("Статистика производительности")
+        self.resize(600, 450)
+        
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+        
+        # Управление сбором метрик
+        self.enabled_checkbox = QtWidgets.QCheckBox("Включить инструментирование")
+        self.enabled_checkbox.setChecked(app.instrumentation.enabled)
+        self.enabled_checkbox.stateChanged.connect(self.on_enabled_changed)
+        layout.addWidget(self.enabled_checkbox)
+        
+        json_layout = QtWidgets.QHBoxLayout()
+        self.json_checkbox = QtWidgets.QCheckBox("Сохранять в JSON каждые")
+        self.json_checkbox.setChecked(bool(app.stats_json_path))
+        self.json_checkbox.stateChanged.connect(self.on_json_changed)
+        self.json_interval = QtWidgets.QSpinBox()
+        self.json_interval.setRange(1, 3600)
+        self.json_interval.setSuffix(" с")
+        self.json_interval.setValue(app.stats_json_interval)
+        self.json_interval.valueChanged.connect(self.on_json_interval_changed)
+        self.json_path_label = QtWidgets.QLabel(app.stats_json_path or "")
+        json_layout.addWidget(self.json_checkbox)
+        json_layout.addWidget(self.json_interval)
+        json_layout.addWidget(self.json_path_label, 1)
+        layout.addLayout(json_layout)
+        
+        # Текстовое представление метрик
+        self.stats_text = QtWidgets.QPlainTextEdit()
+        self.stats_text.setReadOnly(True)
+        layout.addWidget(self.stats_text)
+        
+        reset_button = QtWidgets.QPushButton("Сбросить")
+        reset_button.clicked.connect(self.on_reset)
+        layout.addWidget(reset_button)
+        
+        # Обновляем панель раз в секунду, пока она открыта
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(1000)
+        self.refresh()
+    
+    def refresh(self):
+        """Обновляет текст метрик"""
+        if self.app.instrumentation.enabled:
+            text = self.app.instrumentation.format_text()
+        else:
+            text = "Инструментирование выключено"
+        if self.app.stream_server is not None:
+            stats = self.app.stream_server.stats()
+            text += (
+                f"\nТрансляция: клиентов {stats['clients']}, отправлено кадров {stats['frames_sent']}, "
+                f"вытеснено {stats['frames_dropped']}, задержка публикации: средняя "
+                f"{stats['latency_mean_ms']:.3f} мс, макс. {stats['latency_max_ms']:.3f} мс"
+            )
+        self.stats_text.setPlainText(text)
+    
+    def on_enabled_changed(self, state):
+        self.app.instrumentation.enabled = state == QtCore.Qt.Checked
+        self.refresh()
+    
+    def on_json_changed(self, state):
+        """Включает периодическое сохранение метрик в JSON"""
+        if state == QtCore.Qt.Checked:
+            filename, _ = QtWidgets.QFileDialog.getSaveFileName(
+                self,
+                "Файл для сохранения метрик",
+                "stats.json",
+                "JSON Files (*.json);;All Files (*)"
+            )
+            if not filename:
+                self.json_checkbox.setChecked(False)
+                return
+            self.app.stats_json_path = filename
+        else:
+            self.app.stats_json_path = ""
+        self.json_path_label.setText(self.app.stats_json_path)
+    
+    def on_json_interval_changed(self, value):
+        self.app.stats_json_interval = value
+    
+    def on_reset(self):
+        self.app.instrumentation.reset()
+        if self.app.alarm_engine is not None:
+            self.app.alarm_engine.max_latency = 0.0
+        self.refresh()
+
+
+class ExportThread(QtCore.QThread):
+    """Фоновый экспорт записи с сообщением о прогрессе"""
+    
+    progress = QtCore.pyqtSignal(int)
+    done = QtCore.pyqtSignal(bool, str)
+    
+    def __init__(self, src, dst, rate=None, parent=None):
+        super().__init__(parent)
+        self.src = src
+        self.dst = dst
+        self.rate = rate
+        self.cancel_requested = False
+    
+    def run(self):
+        try:
+            count = export.export_recording(
+                self.src,
+                self.dst,
+                rate=self.rate,
+                progress=lambda fraction: self.progress.emit(int(fraction * 100)),
+                cancelled=lambda: self.cancel_requested
+            )
+            self.done.emit(True, f"Экспортировано {count} отсчетов в {self.dst}")
+        except export.ExportCancelled:
+            self.done.emit(False, "Экспорт отменен")
+        except Exception as e:
+            self.done.emit(False, f"Ошибка при экспорте: {str(e)}")
+
+
+class EventsThread(QtCore.QThread):
+    """Фоновый поиск событий в записи (или чтение их из кэша)"""
+    
+    progress = QtCore.pyqtSignal(int)
+    done = QtCore.pyqtSignal(object, str)
+    
+    def __init__(self, csv_path, parent=None):
+        super().__init__(parent)
+        self.csv_path = csv_path
+        self.cancel_requested = False
+    
+    def run(self):
+        try:
+            found = events.find_events(
+                self.csv_path,
+                progress=lambda fraction: self.progress.emit(int(fraction * 100)),
+                cancelled=lambda: self.cancel_requested
+            )
+            self.done.emit(found, "" if found is not None else "Поиск событий отменен")
+        except Exception as e:
+            self.done.emit(None, f"Ошибка при поиске событий: {str(e)}")
+
+
+class CopyThread(QtCore.QThread):
+    """Фоновое копирование записи на другую файловую систему, где переименование невозможно"""
+    
+    progress = QtCore.pyqtSignal(int)
+    done = QtCore.pyqtSignal(bool, str)
+    
+    def __init__(self, src, dst, parent=None):
+        super().__init__(parent)
+        self.src = src
+        self.dst = dst
+    
+    def run(self):
+        try:
+            finalize.copy_recording(
+                self.src,
+                self.dst,
+                progress=lambda fraction: self.progress.emit(int(fraction * 100))
+            )
+            self.done.emit(True, "")
+        except Exception as e:
+            self.done.emit(False, f"Ошибка при сохранении файла: {str(e)}")
+
+
+class RescanThread(QtCore.QThread):
+    """Фоновое обновление каталога записей (у потока свое соединение с базой)"""
+    
+    progress = QtCore.pyqtSignal(int)
+    done = QtCore.pyqtSignal(bool, str)
+    
+    def __init__(self, db_path, directories, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.directories = directories
+        self.cancel_requested = False
+    
+    def run(self):
+        try:
+            thread_catalog = catalog.RecordingCatalog(self.db_path)
+            try:
+                count = thread_catalog.rescan(
+                    self.directories,
+                    progress=lambda fraction: self.progress.emit(int(fraction * 100)),
+                    cancelled=lambda: self.cancel_requested
+                )
+            finally:
+                thread_catalog.close()
+            self.done.emit(True, f"Каталог обновлен, просканировано файлов: {count}")
+        except Exception as e:
+            self.done.emit(False, f"Ошибка при обновлении каталога: {str(e)}")
+
+
+class CatalogDialog(QtWidgets.QDialog):
+    """Просмотр и поиск записей по каталогу без чтения самих файлов"""
+    
+    HEADERS = ["Файл", "Порт", "Начало", "Длительность, с", "Точек", "Мин, мВ", "Макс, мВ", "Среднее, мВ", "Разрывов"]
+    
+    def __init__(self, app, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.rows = []
+        self.setWindowTitle("Каталог записей")
+        self.resize(1000, 600)
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+        
+        filters = QtWidgets.QGridLayout()
+        self.text_edit = QtWidgets.QLineEdit()
+        self.text_edit.setPlaceholderText("Часть имени файла или порта")
+        filters.addWidget(QtWidgets.QLabel("Поиск:"), 0, 0)
+        filters.addWidget(self.text_edit, 0, 1, 1, 3)
+        
+        today = QtCore.QDate.currentDate()
+        self.since_check = QtWidgets.QCheckBox("С")
+        self.since_edit = QtWidgets.QDateEdit(today.addDays(-7))
+        self.until_check = QtWidgets.QCheckBox("По")
+        self.until_edit = QtWidgets.QDateEdit(today)
+        for edit in (self.since_edit, self.until_edit):
+            edit.setCalendarPopup(True)
+        filters.addWidget(self.since_check, 1, 0)
+        filters.addWidget(self.since_edit, 1, 1)
+        filters.addWidget(self.until_check, 1, 2)
+        filters.addWidget(self.until_edit, 1, 3)
+        
+        self.below_check = QtWidgets.QCheckBox("Минимум ниже, мВ")
+        self.below_value = QtWidgets.QDoubleSpinBox()
+        self.above_check = QtWidgets.QCheckBox("Максимум выше, мВ")
+        self.above_value = QtWidgets.QDoubleSpinBox()
+        for spin_box in (self.below_value, self.above_value):
+            spin_box.setRange(-100000, 100000)
+            spin_box.setDecimals(2)
+        filters.addWidget(self.below_check, 2, 0)
+        filters.addWidget(self.below_value, 2, 1)
+        filters.addWidget(self.above_check, 2, 2)
+        filters.addWidget(self.above_value, 2, 3)
+        layout.addLayout(filters)
+        
+        self.table = QtWidgets.QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.doubleClicked.connect(self.open_selected)
+        layout.addWidget(self.table)
+        
+        buttons = QtWidgets.QHBoxLayout()
+        self.count_label = QtWidgets.QLabel()
+        buttons.addWidget(self.count_label)
+        buttons.addStretch()
+        self.rescan_button = QtWidgets.QPushButton("Пересканировать")
+        self.rescan_button.clicked.connect(self.rescan)
+        buttons.addWidget(self.rescan_button)
+        open_button = QtWidgets.QPushButton("Открыть")
+        open_button.clicked.connect(self.open_selected)
+        buttons.addWidget(open_button)
+        close_button = QtWidgets.QPushButton("Закрыть")
+        close_button.clicked.connect(self.close)
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+        
+        # Запросы идут только к базе, поэтому фильтр применяется сразу
+        self.text_edit.textChanged.connect(self.refresh)
+        for checkbox in (self.since_check, self.until_check, self.below_check, self.above_check):
+            checkbox.stateChanged.connect(self.refresh)
+        for edit in (self.since_edit, self.until_edit):
+            edit.dateChanged.connect(self.refresh)
+        for spin_box in (self.below_value, self.above_value):
+            spin_box.valueChanged.connect(self.refresh)
+        
+        self.refresh()
+    
+    def refresh(self):
+        since = until = None
+        if self.since_check.isChecked():
+            since = QtCore.QDateTime(self.since_edit.date()).toSecsSinceEpoch()
+        if self.until_check.isChecked():
+            until = QtCore.QDateTime(self.until_edit.date().addDays(1)).toSecsSinceEpoch()
+        self.rows = self.app.catalog.search(
+            text=self.text_edit.text().strip(),
+            since=since,
+            until=until,
+            min_below=self.below_value.value() if self.below_check.isChecked() else None,
+            max_above=self.above_value.value() if self.above_check.isChecked() else None
+        )
+        
+        self.table.setRowCount(len(self.rows))
+        for i, row in enumerate(self.rows):
+            start = datetime.datetime.fromtimestamp(row["start_time"]) if row["start_time"] is not None else None
+            duration = row["end_time"] - row["start_time"] if start is not None else None
+            values = [
+                os.path.basename(row["path"]),
+                row["port"] or "",
+                start.strftime("%d.%m.%Y %H:%M:%S") if start is not None else "",
+                f"{duration:.1f}" if duration is not None else "",
+                str(row["sample_count"]),
+                f"{row['min_voltage']:.2f}" if row["min_voltage"] is not None else "",
+                f"{row['max_voltage']:.2f}" if row["max_voltage"] is not None else "",
+                f"{row['mean_voltage']:.2f}" if row["mean_voltage"] is not None else "",
+                str(row["gap_count"]),
+            ]
+            for j, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(value)
+                if j == 0:
+                    item.setToolTip(row["path"])
+                self.table.setItem(i, j, item)
+        self.table.resizeColumnsToContents()
+        self.count_label.setText(f"Найдено записей: {len(self.rows)}")
+    
+    def open_selected(self):
+        selected = self.table.selectionModel().selectedRows()
+        if not selected:
+            return
+        path = self.rows[selected[0].row()]["path"]
+        viewer = FileViewerWindow(self)
+        if viewer.load_data(path):
+            viewer.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+            viewer.show()
+    
+    def rescan(self):
+        """Обновляет каталог по папке для записей и уже известным файлам"""
+        progress_dialog = QtWidgets.QProgressDialog("Сканирование записей...", "Отмена", 0, 100, self)
+        progress_dialog.setWindowTitle("Каталог")
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setAutoReset(False)
+        
+        self.rescan_button.setEnabled(False)
+        self.rescan_thread = RescanThread(self.app.catalog.db_path, [self.app.recordings_dir()], self)
+        self.rescan_thread.progress.connect(progress_dialog.setValue)
+        progress_dialog.canceled.connect(lambda: setattr(self.rescan_thread, "cancel_requested", True))
+        
+        def on_done(success, message):
+            progress_dialog.close()
+            self.rescan_button.setEnabled(True)
+            self.app.ui.console.appendPlainText(message)
+            self.refresh()
+        
+        self.rescan_thread.done.connect(on_done)
+        self.rescan_thread.start()
+        progress_dialog.show()
+
+
+class AlarmSettingsDialog(QtWidgets.QDialog):
+    """Настройка правил контроля пределов напряжения"""
+    
+    # Ключ настройки, подпись и пределы поля
+    FIELDS = [
+        ("low", "Нижний предел, мВ", -100000, 100000),
+        ("high", "Верхний предел, мВ", -100000, 100000),
+        ("hysteresis", "Гистерезис, мВ", 0, 100000),
+        ("max_rate", "Макс. скорость изменения, мВ/с", 0, 10000000),
+        ("reference", "Опорное значение, мВ", -100000, 100000),
+        ("deviation", "Допустимое отклонение, мВ", 0, 100000),
+        ("duration", "Длительность отклонения, с", 0, 86400),
+    ]
+    # Поля, которые включаются флажком (остальные - параметры этих правил)
+    OPTIONAL_FIELDS = ("low", "high", "max_rate", "deviation")
+    
+    def __init__(self, config, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Контроль пределов")
+        layout = QtWidgets.QFormLayout()
+        self.setLayout(layout)
+        
+        self.checkboxes = {}
+        self.spin_boxes = {}
+        for key, label, minimum, maximum in self.FIELDS:
+            spin_box = QtWidgets.QDoubleSpinBox()
+            spin_box.setRange(minimum, maximum)
+            spin_box.setDecimals(2)
+            spin_box.setValue(config.get(key) or 0.0)
+            self.spin_boxes[key] = spin_box
+            if key in self.OPTIONAL_FIELDS:
+                checkbox = QtWidgets.QCheckBox(label)
+                checkbox.setChecked(config.get(key) is not None)
+                self.checkboxes[key] = checkbox
+                layout.addRow(checkbox, spin_box)
+            else:
+                layout.addRow(label, spin_box)
+        
+        self.hook_command = QtWidgets.QLineEdit(config.get("hook_command") or "")
+        self.hook_command.setPlaceholderText("Команда при срабатывании (переменные SV_ALARM_*)")
+        layout.addRow("Команда", self.hook_command)
+        
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+    
+    def get_config(self):
+        """Возвращает настройки; у выключенных правил значение None"""
+        config = {}
+        for key, _, _, _ in self.FIELDS:
+            enabled = key not in self.checkboxes or self.checkboxes[key].isChecked()
+            config[key] = self.spin_boxes[key].value() if enabled else None
+        config["hook_command"] = self.hook_command.text().strip()
+        return config
+
+
 class ComSelectorDialog(QtWidgets.QDialog):
     """Диалог для ручного выбора COM порта"""
     
@@ -200,19 +1047,159 @@ class ComSelectorDialog(QtWidgets.QDialog):
         return self.ui.comL.currentText()
 
 
+class LivePlotPanel:
+    """Скользящее окно над общим хранилищем отсчетов со своими настройками.
+
+    Панель не хранит отсчеты: при отрисовке берет окно из хранилища как
+    представление массивов и прореживает его до max_points точек.
+    """
+    
+    DEFAULT_MAX_POINTS = 4000
+    
+    def __init__(self, ax, store, window_size=5.0, max_points=DEFAULT_MAX_POINTS):
+        self.ax = ax
+        self.store = store
+        self.window_size = window_size
+        self.y_range = None  # Фиксированный диапазон оси Y (min, max); None - динамически
+        self.max_points = max_points
+        self.rendered_state = None  # Версия хранилища и настройки, по которым построен кадр
+        self.line, = self.ax.plot([], [], 'b-')
+        self.ax.set_xlabel('Время, с')
+        self.ax.set_ylabel('Напряжение, мВ')
+        self.ax.grid(True)
+    
+    def render(self):
+        """Обновляет линию по текущему окну (без перерисовки холста).
+        
+        Возвращает False, если с прошлого кадра не изменились ни отсчеты, ни
+        настройки панели, и холст можно не перерисовывать.
+        """
+        state = (self.store.version, self.window_size, self.y_range, self.max_points)
+        if state == self.rendered_state:
+            return False
+        self.rendered_state = state
+        
+        times, voltages = self.store.window(self.window_size)
+        if not len(times):
+            self.line.set_data([], [])
+            return True
+        
+        current_time = times[-1]
+        min_time = max(0, current_time - self.window_size)
+        self.line.set_data(*recording.decimate_minmax(times, voltages, self.max_points))
+        self.ax.set_xlim(min_time, current_time)
+        
+        if self.y_range is None:
+            if len(voltages) > 1:
+                min_voltage = voltages.min()
+                max_voltage = voltages.max()
+                padding = max((max_voltage - min_voltage) * 0.1, 10)  # 10% отступ, не меньше 10 мВ
+                self.ax.set_ylim(min_voltage - padding, max_voltage + padding)
+        else:
+            self.ax.set_ylim(*self.y_range)
+        
+        if self.store.is_truncated(self.window_size):
+            # Окно длиннее, чем помещается в хранилище: показываем, сколько есть на самом деле
+            self.ax.set_title(
+                f'Последние {current_time - times[0]:.0f} из {self.window_size:g} секунд: '
+                f'в памяти не больше {self.store.max_samples} точек',
+                color='tab:red'
+            )
+        else:
+            self.ax.set_title(f'Последние {self.window_size:g} секунд ({len(times)} точек)', color='black')
+        return True
+
+
+class LivePlotWindow(QtWidgets.QDialog):
+    """Дополнительный живой график со своими окном, диапазоном оси Y и прореживанием"""
+    
+    Y_MODES = ["Динамически", "Настроить"]
+    
+    def __init__(self, app, title, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.setWindowTitle(title)
+        self.resize(700, 400)
+        self.setWindowFlags(
+            QtCore.Qt.Window |
+            QtCore.Qt.WindowMinimizeButtonHint |
+            QtCore.Qt.WindowMaximizeButtonHint |
+            QtCore.Qt.WindowCloseButtonHint
+        )
+        layout = QtWidgets.QVBoxLayout()
+        self.setLayout(layout)
+        
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.panel = LivePlotPanel(self.figure.add_subplot(111), app.sample_store, window_size=60.0)
+        layout.addWidget(self.canvas)
+        
+        controls = QtWidgets.QHBoxLayout()
+        self.window_size = QtWidgets.QDoubleSpinBox()
+        self.window_size.setRange(0.1, 86400)
+        self.window_size.setSuffix(" с")
+        self.window_size.setValue(self.panel.window_size)
+        self.y_mode = QtWidgets.QComboBox()
+        self.y_mode.addItems(self.Y_MODES)
+        self.y_min = QtWidgets.QSpinBox()
+        self.y_max = QtWidgets.QSpinBox()
+        for spin_box, value in ((self.y_min, 0), (self.y_max, 5000)):
+            spin_box.setRange(-100000, 100000)
+            spin_box.setValue(value)
+            spin_box.setEnabled(False)
+        self.max_points = QtWidgets.QSpinBox()
+        self.max_points.setRange(100, 1000000)
+        self.max_points.setValue(self.panel.max_points)
+        
+        controls.addWidget(QtWidgets.QLabel("Окно:"))
+        controls.addWidget(self.window_size)
+        controls.addWidget(QtWidgets.QLabel("Ось Y:"))
+        controls.addWidget(self.y_mode)
+        controls.addWidget(QtWidgets.QLabel("от"))
+        controls.addWidget(self.y_min)
+        controls.addWidget(QtWidgets.QLabel("до"))
+        controls.addWidget(self.y_max)
+        controls.addWidget(QtWidgets.QLabel("Точек на графике:"))
+        controls.addWidget(self.max_points)
+        controls.addStretch()
+        layout.addLayout(controls)
+        
+        self.window_size.valueChanged.connect(self.on_settings_changed)
+        self.y_mode.currentIndexChanged.connect(self.on_settings_changed)
+        self.y_min.valueChanged.connect(self.on_settings_changed)
+        self.y_max.valueChanged.connect(self.on_settings_changed)
+        self.max_points.valueChanged.connect(self.on_settings_changed)
+        
+        self.render_scheduler = RenderScheduler(self.render, self.canvas, parent=self)
+        self.render_scheduler.mark_dirty()
+    
+    def on_settings_changed(self):
+        is_dynamic = self.y_mode.currentIndex() == 0
+        self.y_min.setEnabled(not is_dynamic)
+        self.y_max.setEnabled(not is_dynamic)
+        self.panel.window_size = self.window_size.value()
+        self.panel.y_range = None if is_dynamic else (self.y_min.value(), self.y_max.value())
+        self.panel.max_points = self.max_points.value()
+        self.render_scheduler.mark_dirty()
+    
+    def render(self):
+        if not self.panel.render():
+            return
+        started = time.perf_counter()
+        self.canvas.draw()
+        self.app.instrumentation.add_frame(time.perf_counter() - started)
+
+
 class SerialVoltmeterApp(QtWidgets.QApplication):
     def __init__(self, argv: typing.List[str]):
         super().__init__(argv)
         self.file = None
         self.recording = False
-        self.data = []
-        self.times = []
         self.start_time = None  # время начала в миллисекундах Arduino
         self.system_start_time = None  # системное время начала записи
         self.last_update_time = 0
-        self.buffered_data = []  # Буфер для данных
-        self.update_interval = 100  # Интервал обновления графика в мс
-        self.window_size = 5.0  # Размер окна графика в секундах
+        self.sample_store = SampleStore()  # Отсчеты сессии, общие для всех живых графиков
+        self.live_windows = []  # Дополнительные окна живых графиков
         self.backup_filename = ""
         self.received_data_count = 0  # Счетчик полученных данных
         self.saved_data_count = 0    # Счетчик сохраненных данных
@@ -220,6 +1207,23 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
         self.timed_recording = False # Флаг записи по времени
         self.show_current_values = True  # Флаг отображения текущих значений
         self.measurement_counter = 0  # Счетчик измерений для пропуска
+        self.instrumentation = Instrumentation()  # Метрики горячего пути (по умолчанию выключены)
+        self.stats_json_path = ""  # Файл для периодического сохранения метрик
+        self.stats_json_interval = 5  # Период сохранения метрик, с
+        self.last_stats_dump = 0
+        self.stats_window = None
+        self.export_thread = None
+        self.copy_threads = []  # Фоновые копирования записей (их может идти несколько)
+        self.stream_server = None  # Трансляция отсчетов внешним потребителям
+        self.overview = OverviewAggregator()  # Агрегаты всей сессии для обзорного графика
+        self.overview_filename = ""  # Файл, из которого открываются участки обзора
+        self.recording_destination = ""  # Итоговое имя записи, выбранное до или во время записи
+        self.alarm_engine = None  # Контроль пределов (None - правила не заданы)
+        self.alarm_log = None  # Журнал тревог рядом с текущей записью
+        self.sample_bus = None  # Кольцевой буфер в разделяемой памяти для других процессов
+        self.gap_counter = catalog.GapCounter()  # Разрывы в текущей записи (для каталога)
+        self.device_id = calibration.DEFAULT_DEVICE  # Идентификатор подключенного прибора
+        self.calibration = None  # Поправка для текущего прибора и диапазона (None - без калибровки)
         
         self.ui = uic.loadUi(resource_path("mainForm.ui"))
         self.ui.setWindowTitle("Serial Voltmeter")
@@ -240,26 +1244,45 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
             self.ui.exit.triggered.connect(self.exit)
             self.ui.file.addAction(self.ui.exit)
         
-        self.serial = QSerialPort()
-        self.serial.setBaudRate(115200)
+        # Постоянные настройки приложения (кэш последнего прибора и т.п.)
+        self.settings = QtCore.QSettings("pas-zhukov", "SerialVoltmeter")
+        self.calibration_store = calibration.CalibrationStore(os.path.join(
+            QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.AppDataLocation),
+            "calibration"
+        ))
+        # Каталог записей со сводками для быстрого поиска
+        self.catalog = catalog.RecordingCatalog(os.path.join(
+            QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.AppDataLocation),
+            "catalog.sqlite3"
+        ))
 
-        # Настройка графика
+        # Источник данных: прибор на последовательном порту или воспроизведение записи
+        self.source = None
+
+        # Настройка графика: сверху скользящее окно, снизу обзор всей сессии
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
-        self.ax = self.figure.add_subplot(111)
-        self.ax.set_xlabel('Время, с')
-        self.ax.set_ylabel('Напряжение, мВ')
-        self.ax.grid(True)
+        grid = self.figure.add_gridspec(2, 1, height_ratios=[4, 1], hspace=0.45)
+        self.ax = self.figure.add_subplot(grid[0])
+        self.live_panel = LivePlotPanel(self.ax, self.sample_store)
+        
+        self.overview_ax = self.figure.add_subplot(grid[1])
+        self.overview_ax.set_title('Вся сессия (выделите участок, чтобы открыть его из файла)', fontsize='small')
+        self.overview_ax.tick_params(labelsize='small')
+        self.overview_ax.grid(True)
+        self.overview_fill = None
+        self.overview_line, = self.overview_ax.plot([], [], 'b-', linewidth=0.8)
+        self.overview_selector = SpanSelector(
+            self.overview_ax, self.on_overview_selected, 'horizontal', useblit=True, minspan=0.01
+        )
         
         # Добавляем график в интерфейс
         layout = QtWidgets.QVBoxLayout()
         layout.addWidget(self.canvas)
         self.ui.plot.setLayout(layout)
 
-        # Таймер для обновления графика
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_plot_from_buffer)
-        self.update_timer.start(self.update_interval)
+        # Планировщик перерисовки: кадр рисуется только при наличии изменений
+        self.plot_scheduler = RenderScheduler(self.update_plot_from_buffer, self.canvas, parent=self)
 
         # Таймер для вывода статистики каждую секунду
         self.stats_timer = QTimer()
@@ -267,11 +1290,9 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
         self.stats_timer.start(1000)  # Каждую секунду
 
         self.init_gui()
-        self.serial.readyRead.connect(self.parse_serial)
         self.lastWindowClosed.connect(self.stop_recording)
 
         self.ui.show()
-        self.exec()
 
     def init_gui(self):
         self.ui.connectButton.clicked.connect(self.connect_device)
@@ -287,9 +1308,75 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
         
         # Добавляем действие в меню Файл перед действием "Выход"
         self.ui.menuFile.insertAction(self.ui.exit, self.ui.open_file_action)
+        
+        self.ui.save_as_action = QtWidgets.QAction("Сохранить запись как...", self.ui)
+        self.ui.save_as_action.triggered.connect(self.choose_recording_destination)
+        self.ui.menuFile.insertAction(self.ui.exit, self.ui.save_as_action)
+        
+        self.ui.recordings_dir_action = QtWidgets.QAction("Папка для записей...", self.ui)
+        self.ui.recordings_dir_action.triggered.connect(self.choose_recordings_dir)
+        self.ui.menuFile.insertAction(self.ui.exit, self.ui.recordings_dir_action)
+        
+        self.ui.catalog_action = QtWidgets.QAction("Каталог записей...", self.ui)
+        self.ui.catalog_action.triggered.connect(self.show_catalog)
+        self.ui.menuFile.insertAction(self.ui.exit, self.ui.catalog_action)
+        
+        self.ui.export_action = QtWidgets.QAction("Экспорт записи...", self.ui)
+        self.ui.export_action.triggered.connect(self.export_file)
+        self.ui.menuFile.insertAction(self.ui.exit, self.ui.export_action)
         # Добавляем разделитель
         self.ui.menuFile.insertSeparator(self.ui.exit)
         
+        # Меню "Инструменты"
+        self.ui.menuTools = self.ui.menubar.addMenu("Инструменты")
+        self.ui.stats_action = QtWidgets.QAction("Статистика производительности", self.ui)
+        self.ui.stats_action.triggered.connect(self.show_stats_window)
+        self.ui.menuTools.addAction(self.ui.stats_action)
+        
+        self.ui.stream_action = QtWidgets.QAction("Трансляция данных", self.ui)
+        self.ui.stream_action.setCheckable(True)
+        self.ui.stream_action.toggled.connect(self.on_stream_toggled)
+        self.ui.menuTools.addAction(self.ui.stream_action)
+        
+        self.ui.bus_action = QtWidgets.QAction("Общая память для процессов", self.ui)
+        self.ui.bus_action.setCheckable(True)
+        self.ui.bus_action.toggled.connect(self.on_bus_toggled)
+        self.ui.menuTools.addAction(self.ui.bus_action)
+        
+        self.ui.columns_action = QtWidgets.QAction("Двоичная копия записи для быстрого анализа", self.ui)
+        self.ui.columns_action.setCheckable(True)
+        self.ui.columns_action.setChecked(self.settings.value("recordings/columns", False, type=bool))
+        self.ui.columns_action.toggled.connect(
+            lambda checked: self.settings.setValue("recordings/columns", checked))
+        self.ui.menuTools.addAction(self.ui.columns_action)
+        
+        self.ui.alarms_action = QtWidgets.QAction("Контроль пределов...", self.ui)
+        self.ui.alarms_action.triggered.connect(self.configure_alarms)
+        self.ui.menuTools.addAction(self.ui.alarms_action)
+        self.load_alarm_engine()
+        
+        self.ui.replay_action = QtWidgets.QAction("Воспроизвести запись...", self.ui)
+        self.ui.replay_action.triggered.connect(self.replay_recording)
+        self.ui.menuTools.addAction(self.ui.replay_action)
+        
+        self.ui.live_plot_action = QtWidgets.QAction("Новый живой график", self.ui)
+        self.ui.live_plot_action.triggered.connect(self.add_live_plot)
+        self.ui.menuTools.addAction(self.ui.live_plot_action)
+        
+        self.ui.calibration_action = QtWidgets.QAction("Загрузить калибровку прибора...", self.ui)
+        self.ui.calibration_action.triggered.connect(self.load_calibration)
+        self.ui.menuTools.addAction(self.ui.calibration_action)
+        
+        # Диапазон АЦП прибора: по нему выбирается поправка из профиля калибровки
+        self.ui.adcRangeLabel = QtWidgets.QLabel("Диапазон АЦП (±мВ)")
+        self.ui.adcRangeSelect = QtWidgets.QComboBox()
+        self.ui.adcRangeSelect.addItems(VoltageRange.RANGES_STR)
+        self.ui.adcRangeSelect.setCurrentText(self.settings.value("calibration/range", "6144", type=str))
+        self.ui.adcRangeSelect.currentIndexChanged.connect(self.on_adc_range_changed)
+        row = self.ui.gridLayout.rowCount()
+        self.ui.gridLayout.addWidget(self.ui.adcRangeLabel, row, 0)
+        self.ui.gridLayout.addWidget(self.ui.adcRangeSelect, row, 1)
+        
         # Инициализируем список COM портов
         self.refresh_ports()
         
@@ -329,7 +1416,8 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
             self.ui.yAxisMax.valueChanged.connect(self.on_y_axis_max_changed)
             
             # Устанавливаем значение размера окна по умолчанию
-            self.window_size = self.ui.windowSize.value()
+            self.live_panel.window_size = self.ui.windowSize.value()
+            self.update_y_range()
             
             # Добавляем чекбокс под консолью
             self.ui.showValuesCheckBox = QtWidgets.QCheckBox("Выводить текущие значения")
@@ -357,19 +1445,23 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
     def open_file(self):
         """Открывает диалог выбора файла и отображает данные из файла"""
         try:
-            filename, _ = QtWidgets.QFileDialog.getOpenFileName(
+            filenames, _ = QtWidgets.QFileDialog.getOpenFileNames(
                 self.ui,
-                "Открыть файл записи",
+                "Открыть файлы записи",
                 "",
                 "CSV Files (*.csv);;Text Files (*.txt);;All Files (*)"
             )
             
-            if filename:
+            if filenames:
                 # Создаем окно просмотра файла
                 viewer = FileViewerWindow(self.ui)
                 
-                # Загружаем данные
-                if viewer.load_data(filename):
+                # Загружаем данные: один файл целиком, несколько - наложением
+                if len(filenames) == 1:
+                    loaded = viewer.load_data(filenames[0])
+                else:
+                    loaded = viewer.load_files(filenames)
+                if loaded:
                     # Показываем окно, если данные успешно загружены
                     viewer.exec_()
                 else:
@@ -378,6 +1470,55 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
         except Exception as e:
             self.ui.console.appendPlainText(f"Ошибка при открытии файла: {str(e)}")
     
+    def export_file(self):
+        """Экспортирует запись в NumPy или WAV в фоновом потоке"""
+        if self.export_thread is not None and self.export_thread.isRunning():
+            QtWidgets.QMessageBox.information(self.ui, "Экспорт", "Дождитесь завершения текущего экспорта")
+            return
+        src, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self.ui,
+            "Экспорт записи",
+            "",
+            "CSV Files (*.csv);;Text Files (*.txt);;All Files (*)"
+        )
+        if not src:
+            return
+        dst, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self.ui,
+            "Экспортировать как",
+            os.path.splitext(src)[0] + ".npy",
+            "NumPy (*.npy);;NumPy archive (*.npz);;WAV (*.wav)"
+        )
+        if not dst:
+            return
+        
+        # Частота равномерной сетки: 0 - без передискретизации (для WAV - по данным)
+        rate, ok = QtWidgets.QInputDialog.getDouble(
+            self.ui,
+            "Передискретизация",
+            "Частота равномерной сетки, Гц (0 - без передискретизации):",
+            0, 0, 1000000, 3
+        )
+        if not ok:
+            return
+        
+        progress_dialog = QtWidgets.QProgressDialog("Экспорт записи...", "Отмена", 0, 100, self.ui)
+        progress_dialog.setWindowTitle("Экспорт")
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setAutoReset(False)
+        
+        self.export_thread = ExportThread(src, dst, rate or None, self)
+        self.export_thread.progress.connect(progress_dialog.setValue)
+        progress_dialog.canceled.connect(lambda: setattr(self.export_thread, "cancel_requested", True))
+        
+        def on_done(success, message):
+            progress_dialog.close()
+            self.ui.console.appendPlainText(message)
+        
+        self.export_thread.done.connect(on_done)
+        self.export_thread.start()
+        progress_dialog.show()
+
     def on_show_values_changed(self, state):
         """Обработчик изменения состояния флажка вывода текущих значений"""
         try:
@@ -422,8 +1563,68 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
         except Exception as e:
             self.ui.console.appendPlainText(f"Ошибка при изменении режима записи: {str(e)}")
 
+    def on_stream_toggled(self, checked):
+        """Запускает или останавливает локальную трансляцию отсчетов"""
+        if checked:
+            # Адрес берется из настроек: путь Unix-сокета или TCP-порт на localhost
+            unix_path = self.settings.value("stream/unix_path", "", type=str)
+            port = self.settings.value("stream/port", stream_server.DEFAULT_PORT, type=int)
+            address = unix_path or (stream_server.DEFAULT_HOST, port)
+            try:
+                self.stream_server = stream_server.SampleStreamServer(address)
+                self.stream_server.start()
+            except OSError as e:
+                self.stream_server = None
+                self.ui.console.appendPlainText(f"Ошибка при запуске трансляции: {str(e)}")
+                self.ui.stream_action.setChecked(False)
+                return
+            where = unix_path or f"{stream_server.DEFAULT_HOST}:{port}"
+            self.ui.console.appendPlainText(f"Трансляция данных запущена: {where}")
+        elif self.stream_server is not None:
+            stats = self.stream_server.stats()
+            self.stream_server.stop()
+            self.stream_server = None
+            self.ui.console.appendPlainText(
+                f"Трансляция данных остановлена (отправлено кадров: {stats['frames_sent']}, "
+                f"вытеснено: {stats['frames_dropped']}, задержка: {stats['latency_mean_ms']:.2f} мс)"
+            )
+
+    def on_bus_toggled(self, checked):
+        """Создает или удаляет кольцевой буфер отсчетов в разделяемой памяти"""
+        if checked:
+            name = self.settings.value("bus/name", sample_bus.DEFAULT_NAME, type=str)
+            try:
+                self.sample_bus = sample_bus.SampleBusWriter(name)
+            except (OSError, ValueError) as e:
+                self.sample_bus = None
+                self.ui.console.appendPlainText(f"Ошибка при создании общей памяти: {str(e)}")
+                self.ui.bus_action.setChecked(False)
+                return
+            self.ui.console.appendPlainText(f"Отсчеты публикуются в общую память «{name}»")
+        elif self.sample_bus is not None:
+            self.sample_bus.close()
+            self.sample_bus = None
+            self.ui.console.appendPlainText("Публикация в общую память остановлена")
+
+    def show_stats_window(self):
+        """Открывает панель метрик производительности"""
+        if self.stats_window is None:
+            self.stats_window = StatsWindow(self, self.ui)
+        self.stats_window.show()
+        self.stats_window.raise_()
+
     def show_stats(self):
         """Отображаем статистику полученных и сохраненных данных"""
+        if self.instrumentation.enabled:
+            self.instrumentation.tick()
+            # Периодически сохраняем метрики в JSON, если это включено
+            if self.stats_json_path and time.time() - self.last_stats_dump >= self.stats_json_interval:
+                try:
+                    self.instrumentation.dump_json(self.stats_json_path)
+                except OSError as e:
+                    self.ui.console.appendPlainText(f"Ошибка при сохранении метрик: {str(e)}")
+                self.last_stats_dump = time.time()
+        
         if self.recording:
             # Вычисляем прошедшее время на основе системного времени
             elapsed_time = 0
@@ -439,18 +1640,110 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
                     remaining_sec = remaining_ms / 1000.0
                     remaining_text = f", осталось: {remaining_sec:.1f} с"
             
+            # Если инструментирование включено, добавляем сведения о потерях
+            loss_text = ""
+            if self.instrumentation.enabled:
+                sequence = self.instrumentation.sequence
+                loss_text = f", пропущено: ~{sequence.lost_samples}, дубликатов: {sequence.duplicates}"
+            
             self.ui.console.appendPlainText(
                 f"Статистика: получено измерений: {self.received_data_count}, "
                 f"сохранено в файл: {self.saved_data_count}, "
-                f"время записи: {elapsed_time:.1f} с{remaining_text}"
+                f"время записи: {elapsed_time:.1f} с{remaining_text}{loss_text}"
             )
             self.processEvents()
 
-    def parse_serial(self):
-        # Обрабатываем все доступные данные
-        while self.serial.canReadLine():
+    def process_lines(self, lines):
+        """Обрабатывает пачку строк millis,voltage от текущего источника"""
+        instr = self.instrumentation
+        if instr.enabled:
+            instr.add_bytes(sum(len(line) for line in lines))
+            if self.source is not None:
+                instr.set_queue_depth("source_pending", self.source.bytes_available())
+        
+        with instr.stage("parse"):
+            samples = self.parse_lines(lines)
+        if not samples:
+            return
+        
+        instr.observe_millis([time_ms for time_ms, _ in samples])
+        
+        # Поправка калибровки применяется ко всей пачке до любых потребителей
+        if self.calibration is not None:
+            with instr.stage("calibrate"):
+                samples = self.apply_calibration(samples)
+        
+        # Раздаем пачку внешним подписчикам (только постановка в очереди)
+        if self.stream_server is not None:
+            self.stream_server.publish([(time_ms / 1000.0, voltage) for time_ms, voltage in samples])
+            instr.set_queue_depth("stream_client_max", self.stream_server.max_queue_depth())
+        if self.sample_bus is not None:
+            self.sample_bus.publish(
+                [time_ms / 1000.0 for time_ms, _ in samples],
+                [voltage for _, voltage in samples]
+            )
+        
+        # Время начала записи фиксируется до проверки пределов, чтобы
+        # тревоги из первой пачки записи тоже попали в журнал
+        if self.recording and self.start_time is None:
+            self.set_time_base(samples[0][0])
+        
+        # Проверяем пределы сразу после разбора, до записи и отрисовки
+        if self.alarm_engine is not None:
+            with instr.stage("alarms"):
+                alarm_events = self.alarm_engine.process(
+                    [time_ms / 1000.0 for time_ms, _ in samples],
+                    [voltage for _, voltage in samples]
+                )
+            instr.set_alarm_latency(self.alarm_engine.last_latency, self.alarm_engine.max_latency)
+            if alarm_events:
+                self.raise_alarms(alarm_events)
+        
+        # Увеличиваем счетчик полученных данных
+        self.received_data_count += len(samples)
+        
+        # Выводим данные в консоль (не каждый раз, чтобы не перегружать)
+        current_time = time.time()
+        if current_time - self.last_update_time > 0.5 and self.show_current_values:
+            # Обновляем консоль каждые 0.5 секунды, если включен вывод текущих значений
+            time_ms, voltage = samples[-1]
+            self.ui.console.appendPlainText(f"Время: {time_ms / 1000.0:.2f} с, Напряжение: {voltage:.2f} мВ")
+            self.last_update_time = current_time
+            # Обрабатываем события приложения, чтобы не зависало
+            self.processEvents()
+        
+        # Если запись не активна, данные дальше не идут
+        if not self.recording:
+            return
+        
+        with instr.stage("filter"):
+            rows = self.filter_samples(samples)
+        
+        # Записываем в файл всю пачку одной операцией
+        with instr.stage("write"):
+            if self.file and rows:
+                self.file.write_rows(rows)  # Пишет строки, пополняет индекс и сбрасывает буферы
+                self.saved_data_count += len(rows)  # Увеличиваем счетчик сохраненных данных
+        
+        if rows:
+            times, voltages = zip(*rows)
+            # Обновляем агрегаты обзора всей сессии
+            self.overview.add(times, voltages)
+            self.gap_counter.add(times)
+            
+            # Одна копия отсчетов на все живые графики; каждый рисует свое окно из нее
+            self.sample_store.append(times, voltages)
+            instr.set_queue_depth("plot_store", len(self.sample_store))
+            self.plot_scheduler.mark_dirty()
+            for window in self.live_windows:
+                window.render_scheduler.mark_dirty()
+
+    def parse_lines(self, lines):
+        """Разбирает строки формата millis,voltage в список пар (время в мс, напряжение в мВ)"""
+        samples = []
+        for raw_line in lines:
             try:
-                line = str(self.serial.readLine(), 'utf-8').strip()
+                line = str(raw_line, 'utf-8').strip()
                 
                 # Разбираем данные (формат: millis,voltage)
                 parts = line.split(',')
@@ -458,126 +1751,104 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
                     continue
                 
                 try:
-                    # Время в миллисекундах
-                    time_ms = int(parts[0])
-                    # Напряжение в милливольтах
-                    voltage = float(parts[1])
-                    
-                    # Преобразуем время в секунды
-                    time_sec = time_ms / 1000.0
-                    
-                    # Увеличиваем счетчик полученных данных
-                    self.received_data_count += 1
-                    
-                    # Выводим данные в консоль (не каждый раз, чтобы не перегружать)
-                    current_time = time.time()
-                    if current_time - self.last_update_time > 0.5 and self.show_current_values:  
-                        # Обновляем консоль каждые 0.5 секунды, если включен вывод текущих значений
-                        self.ui.console.appendPlainText(f"Время: {time_sec:.2f} с, Напряжение: {voltage:.2f} мВ")
-                        self.last_update_time = current_time
-                        # Обрабатываем события приложения, чтобы не зависало
-                        self.processEvents()
-                    
-                    # Если запись активна, добавляем данные
-                    if self.recording:
-                        # Если это первое измерение, запоминаем время начала
-                        if not self.times and self.start_time is None:
-                            self.start_time = time_ms
-                            # Запоминаем системное время начала записи
-                            if self.system_start_time is None:
-                                self.system_start_time = time.time()
-                        
-                        # Нормализуем время (от начала записи)
-                        normalized_time = (time_ms - self.start_time) / 1000.0
-                        
-                        # Проверяем, нужно ли пропустить это измерение
-                        skip_count = self.ui.skipMeasurements.value()
-                        if skip_count > 0:
-                            self.measurement_counter += 1
-                            if self.measurement_counter <= skip_count:
-                                continue
-                            self.measurement_counter = 0
-                        
-                        # Добавляем данные в буфер (для графика)
-                        self.buffered_data.append((normalized_time, voltage))
-                        
-                        # Записываем в файл сразу
-                        if self.file:
-                            self.file.write(f"{normalized_time},{voltage}\n")
-                            self.file.flush()  # Сбрасываем буфер файла
-                            self.saved_data_count += 1  # Увеличиваем счетчик сохраненных данных
-                    
+                    # Время в миллисекундах, напряжение в милливольтах
+                    samples.append((int(parts[0]), float(parts[1])))
                 except (ValueError, IndexError) as e:
                     self.ui.console.appendPlainText(f"Ошибка при обработке данных: {str(e)}")
                     self.processEvents()
             except Exception as e:
                 self.ui.console.appendPlainText(f"Ошибка при чтении данных: {str(e)}")
                 self.processEvents()
+        return samples
 
-    def update_plot_from_buffer(self):
-        # Если нет новых данных, не обновляем график
-        if not self.buffered_data:
-            return
+    def apply_calibration(self, samples):
+        """Применяет поправку калибровки к напряжениям пачки одной векторной операцией"""
+        out_of_range = self.calibration.out_of_range
+        voltages = self.calibration.apply_mv([voltage for _, voltage in samples])
+        if self.calibration.out_of_range and not out_of_range:
+            # Предупреждаем один раз: выбранный диапазон не соответствует прибору
+            self.ui.console.appendPlainText(
+                f"Внимание: напряжение вне шкалы диапазона ±{self.calibration.range_mv} мВ, "
+                "проверьте выбранный диапазон АЦП"
+            )
+        return [(time_ms, voltage) for (time_ms, _), voltage in zip(samples, voltages.tolist())]
+
+    def set_time_base(self, time_ms):
+        """Запоминает время прибора и системное время начала записи"""
+        self.start_time = time_ms
+        if self.system_start_time is None:
+            self.system_start_time = time.time()
+
+    def filter_samples(self, samples):
+        """Нормализует время от начала записи и применяет пропуск измерений"""
+        rows = []
+        skip_count = self.ui.skipMeasurements.value()
+        for time_ms, voltage in samples:
+            # Если это первое измерение, запоминаем время начала
+            if self.start_time is None:
+                self.set_time_base(time_ms)
             
-        # Добавляем все буферизованные данные
-        for time_val, voltage in self.buffered_data:
-            self.times.append(time_val)
-            self.data.append(voltage)
+            # Проверяем, нужно ли пропустить это измерение
+            if skip_count > 0:
+                self.measurement_counter += 1
+                if self.measurement_counter <= skip_count:
+                    continue
+                self.measurement_counter = 0
             
-        # Очищаем буфер
-        self.buffered_data = []
+            # Нормализуем время (от начала записи)
+            rows.append(((time_ms - self.start_time) / 1000.0, voltage))
+        return rows
+
+    def update_plot_from_buffer(self):
+        # Вызывается планировщиком перерисовки, только если график устарел
+        if not len(self.sample_store):
+            return
+        if not self.live_panel.render():
+            return
+        self.update_overview()
         
-        # Обновляем график с окном заданного размера
-        if self.times and self.data:
-            # Находим минимальное значение времени для окна
-            current_time = self.times[-1]
-            min_time = max(0, current_time - self.window_size)
-            
-            # Фильтруем данные только для окна заданного размера
-            window_times = []
-            window_data = []
-            
-            for i in range(len(self.times)):
-                if self.times[i] >= min_time:
-                    window_times.append(self.times[i])
-                    window_data.append(self.data[i])
-            
-            # Если данных нет в окне, выходим
-            if not window_times:
-                return
-                
-            # Обновляем график с фильтрованными данными
-            self.ax.clear()
-            self.ax.plot(window_times, window_data, 'b-')
-            
-            # Устанавливаем пределы графика
-            self.ax.set_xlim(min_time, current_time)
-            
-            # Настраиваем диапазон оси Y в зависимости от выбранного режима
-            if self.ui.yAxisRange.currentIndex() == 0:  # Динамически
-                # Если есть хотя бы два измерения, определяем диапазон по Y
-                if len(window_data) > 1:
-                    min_voltage = min(window_data)
-                    max_voltage = max(window_data)
-                    padding = (max_voltage - min_voltage) * 0.1  # 10% отступ
-                    if padding < 10:  # Минимальный отступ 10 мВ
-                        padding = 10
-                    self.ax.set_ylim(min_voltage - padding, max_voltage + padding)
-            else:  # Фиксированный диапазон
-                self.ax.set_ylim(self.ui.yAxisMin.value(), self.ui.yAxisMax.value())
-            
-            self.ax.set_xlabel('Время, с')
-            self.ax.set_ylabel('Напряжение, мВ')
-            self.ax.grid(True)
-            
-            # Подпись для скользящего окна с информацией о числе точек
-            points_in_window = len(window_times)
-            self.ax.set_title(f'Последние {self.window_size} секунд ({points_in_window} точек)')
-            
-            self.canvas.draw()
-            
-        # Обрабатываем события приложения
-        self.processEvents()
+        started = time.perf_counter()
+        self.canvas.draw()
+        self.instrumentation.add_frame(time.perf_counter() - started)
+
+    def add_live_plot(self):
+        """Открывает еще один живой график над теми же отсчетами"""
+        window = LivePlotWindow(self, f"Живой график {len(self.live_windows) + 2}", self.ui)
+        
+        def on_finished():
+            self.live_windows.remove(window)
+            window.deleteLater()
+        
+        window.finished.connect(on_finished)
+        self.live_windows.append(window)
+        window.show()
+
+    def update_overview(self):
+        """Перестраивает обзорный график по агрегатам корзин (не больше нескольких тысяч точек)"""
+        starts, mins, maxs, means = self.overview.buckets()
+        if self.overview_fill is not None:
+            self.overview_fill.remove()
+            self.overview_fill = None
+        if not len(starts):
+            self.overview_line.set_data([], [])
+            return
+        
+        centers = starts + self.overview.width / 2
+        self.overview_fill = self.overview_ax.fill_between(centers, mins, maxs, color='b', alpha=0.25, linewidth=0)
+        self.overview_line.set_data(centers, means)
+        self.overview_ax.set_xlim(starts[0], starts[-1] + self.overview.width)
+        padding = max((maxs.max() - mins.min()) * 0.1, 10)
+        self.overview_ax.set_ylim(mins.min() - padding, maxs.max() + padding)
+
+    def on_overview_selected(self, t0, t1):
+        """Открывает выделенный на обзоре участок из файла записи"""
+        if not self.overview_filename or not os.path.exists(self.overview_filename):
+            return
+        viewer = FileViewerWindow(self.ui)
+        if viewer.load_data(self.overview_filename, t0, t1):
+            # Немодальное окно: запись и обновление графика продолжаются
+            viewer.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+            viewer.show()
 
     def show_com_selector(self):
         """Показывает диалог выбора COM порта"""
@@ -594,13 +1865,12 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
             selected_port = dialog.get_selected_port()
             if selected_port:
                 # Если порт уже открыт, закрываем его
-                if self.serial.isOpen():
-                    self.serial.close()
+                if self.is_source_open():
+                    self.close_source()
                     self.ui.console.appendPlainText("Порт закрыт")
                 
                 # Устанавливаем новый порт
-                self.serial.setPortName(selected_port)
-                if self.serial.open(QIODevice.ReadOnly):
+                if self.open_serial_source(selected_port):
                     self.ui.console.appendPlainText(f"Подключено к {selected_port}")
                     self.ui.startButton.setEnabled(True)
                     self.ui.connectButton.setEnabled(False)
@@ -619,37 +1889,45 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
         
         # Если выбран автоматический режим
         if selected_port == "Авто":
-            ports = [port.device for port in serial.tools.list_ports.comports()]
+            ports = list(serial.tools.list_ports.comports())
             if not ports:
                 self.ui.console.appendPlainText("ОШИБКА: Не найдены доступные COM-порты")
                 self.ui.connectButton.setEnabled(True)
                 return
             
-            # Пробуем подключиться к каждому порту
-            for port in ports:
+            # Сначала пробуем последний успешно найденный прибор, не опрашивая порты
+            cached_port = port_probe.find_cached_port(ports, self.load_cached_device())
+            if cached_port is not None:
+                if self.open_port(cached_port.device):
+                    self.ui.console.appendPlainText(f"Подключено к {cached_port.device} (сохраненный прибор)")
+                    return
+                self.ui.console.appendPlainText(f"Не удалось открыть сохраненный порт {cached_port.device}")
+            
+            # Параллельно опрашиваем все порты и ждем ответа прибора
+            self.ui.console.appendPlainText(f"Поиск прибора на {len(ports)} портах...")
+            self.processEvents()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                future = executor.submit(port_probe.find_device, ports)
+                while not future.done():
+                    self.processEvents()
+                    time.sleep(0.01)
                 try:
-                    self.serial.setPortName(port)
-                    if self.serial.open(QIODevice.ReadOnly):
-                        self.ui.console.appendPlainText(f"Подключено к {port}")
-                        self.ui.startButton.setEnabled(True)
-                        self.ui.connectButton.setEnabled(False)
-                        self.ui.disconnectButton.setEnabled(True)
-                        self.ui.comPortSelect.setEnabled(False)
-                        self.ui.refreshPortsButton.setEnabled(False)
-                        # Устанавливаем текущий порт в выпадающем списке
-                        self.ui.comPortSelect.setCurrentText(port)
-                        return
+                    found_port = future.result()
                 except Exception as e:
-                    self.ui.console.appendPlainText(f"Ошибка при подключении к {port}: {str(e)}")
-                    self.processEvents()
+                    self.ui.console.appendPlainText(f"Ошибка при поиске прибора: {str(e)}")
+                    found_port = None
+            
+            if found_port is not None and self.open_port(found_port.device):
+                self.ui.console.appendPlainText(f"Подключено к {found_port.device}")
+                self.save_cached_device(found_port)
+                return
             
-            self.ui.console.appendPlainText("ОШИБКА: Не удалось подключиться ни к одному порту")
+            self.ui.console.appendPlainText("ОШИБКА: Прибор не найден ни на одном порту")
             self.ui.connectButton.setEnabled(True)
         else:
             # Подключаемся к выбранному порту
             try:
-                self.serial.setPortName(selected_port)
-                if self.serial.open(QIODevice.ReadOnly):
+                if self.open_serial_source(selected_port):
                     self.ui.console.appendPlainText(f"Подключено к {selected_port}")
                     self.ui.startButton.setEnabled(True)
                     self.ui.connectButton.setEnabled(False)
@@ -663,13 +1941,214 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
                 self.ui.console.appendPlainText(f"Ошибка при подключении к {selected_port}: {str(e)}")
                 self.ui.connectButton.setEnabled(True)
 
+    def open_port(self, port):
+        """Открывает порт и переводит интерфейс в состояние «подключено»"""
+        try:
+            if not self.open_serial_source(port):
+                return False
+        except Exception as e:
+            self.ui.console.appendPlainText(f"Ошибка при подключении к {port}: {str(e)}")
+            self.processEvents()
+            return False
+        
+        self.ui.startButton.setEnabled(True)
+        self.ui.connectButton.setEnabled(False)
+        self.ui.disconnectButton.setEnabled(True)
+        self.ui.comPortSelect.setEnabled(False)
+        self.ui.refreshPortsButton.setEnabled(False)
+        # Устанавливаем текущий порт в выпадающем списке
+        self.ui.comPortSelect.setCurrentText(port)
+        return True
+
+    def open_serial_source(self, port_name):
+        """Открывает прибор на порту и делает его текущим источником данных"""
+        source = sources.SerialSource(port_name, self)
+        source.lines_ready.connect(self.process_lines)
+        if not source.open():
+            source.deleteLater()
+            return False
+        self.source = source
+        self.select_device(port_name)
+        return True
+
+    def select_device(self, port_name):
+        """Определяет прибор на порту и выбирает его калибровку"""
+        self.device_id = calibration.DEFAULT_DEVICE
+        for port in serial.tools.list_ports.comports():
+            if port.device == port_name:
+                self.device_id = port_probe.device_id(port) or calibration.DEFAULT_DEVICE
+                break
+        self.update_calibration()
+
+    def update_calibration(self):
+        """Выбирает поправку для текущего прибора и диапазона АЦП.
+
+        Воспроизводимые записи уже содержат поправленные значения, поэтому
+        калибровка применяется только к данным с прибора.
+        """
+        self.calibration = None
+        if not isinstance(self.source, sources.SerialSource):
+            return
+        range_mv = int(self.ui.adcRangeSelect.currentText())
+        try:
+            self.calibration = self.calibration_store.calibration(self.device_id, range_mv)
+        except (OSError, ValueError) as e:
+            self.ui.console.appendPlainText(f"Ошибка в профиле калибровки: {str(e)}")
+            return
+        if self.calibration is not None:
+            self.ui.console.appendPlainText(f"Калибровка: прибор {self.device_id}, диапазон ±{range_mv} мВ")
+
+    def on_adc_range_changed(self, index):
+        self.settings.setValue("calibration/range", self.ui.adcRangeSelect.currentText())
+        self.update_calibration()
+
+    def load_calibration(self):
+        """Загружает профиль калибровки для подключенного прибора"""
+        filename, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self.ui,
+            "Профиль калибровки",
+            "",
+            "JSON Files (*.json);;All Files (*)"
+        )
+        if not filename:
+            return
+        try:
+            self.calibration_store.import_profile(filename, self.device_id)
+        except (OSError, ValueError) as e:
+            QtWidgets.QMessageBox.critical(self.ui, "Ошибка", f"Не удалось загрузить профиль: {str(e)}")
+            return
+        self.ui.console.appendPlainText(f"Профиль калибровки сохранен для прибора {self.device_id}")
+        self.update_calibration()
+
+    def load_alarm_engine(self):
+        """Создает правила контроля пределов из сохраненных настроек"""
+        config = {}
+        for key, _, _, _ in AlarmSettingsDialog.FIELDS:
+            value = self.settings.value(f"alarms/{key}", "", type=str)
+            config[key] = float(value) if value else None
+        config["hook_command"] = self.settings.value("alarms/hook_command", "", type=str)
+        engine = alarms.AlarmEngine.from_config(config)
+        self.alarm_engine = engine if engine.rules else None
+        self.instrumentation.alarm_latency = None  # Задержки прежних правил больше не показываем
+        return config
+
+    def configure_alarms(self):
+        """Открывает диалог настройки правил контроля пределов"""
+        dialog = AlarmSettingsDialog(self.load_alarm_engine(), self.ui)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return
+        for key, value in dialog.get_config().items():
+            self.settings.setValue(f"alarms/{key}", "" if value is None else str(value))
+        self.load_alarm_engine()
+        if self.alarm_engine is None:
+            self.ui.console.appendPlainText("Контроль пределов отключен")
+        else:
+            self.ui.console.appendPlainText(f"Контроль пределов: правил {len(self.alarm_engine.rules)}")
+
+    def raise_alarms(self, alarm_events):
+        """Показывает тревоги, пишет их в журнал записи и запускает внешнюю команду"""
+        for event in alarm_events:
+            self.ui.console.appendPlainText(str(event))
+            if event.state == alarms.RAISED:
+                self.ui.statusbar.showMessage(str(event))
+                self.beep()
+                try:
+                    self.alarm_engine.run_hook(event)
+                except OSError as e:
+                    self.ui.console.appendPlainText(f"Ошибка при запуске команды тревоги: {str(e)}")
+        if self.alarm_log is not None and self.start_time is not None:
+            # В журнале время отсчитывается от начала записи, как в файле данных
+            self.alarm_log.write(alarm_events, self.start_time / 1000.0)
+
+    def is_source_open(self):
+        """Проверяет, подключен ли какой-либо источник данных"""
+        return self.source is not None and self.source.is_open()
+
+    def close_source(self):
+        """Закрывает текущий источник данных"""
+        if self.source is not None:
+            self.source.close()
+            self.source.deleteLater()
+            self.source = None
+            self.calibration = None
+
+    def replay_recording(self):
+        """Воспроизводит существующую запись через весь конвейер, как если бы данные шли с прибора"""
+        if self.recording:
+            QtWidgets.QMessageBox.warning(self.ui, "Внимание", "Невозможно сменить источник во время записи")
+            return
+        
+        filename, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self.ui,
+            "Воспроизвести запись",
+            "",
+            "CSV Files (*.csv);;Text Files (*.txt);;All Files (*)"
+        )
+        if not filename:
+            return
+        speed_name, ok = QtWidgets.QInputDialog.getItem(
+            self.ui,
+            "Воспроизведение",
+            "Скорость воспроизведения:",
+            list(sources.ReplaySource.SPEEDS),
+            0,
+            False
+        )
+        if not ok:
+            return
+        
+        # Отключаемся от прибора, данные пойдут из файла
+        if self.is_source_open():
+            self.close_source()
+        
+        replay = sources.ReplaySource(filename, sources.ReplaySource.SPEEDS[speed_name], self)
+        replay.lines_ready.connect(self.process_lines)
+        replay.finished.connect(self.on_replay_finished)
+        if not replay.open():
+            self.ui.console.appendPlainText(f"Ошибка: не удалось воспроизвести {filename}")
+            return
+        
+        self.source = replay
+        self.ui.console.appendPlainText(f"Источник данных: {replay.description()}")
+        self.ui.console.appendPlainText("Воспроизведение начнется вместе с записью")
+        self.ui.startButton.setEnabled(True)
+        self.ui.connectButton.setEnabled(False)
+        self.ui.disconnectButton.setEnabled(True)
+        self.ui.comPortSelect.setEnabled(False)
+        self.ui.refreshPortsButton.setEnabled(False)
+
+    def on_replay_finished(self):
+        """Обработчик окончания воспроизводимой записи"""
+        self.ui.console.appendPlainText("Воспроизведение записи завершено")
+        self.disconnect_device()
+
+    def load_cached_device(self):
+        """Возвращает VID/PID и серийный номер последнего найденного прибора"""
+        if not self.settings.contains("device/vid"):
+            return None
+        return {
+            "vid": self.settings.value("device/vid", type=int),
+            "pid": self.settings.value("device/pid", type=int),
+            "serial_number": self.settings.value("device/serial_number", "", type=str),
+        }
+
+    def save_cached_device(self, port):
+        """Запоминает прибор, чтобы при следующем подключении не опрашивать порты"""
+        key = port_probe.device_key(port)
+        if key is None:
+            return
+        self.settings.setValue("device/vid", key["vid"])
+        self.settings.setValue("device/pid", key["pid"])
+        self.settings.setValue("device/serial_number", key["serial_number"])
+
     def disconnect_device(self):
         """Отключает устройство"""
         if self.recording:
             self.stop_recording()
         
-        if self.serial.isOpen():
-            self.serial.close()
+        # Воспроизведение к этому моменту может уже само остановиться
+        if self.source is not None:
+            self.close_source()
             self.ui.console.appendPlainText("Устройство отключено")
             self.ui.startButton.setEnabled(False)
             self.ui.disconnectButton.setEnabled(False)
@@ -679,19 +2158,19 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
 
     def start_recording(self):
         if not self.recording:
-            if not self.serial.isOpen():
+            if not self.is_source_open():
                 self.ui.console.appendPlainText("ОШИБКА: Сначала подключитесь к прибору")
                 return
                 
             self.recording = True
-            self.data = []
-            self.times = []
-            self.buffered_data = []
+            self.sample_store.clear()
             self.start_time = None
             self.system_start_time = None
             self.received_data_count = 0
             self.saved_data_count = 0
             self.measurement_counter = 0  # Сбрасываем счетчик измерений
+            self.overview.reset()
+            self.gap_counter = catalog.GapCounter()
             
             # Блокируем элементы настройки времени записи, пока идет запись
             if hasattr(self.ui, 'recordLength'):
@@ -736,15 +2215,24 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
                 
                 self.ui.console.appendPlainText(f"Начата запись на {time_text}")
             
-            # Генерируем имя файла на основе даты и времени
+            # Генерируем имя файла на основе даты и времени в папке для записей
             now = datetime.datetime.now()
-            self.backup_filename = f"measurements{now.strftime('%Y%m%d%H%M%S')}.csv"
+            recordings_dir = self.recordings_dir()
+            try:
+                os.makedirs(recordings_dir, exist_ok=True)
+            except OSError as e:
+                self.ui.console.appendPlainText(f"Ошибка при создании папки для записей: {str(e)}")
+                self.recording = False
+                return
+            self.backup_filename = os.path.join(recordings_dir, f"measurements{now.strftime('%Y%m%d%H%M%S')}.csv")
             
-            # Открываем файл для записи
+            # Открываем файл для записи (вместе с ним ведется индекс смещений)
             try:
-                self.file = open(self.backup_filename, "w")
-                self.file.write("time,voltage\n")
-                self.file.flush()
+                self.file = recording.RecordingWriter(
+                    self.backup_filename, columns=self.ui.columns_action.isChecked())
+                self.overview_filename = self.backup_filename
+                if self.alarm_engine is not None:
+                    self.alarm_log = alarms.AlarmLog(self.backup_filename)
                 self.ui.console.appendPlainText(f"Файл создан и готов к записи: {self.backup_filename}")
             except Exception as e:
                 self.ui.console.appendPlainText(f"Ошибка при создании файла: {str(e)}")
@@ -754,11 +2242,15 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
             self.ui.startButton.setEnabled(False)
             self.ui.stopButton.setEnabled(True)
             self.ui.console.appendPlainText(f"Начало записи данных в файл {self.backup_filename}")
+            # Воспроизведение идет только во время записи, как поток с прибора
+            self.source.start()
             self.processEvents()  # Обрабатываем события, чтобы интерфейс обновился
 
     def stop_recording(self):
         if self.recording:
             self.recording = False
+            if self.source is not None:
+                self.source.pause()
             
             # Разблокируем элементы настройки времени записи
             if hasattr(self.ui, 'recordLength'):
@@ -783,6 +2275,10 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
             if self.timed_recording:
                 self.ui.console.appendPlainText("Запись автоматически остановлена по истечении заданного времени")
             
+            if self.alarm_log is not None:
+                self.alarm_log.close()
+                self.alarm_log = None
+            
             if self.file:
                 try:
                     self.file.close()
@@ -796,48 +2292,147 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
                         f"Данные сохранены в файл {self.backup_filename} "
                         f"(всего записано {self.saved_data_count} измерений за {elapsed_time:.1f} с)"
                     )
+                    self.add_to_catalog(self.backup_filename)
                     
-                    # Предлагаем пользователю сохранить файл под другим именем
+                    # Имя могло быть выбрано заранее; иначе спрашиваем его сейчас
                     if os.path.exists(self.backup_filename):
-                        filename, _ = QtWidgets.QFileDialog.getSaveFileName(
-                            self.ui,
-                            "Сохранить файл как",
-                            "",
-                            "CSV Files (*.csv);;Text Files (*.txt);;All Files (*)"
-                        )
-                        if filename:
-                            try:
-                                shutil.copy2(self.backup_filename, filename)
-                                self.ui.console.appendPlainText(f"Файл также сохранен как {filename}")
-                                
-                                # Предлагаем открыть файл для просмотра
-                                reply = QtWidgets.QMessageBox.question(
-                                    self.ui, 
-                                    "Просмотр данных",
-                                    "Открыть файл для просмотра?",
-                                    QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
-                                    QtWidgets.QMessageBox.Yes
-                                )
-                                
-                                if reply == QtWidgets.QMessageBox.Yes:
-                                    # Создаем окно просмотра файла
-                                    viewer = FileViewerWindow(self.ui)
-                                    # Загружаем данные
-                                    if viewer.load_data(filename):
-                                        # Показываем окно, если данные успешно загружены
-                                        viewer.exec_()
-                                
-                            except Exception as e:
-                                self.ui.console.appendPlainText(f"Ошибка при сохранении файла: {str(e)}")
+                        filename = self.recording_destination
+                        self.recording_destination = ""
+                        if not filename:
+                            filename, _ = QtWidgets.QFileDialog.getSaveFileName(
+                                self.ui,
+                                "Сохранить файл как",
+                                self.backup_filename,
+                                "CSV Files (*.csv);;Text Files (*.txt);;All Files (*)"
+                            )
+                        if filename and os.path.abspath(filename) == os.path.abspath(self.backup_filename):
+                            self.on_recording_finalized(self.backup_filename, filename)
+                        elif filename:
+                            self.finalize_recording(self.backup_filename, filename)
                                 
                 except Exception as e:
                     self.ui.console.appendPlainText(f"Ошибка при закрытии файла: {str(e)}")
+                self.file = None
             
             self.ui.startButton.setEnabled(True)
             self.ui.stopButton.setEnabled(False)
             self.ui.console.appendPlainText("Запись остановлена")
             self.processEvents()
 
+    def finalize_recording(self, src, dst):
+        """Переносит запись под итоговое имя: переименованием или фоновым копированием"""
+        try:
+            if finalize.move_recording(src, dst):
+                self.on_recording_finalized(src, dst)
+                return
+        except OSError as e:
+            self.ui.console.appendPlainText(f"Ошибка при сохранении файла: {str(e)}")
+            return
+        
+        # Другая файловая система: копируем в фоне с прогрессом
+        self.ui.console.appendPlainText(f"Копирование записи в {dst}...")
+        progress_dialog = QtWidgets.QProgressDialog("Копирование записи...", None, 0, 100, self.ui)
+        progress_dialog.setWindowTitle("Сохранение")
+        progress_dialog.setAutoClose(False)
+        
+        # Поток хранится до завершения: следующая запись может начать свое копирование раньше
+        copy_thread = CopyThread(src, dst, self)
+        copy_thread.progress.connect(progress_dialog.setValue)
+        
+        def on_done(success, message):
+            progress_dialog.close()
+            if success:
+                self.on_recording_finalized(src, dst)
+            else:
+                self.ui.console.appendPlainText(message)
+        
+        def on_finished():
+            self.copy_threads.remove(copy_thread)
+            copy_thread.deleteLater()
+        
+        copy_thread.done.connect(on_done)
+        copy_thread.finished.connect(on_finished)
+        self.copy_threads.append(copy_thread)
+        copy_thread.start()
+        progress_dialog.show()
+
+    def add_to_catalog(self, csv_path):
+        """Заносит завершенную запись в каталог по сводке, накопленной во время записи"""
+        port = self.source.description() if self.source is not None else None
+        summary = self.overview.summary()
+        try:
+            if summary is None:
+                self.catalog.add(csv_path, 0, 0.0, None, None, None, 0, port, self.system_start_time)
+                return
+            minimum, maximum, mean, count = summary
+            self.catalog.add(
+                csv_path, count, recording.read_last_time(csv_path) or 0.0, minimum, maximum, mean,
+                self.gap_counter.gaps, port, self.system_start_time
+            )
+        except Exception as e:
+            self.ui.console.appendPlainText(f"Ошибка при добавлении записи в каталог: {str(e)}")
+
+    def show_catalog(self):
+        dialog = CatalogDialog(self, self.ui)
+        dialog.setAttribute(QtCore.Qt.WA_DeleteOnClose)
+        dialog.show()
+
+    def on_recording_finalized(self, src, dst):
+        """Сообщает о сохраненной записи и предлагает открыть ее"""
+        self.ui.console.appendPlainText(f"Запись сохранена как {dst}")
+        if os.path.abspath(src) != os.path.abspath(dst):
+            self.catalog.rename(src, dst)
+        if self.overview_filename == src:
+            self.overview_filename = dst
+        
+        # Предлагаем открыть файл для просмотра
+        reply = QtWidgets.QMessageBox.question(
+            self.ui, 
+            "Просмотр данных",
+            "Открыть файл для просмотра?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+            QtWidgets.QMessageBox.Yes
+        )
+        
+        if reply == QtWidgets.QMessageBox.Yes:
+            # Создаем окно просмотра файла
+            viewer = FileViewerWindow(self.ui)
+            # Загружаем данные
+            if viewer.load_data(dst):
+                # Показываем окно, если данные успешно загружены
+                viewer.exec_()
+
+    def choose_recordings_dir(self):
+        """Выбор папки, в которой создаются файлы записей"""
+        directory = QtWidgets.QFileDialog.getExistingDirectory(
+            self.ui,
+            "Папка для записей",
+            self.recordings_dir()
+        )
+        if directory:
+            self.settings.setValue("recordings/dir", directory)
+            self.ui.console.appendPlainText(f"Записи будут сохраняться в {directory}")
+
+    def recordings_dir(self):
+        """Папка для записей из настроек (по умолчанию Документы/SerialVoltmeter)"""
+        default = os.path.join(
+            QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.DocumentsLocation),
+            "SerialVoltmeter"
+        )
+        return self.settings.value("recordings/dir", default, type=str)
+
+    def choose_recording_destination(self):
+        """Выбор итогового имени файла до или во время записи"""
+        filename, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self.ui,
+            "Сохранить запись как",
+            self.recording_destination or self.recordings_dir(),
+            "CSV Files (*.csv);;Text Files (*.txt);;All Files (*)"
+        )
+        if filename:
+            self.recording_destination = filename
+            self.ui.console.appendPlainText(f"После остановки запись будет сохранена как {filename}")
+
     def refresh_ports(self):
         """Обновляет список доступных COM портов"""
         current_port = self.ui.comPortSelect.currentText()
@@ -856,9 +2451,9 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
 
     def on_window_size_changed(self, value):
         """Обработчик изменения размера окна графика"""
-        self.window_size = value
+        self.live_panel.window_size = value
         self.ui.console.appendPlainText(f"Размер окна графика изменен на {value} секунд")
-        self.update_plot_from_buffer()  # Обновляем график с новым размером окна
+        self.plot_scheduler.mark_dirty()  # Планируем перерисовку с новыми настройками
 
     def on_y_axis_range_changed(self, index):
         """Обработчик изменения режима диапазона оси Y"""
@@ -873,17 +2468,27 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
         else:
             self.ui.console.appendPlainText("Диапазон оси Y установлен на фиксированный")
         
-        self.update_plot_from_buffer()  # Обновляем график с новыми настройками
+        self.update_y_range()
+        self.plot_scheduler.mark_dirty()  # Планируем перерисовку с новыми настройками
 
     def on_y_axis_min_changed(self, value):
         """Обработчик изменения минимального значения оси Y"""
         self.ui.console.appendPlainText(f"Минимальное значение оси Y изменено на {value} мВ")
-        self.update_plot_from_buffer()  # Обновляем график с новыми настройками
+        self.update_y_range()
+        self.plot_scheduler.mark_dirty()  # Планируем перерисовку с новыми настройками
 
     def on_y_axis_max_changed(self, value):
         """Обработчик изменения максимального значения оси Y"""
         self.ui.console.appendPlainText(f"Максимальное значение оси Y изменено на {value} мВ")
-        self.update_plot_from_buffer()  # Обновляем график с новыми настройками
+        self.update_y_range()
+        self.plot_scheduler.mark_dirty()  # Планируем перерисовку с новыми настройками
+
+    def update_y_range(self):
+        """Передает основному графику режим оси Y из настроек окна"""
+        if self.ui.yAxisRange.currentIndex() == 0:
+            self.live_panel.y_range = None
+        else:
+            self.live_panel.y_range = (self.ui.yAxisMin.value(), self.ui.yAxisMax.value())
 
     def exit(self):
         """Обработчик выхода из программы через меню"""
@@ -912,28 +2517,55 @@ class SerialVoltmeterApp(QtWidgets.QApplication):
             # Останавливаем запись
             self.stop_recording()
         
-        # Запрашиваем подтверждение выхода
-        reply = QtWidgets.QMessageBox.question(
-            self.ui,
-            "Подтверждение",
-            "Вы уверены, что хотите выйти?",
-            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
-            QtWidgets.QMessageBox.No
-        )
+        # Незавершенное копирование оставило бы запись неполной
+        if self.copy_threads:
+            reply = QtWidgets.QMessageBox.question(
+                self.ui,
+                "Внимание",
+                f"Идет копирование записей ({len(self.copy_threads)}). "
+                "Дождаться его завершения и выйти?",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+                QtWidgets.QMessageBox.No
+            )
+            if reply == QtWidgets.QMessageBox.No:
+                return False
+            QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+            try:
+                for copy_thread in list(self.copy_threads):
+                    copy_thread.wait()
+                # Доставляем сигналы done, чтобы записи попали в каталог под итоговым именем
+                self.sendPostedEvents()
+            finally:
+                QtWidgets.QApplication.restoreOverrideCursor()
+        else:
+            # Запрашиваем подтверждение выхода
+            reply = QtWidgets.QMessageBox.question(
+                self.ui,
+                "Подтверждение",
+                "Вы уверены, что хотите выйти?",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+                QtWidgets.QMessageBox.No
+            )
+            if reply == QtWidgets.QMessageBox.No:
+                return False
         
-        if reply == QtWidgets.QMessageBox.Yes:
-            # Закрываем все ресурсы
-            if self.serial.isOpen():
-                self.serial.close()
-            if hasattr(self, 'file') and self.file:
-                self.file.close()
-            # Завершаем приложение
-            sys.exit(0)
-            return True
-        return False
-
+        # Закрываем все ресурсы
+        if self.is_source_open():
+            self.close_source()
+        if self.stream_server is not None:
+            self.stream_server.stop()
+        if self.sample_bus is not None:
+            self.sample_bus.close()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        # Завершаем приложение
+        sys.exit(0)
+        return True
 
 def main():
+    # Нужно для пула процессов в собранном PyInstaller исполняемом файле
+    multiprocessing.freeze_support()
     app = SerialVoltmeterApp([])
     return app.exec_()
 
@@ -33,6 +33,11 @@ void setup() {
 }
 
 void loop() {
+  // Ответ на запрос идентификации при автоматическом поиске порта
+  if (Serial.available()) {
+    if (Serial.read() == '?') Serial.println(F("SerialVoltmeter"));
+  }
+
   // Отправка данных с заданным интервалом
   if (millis() - tmr >= sampling) {
     tmr = millis();
@@ -44,7 +44,27 @@ def build_exe():
     platform_suffix = get_platform_suffix()
     
     # Проверяем наличие необходимых файлов
-    required_files = ["app.py", "mainForm.ui", "comSelector.ui", "models.py"]
+    required_files = [
+        "app.py",
+        "mainForm.ui",
+        "comSelector.ui",
+        "models.py",
+        "port_probe.py",
+        "instrumentation.py",
+        "render_scheduler.py",
+        "recording.py",
+        "stream_server.py",
+        "sources.py",
+        "export.py",
+        "overview.py",
+        "finalize.py",
+        "alarms.py",
+        "sample_bus.py",
+        "calibration.py",
+        "catalog.py",
+        "events.py",
+        "sample_store.py",
+    ]
     for file in required_files:
         if not os.path.exists(file):
             print(f"ОШИБКА: Файл {file} не найден!")
@@ -70,6 +90,7 @@ def build_exe():
         "--hidden-import", "pandas",
         "--hidden-import", "matplotlib",
         "--hidden-import", "PyQt5",
+        "--hidden-import", "PyQt5.QtSerialPort",
         "--hidden-import", "pyqtgraph",
         "--hidden-import", "serial",
         "--hidden-import", "serial.tools.list_ports",
@@ -0,0 +1,182 @@
+"""Калибровка прибора: смещение, усиление и нелинейность для каждого диапазона АЦП.
+
+Профиль хранится в JSON-файле на каждый прибор:
+
+    {
+        "device": "2341:0043:95635333231351F0E1A1",
+        "ranges": {
+            "6144": {"offset": -1.2, "gain": 1.0015},
+            "2048": {"coefficients": [1.2e-7, 0.0, 0.9991, 0.35]}
+        }
+    }
+
+coefficients задаются в порядке numpy.polyval (от старшей степени);
+offset/gain - краткая запись линейной поправки gain * x + offset.
+"""
+import json
+import os
+from functools import cached_property
+
+import numpy as np
+
+from models import VoltageRange
+
+DEFAULT_DEVICE = "default"
+LUT_SIZE = 1 << VoltageRange.BITS_COUNT
+MV_PRINT_RESOLUTION = 0.01  # Прибор печатает напряжение с двумя знаками после запятой, мВ
+
+
+def lsb_mv(range_mv):
+    """Цена младшего разряда АЦП в мВ для диапазона ±range_mv"""
+    return range_mv / (1 << (VoltageRange.BITS_COUNT - 1))
+
+
+class RangeCalibration:
+    """Поправка для одного диапазона АЦП"""
+
+    def __init__(self, range_mv, coefficients):
+        self.range_mv = range_mv
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.lsb = lsb_mv(range_mv)
+        # Код АЦП однозначно восстанавливается из напечатанных мВ, если шаг
+        # квантования заметно больше точности печати
+        self.codes_recoverable = self.lsb / 2 > MV_PRINT_RESOLUTION / 2
+        self.out_of_range = 0  # Значений за пределами шкалы (неверно выбран диапазон?)
+
+    @classmethod
+    def from_dict(cls, range_mv, data):
+        if "coefficients" in data:
+            return cls(range_mv, data["coefficients"])
+        return cls(range_mv, [data.get("gain", 1.0), data.get("offset", 0.0)])
+
+    def to_dict(self):
+        return {"coefficients": self.coefficients.tolist()}
+
+    @cached_property
+    def lut(self):
+        """Таблица поправленных значений в мВ на все 65536 кодов АЦП.
+
+        Индекс - код int16, приведенный к uint16; строится один раз.
+        """
+        codes = np.arange(LUT_SIZE, dtype=np.uint16).view(np.int16)
+        return np.polyval(self.coefficients, codes * self.lsb)
+
+    def apply_counts(self, codes):
+        """Поправка для сырых кодов АЦП через таблицу"""
+        codes = np.asarray(codes).astype(np.int16)
+        return self.lut[codes.view(np.uint16)]
+
+    def apply_mv(self, values):
+        """Поправка для значений в мВ.
+
+        Если код АЦП восстанавливается из мВ без потерь, используется
+        таблица (см. _interpolate), иначе - векторное вычисление
+        многочлена. Значения за пределами шкалы диапазона не обрезаются:
+        для них вычисляется многочлен, а их число копится в out_of_range.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not self.codes_recoverable:
+            return np.polyval(self.coefficients, values)
+
+        codes = values / self.lsb
+        # Крайние коды шкалы после округления при печати могут выйти за нее на долю МЗР
+        tolerance = MV_PRINT_RESOLUTION / 2 / self.lsb
+        inside = (codes >= -(LUT_SIZE // 2) - tolerance) & (codes <= LUT_SIZE // 2 - 1 + tolerance)
+        if inside.all():
+            return self._interpolate(codes)
+        self.out_of_range += int(np.count_nonzero(~inside))
+        result = np.polyval(self.coefficients, values)
+        result[inside] = self._interpolate(codes[inside])
+        return result
+
+    def _interpolate(self, codes):
+        """Значения таблицы по дробным кодам в пределах шкалы.
+
+        Код, отличающийся от целого не больше чем на точность печати, -
+        это напечатанный прибором код: берется табличное значение. Прочие
+        значения интерполируются между соседними точками таблицы.
+        """
+        nearest = np.rint(codes)
+        on_grid = np.abs(codes - nearest) * self.lsb <= MV_PRINT_RESOLUTION / 2 + 1e-9
+        low = np.clip(np.where(on_grid, nearest, np.floor(codes)), -(LUT_SIZE // 2), LUT_SIZE // 2 - 1)
+        fraction = np.where(on_grid, 0.0, codes - low)
+        low = low.astype(np.int32)
+        high = np.minimum(low + 1, LUT_SIZE // 2 - 1)
+        lut = self.lut
+        low_values = lut[low & (LUT_SIZE - 1)]
+        return low_values + fraction * (lut[high & (LUT_SIZE - 1)] - low_values)
+
+
+class CalibrationProfile:
+    """Калибровка одного прибора по всем диапазонам"""
+
+    def __init__(self, device, ranges=None):
+        self.device = device
+        self.ranges = ranges or {}
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        ranges = {}
+        for range_str, range_data in data.get("ranges", {}).items():
+            range_mv = int(range_str)
+            if range_mv not in VoltageRange.RANGES:
+                raise ValueError(f"Неизвестный диапазон АЦП: {range_str}")
+            ranges[range_mv] = RangeCalibration.from_dict(range_mv, range_data)
+        return cls(data.get("device", DEFAULT_DEVICE), ranges)
+
+    def save(self, path):
+        data = {
+            "device": self.device,
+            "ranges": {str(range_mv): cal.to_dict() for range_mv, cal in self.ranges.items()},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def for_range(self, range_mv):
+        return self.ranges.get(range_mv)
+
+
+class CalibrationStore:
+    """Каталог профилей <прибор>.json с кэшем загруженных профилей.
+
+    Поправки кэшируются по паре (прибор, диапазон), а таблица каждого
+    диапазона строится один раз, поэтому смена диапазона во время работы
+    сводится к поиску в словаре.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.profiles = {}
+
+    def profile_path(self, device):
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in device)
+        return os.path.join(self.directory, f"{safe_name}.json")
+
+    def profile(self, device):
+        """Профиль прибора, а если его нет - общий профиль по умолчанию"""
+        for key in (device, DEFAULT_DEVICE):
+            if key in self.profiles:
+                if self.profiles[key] is not None:
+                    return self.profiles[key]
+                continue
+            path = self.profile_path(key)
+            self.profiles[key] = CalibrationProfile.load(path) if os.path.exists(path) else None
+            if self.profiles[key] is not None:
+                return self.profiles[key]
+        return None
+
+    def calibration(self, device, range_mv):
+        """Поправка для прибора и диапазона или None, если калибровки нет"""
+        profile = self.profile(device)
+        return profile.for_range(range_mv) if profile is not None else None
+
+    def import_profile(self, path, device):
+        """Копирует профиль в каталог под именем прибора"""
+        profile = CalibrationProfile.load(path)
+        profile.device = device
+        os.makedirs(self.directory, exist_ok=True)
+        profile.save(self.profile_path(device))
+        self.profiles[device] = profile
+        return profile
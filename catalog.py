@@ -0,0 +1,223 @@
+"""Каталог записей в SQLite: сводки по файлам для поиска без чтения самих записей"""
+import datetime
+import os
+import re
+import sqlite3
+
+import numpy as np
+
+import recording
+
+GAP_FACTOR = 3.0  # Разрыв - интервал между отсчетами больше GAP_FACTOR минимальных
+RECORDING_NAME = re.compile(r"measurements(\d{14})\.csv$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    path TEXT PRIMARY KEY,
+    port TEXT,
+    start_time REAL,
+    end_time REAL,
+    sample_count INTEGER,
+    min_voltage REAL,
+    max_voltage REAL,
+    mean_voltage REAL,
+    gap_count INTEGER,
+    file_size INTEGER,
+    file_mtime REAL
+);
+CREATE INDEX IF NOT EXISTS recordings_start ON recordings (start_time);
+CREATE INDEX IF NOT EXISTS recordings_min ON recordings (min_voltage);
+CREATE INDEX IF NOT EXISTS recordings_max ON recordings (max_voltage);
+"""
+
+COLUMNS = ("path", "port", "start_time", "end_time", "sample_count",
+           "min_voltage", "max_voltage", "mean_voltage", "gap_count")
+
+
+class GapCounter:
+    """Считает разрывы в потоке времени, получая его пачками.
+
+    Опорный интервал - минимальный положительный шаг, встреченный к этому
+    моменту, поэтому подсчет во время записи и при сканировании файла
+    дает одинаковый результат.
+    """
+
+    def __init__(self):
+        self.last_time = None
+        self.min_step = np.inf
+        self.gaps = 0
+
+    def add(self, times):
+        times = np.asarray(times, dtype=np.float64)
+        if not len(times):
+            return
+        if self.last_time is not None:
+            times = np.concatenate(([self.last_time], times))
+        self.last_time = float(times[-1])
+        steps = np.diff(times)
+        if not len(steps):
+            return
+        # Минимум до каждого шага включительно, как если бы отсчеты шли по одному
+        positive = np.where(steps > 0, steps, np.inf)
+        running_min = np.minimum.accumulate(np.concatenate(([self.min_step], positive)))[:-1]
+        self.gaps += int(np.count_nonzero(steps > GAP_FACTOR * running_min))
+        self.min_step = min(self.min_step, float(positive.min()))
+
+
+def default_start_time(csv_path, duration):
+    """Время начала записи: из имени measurementsГГГГММДДччммсс.csv, иначе по времени изменения файла"""
+    match = RECORDING_NAME.search(os.path.basename(csv_path))
+    if match:
+        try:
+            return datetime.datetime.strptime(match.group(1), "%Y%m%d%H%M%S").timestamp()
+        except ValueError:
+            pass
+    return os.path.getmtime(csv_path) - duration
+
+
+def summarize_file(csv_path):
+    """Сводка по файлу записи одним потоковым проходом"""
+    rec = recording.open_recording(csv_path)
+    stats = recording.RecordingStats()
+    gaps = GapCounter()
+    for chunk in rec.iter_chunks():
+        stats = stats.merge(chunk.stats())
+        gaps.add(chunk.times)
+    return stats, gaps.gaps
+
+
+class RecordingCatalog:
+    """Каталог записей. Соединение привязано к потоку, в котором создан каталог"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, csv_path, count, duration, minimum, maximum, mean, gap_count, port=None, start_time=None):
+        """Добавляет или обновляет запись каталога по готовой сводке.
+
+        start_time - время первого отсчета (Unix-время); если не задано,
+        определяется по имени или времени изменения файла. Порт, известный
+        ранее, при повторном сканировании не затирается.
+        """
+        csv_path = os.path.abspath(csv_path)
+        if start_time is None:
+            start_time = default_start_time(csv_path, duration)
+        file_stat = os.stat(csv_path)
+        with self.connection:
+            self.connection.execute(
+                """
+                INSERT INTO recordings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    port = COALESCE(excluded.port, recordings.port),
+                    start_time = excluded.start_time,
+                    end_time = excluded.end_time,
+                    sample_count = excluded.sample_count,
+                    min_voltage = excluded.min_voltage,
+                    max_voltage = excluded.max_voltage,
+                    mean_voltage = excluded.mean_voltage,
+                    gap_count = excluded.gap_count,
+                    file_size = excluded.file_size,
+                    file_mtime = excluded.file_mtime
+                """,
+                (
+                    csv_path, port, start_time, start_time + duration, count,
+                    minimum, maximum, mean, gap_count, file_stat.st_size, file_stat.st_mtime,
+                ),
+            )
+
+    def add_file(self, csv_path, port=None, start_time=None):
+        """Сканирует файл и добавляет его сводку в каталог"""
+        stats, gap_count = summarize_file(csv_path)
+        if not stats.count:
+            self.add(csv_path, 0, 0.0, None, None, None, gap_count, port, start_time)
+            return
+        self.add(csv_path, stats.count, stats.duration, stats.minimum, stats.maximum, stats.mean,
+                 gap_count, port, start_time)
+
+    def rename(self, old_path, new_path):
+        with self.connection:
+            self.connection.execute("DELETE FROM recordings WHERE path = ?", (os.path.abspath(new_path),))
+            self.connection.execute(
+                "UPDATE recordings SET path = ? WHERE path = ?",
+                (os.path.abspath(new_path), os.path.abspath(old_path)),
+            )
+
+    def is_current(self, csv_path):
+        """Проверяет, что сводка в каталоге соответствует файлу на диске"""
+        row = self.connection.execute(
+            "SELECT file_size, file_mtime FROM recordings WHERE path = ?", (os.path.abspath(csv_path),)
+        ).fetchone()
+        if row is None:
+            return False
+        file_stat = os.stat(csv_path)
+        return row["file_size"] == file_stat.st_size and row["file_mtime"] == file_stat.st_mtime
+
+    def rescan(self, directories, progress=None, cancelled=None):
+        """Обновляет каталог: добавляет новые и измененные записи, удаляет пропавшие.
+
+        Возвращает число просканированных файлов.
+        """
+        known = [row["path"] for row in self.connection.execute("SELECT path FROM recordings")]
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM recordings WHERE path = ?",
+                [(path,) for path in known if not os.path.isfile(path)],
+            )
+
+        candidates = {path for path in known if os.path.isfile(path)}
+        for directory in directories:
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.endswith(".csv") and not name.endswith(recording.ALARMS_SUFFIX):
+                    candidates.add(os.path.abspath(os.path.join(directory, name)))
+
+        scanned = 0
+        candidates = sorted(candidates)
+        for i, path in enumerate(candidates):
+            if cancelled is not None and cancelled():
+                break
+            if not self.is_current(path):
+                try:
+                    self.add_file(path)
+                    scanned += 1
+                except (OSError, ValueError):
+                    pass
+            if progress is not None:
+                progress((i + 1) / len(candidates))
+        return scanned
+
+    def search(self, text="", since=None, until=None, min_below=None, max_above=None, limit=1000):
+        """Ищет записи по подстроке пути/порта, интервалу дат и пределам напряжения.
+
+        since/until - Unix-время; запись подходит, если пересекается с интервалом.
+        """
+        conditions = []
+        params = []
+        if text:
+            conditions.append("(path LIKE ? OR port LIKE ?)")
+            params += [f"%{text}%", f"%{text}%"]
+        if since is not None:
+            conditions.append("end_time >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("start_time <= ?")
+            params.append(until)
+        if min_below is not None:
+            conditions.append("min_voltage < ?")
+            params.append(min_below)
+        if max_above is not None:
+            conditions.append("max_voltage > ?")
+            params.append(max_above)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT {', '.join(COLUMNS)} FROM recordings {where} ORDER BY start_time DESC LIMIT ?"
+        return [dict(row) for row in self.connection.execute(query, params + [limit])]
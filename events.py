@@ -0,0 +1,237 @@
+"""Поиск событий в записи: пики, ступеньки, залипание сигнала и пропуски данных.
+
+Запись читается блоками (recording.iter_chunks), каждый блок проверяется
+векторно; состояние на границе блоков переносится в следующий, поэтому
+результат не зависит от размера блока. Найденные события кэшируются
+рядом с записью в <файл>.csv.events.npz.
+"""
+import json
+import os
+
+import numpy as np
+
+import recording
+
+PEAK = "peak"
+STEP = "step"
+FLAT = "flat"
+DROPOUT = "dropout"
+
+EVENT_DTYPE = np.dtype([("kind", "U8"), ("start", "<f8"), ("end", "<f8"), ("value", "<f8")])
+DROPOUT_FACTOR = 3.0  # Пропуск - интервал больше DROPOUT_FACTOR медианных, если порог не задан
+
+DEFAULT_SETTINGS = {
+    "peak_threshold": 100.0,  # Выброс относительно обоих соседних отсчетов, мВ
+    "step_threshold": 50.0,  # Разность средних до и после ступеньки, мВ
+    "step_window": 50,  # Окно усреднения для ступенек, отсчетов
+    "flat_tolerance": 0.0,  # Изменение между отсчетами, которое считается отсутствием изменений, мВ
+    "flat_duration": 1.0,  # Минимальная длительность залипания, с
+    "dropout_gap": 0.0,  # Порог пропуска данных, с (0 - по медианному интервалу)
+}
+
+
+def events_path(csv_path):
+    return csv_path + recording.EVENTS_SUFFIX
+
+
+def _runs(mask):
+    """Границы участков подряд идущих True: массивы начал и концов (конец не включается)"""
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+class EventDetector:
+    """Потоковый поиск событий: feed() для каждого блока, затем finish()"""
+
+    def __init__(self, **settings):
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.settings.update(settings)
+        self.window = max(int(self.settings["step_window"]), 1)
+        self.dropout_gap = self.settings["dropout_gap"] or None
+        self.events = []
+        # Хвост предыдущего блока, нужный окнам на границе
+        self.carry_times = np.empty(0)
+        self.carry_values = np.empty(0)
+        self.next_position = 1  # Первая непроверенная позиция в буфере
+        self.flat_start = None  # Начало незавершенного залипания (время, уровень)
+        self.open_step = None  # Незавершенная группа кандидатов ступеньки (время, разность)
+
+    def feed(self, times, values):
+        times = np.concatenate((self.carry_times, np.asarray(times, dtype=np.float64)))
+        values = np.concatenate((self.carry_values, np.asarray(values, dtype=np.float64)))
+        if self.dropout_gap is None and len(times) > 1:
+            self.dropout_gap = DROPOUT_FACTOR * float(np.median(np.diff(times)))
+
+        # Ступенькам нужно полное окно после позиции, поэтому конец буфера ждет следующего блока
+        last = len(times) - self.window
+        first = self.next_position
+        if last > first:
+            self._scan(times, values, first, last, final=False)
+            first = last
+
+        carry_start = max(0, first - self.window)
+        self.carry_times = times[carry_start:]
+        self.carry_values = values[carry_start:]
+        self.next_position = first - carry_start
+
+    def finish(self):
+        """Проверяет остаток буфера и возвращает события, упорядоченные по времени"""
+        times, values = self.carry_times, self.carry_values
+        if len(times) > self.next_position:
+            self._scan(times, values, self.next_position, len(times), final=True)
+        if self.flat_start is not None and len(times):
+            self._add_flat(self.flat_start[0], float(times[-1]), self.flat_start[1])
+            self.flat_start = None
+        if self.open_step is not None:
+            self.events.append((STEP, self.open_step[0], self.open_step[0], self.open_step[1]))
+            self.open_step = None
+        events = np.array(self.events, dtype=EVENT_DTYPE)
+        return events[np.argsort(events["start"], kind="stable")]
+
+    def _scan(self, times, values, first, last, final):
+        # Срезы вместо индексных массивов: отсчет i сравнивается с i - 1 без копий
+        steps_dt = times[first:last] - times[first - 1:last - 1]
+        delta = values[first:last] - values[first - 1:last - 1]
+
+        # Пропуски данных
+        if self.dropout_gap:
+            gaps = np.flatnonzero(steps_dt > self.dropout_gap)
+            self.events += [
+                (DROPOUT, float(times[first + i - 1]), float(times[first + i]), float(steps_dt[i]))
+                for i in gaps
+            ]
+        else:
+            gaps = np.empty(0, dtype=np.int64)
+
+        # Пики: отсчет отличается от обоих соседей в одну сторону больше порога
+        peak_positions = np.empty(0, dtype=np.int64)
+        inner_last = min(last, len(values) - 1)
+        if inner_last > first:
+            # Сначала отбираем редкие скачки относительно предыдущего отсчета, затем сверяем со следующим
+            threshold = self.settings["peak_threshold"]
+            jumps = first + np.flatnonzero(np.abs(delta[:inner_last - first]) > threshold)
+            before = delta[jumps - first]
+            after = values[jumps] - values[jumps + 1]
+            peaks = (np.sign(before) == np.sign(after)) & (np.abs(after) > threshold)
+            peak_positions = jumps[peaks]
+            self.events += [(PEAK, float(times[p]), float(times[p]), float(values[p])) for p in peak_positions]
+
+        if not final:
+            self._scan_steps(times, values, first, last, peak_positions)
+        self._scan_flat(times, values, first, delta, gaps)
+
+    def _scan_steps(self, times, values, first, last, peak_positions):
+        window = self.window
+        start = max(first, window)
+        if start >= last:
+            return
+        count = last - start
+        # Разность средних окна после позиции и окна до нее через накопленные суммы
+        sums = np.concatenate(([0.0], np.cumsum(values[start - window:last + window])))
+        diff = (sums[2 * window:2 * window + count] - 2 * sums[window:window + count] + sums[:count]) / window
+        above = np.abs(diff) > self.settings["step_threshold"]
+        run_starts, run_ends = _runs(above)
+        if self.open_step is not None and (not len(run_starts) or run_starts[0] != 0):
+            # Группа кандидатов закончилась на границе блоков
+            self.events.append((STEP, self.open_step[0], self.open_step[0], self.open_step[1]))
+            self.open_step = None
+
+        for run_start, run_end in zip(run_starts, run_ends):
+            best = run_start + int(np.argmax(np.abs(diff[run_start:run_end])))
+            best_time, best_diff = float(times[start + best]), float(diff[best])
+            if run_start == 0 and self.open_step is not None:
+                # Продолжение группы из предыдущего блока
+                if abs(self.open_step[1]) > abs(best_diff):
+                    best_time, best_diff = self.open_step
+                self.open_step = None
+            if run_end == count:
+                self.open_step = (best_time, best_diff)
+                continue
+            # Одиночный выброс тоже сдвигает средние; такие группы ступеньками не считаем
+            lo = np.searchsorted(peak_positions, start + run_start - window)
+            hi = np.searchsorted(peak_positions, start + run_end - 1 + window, side="right")
+            if hi > lo:
+                continue
+            self.events.append((STEP, best_time, best_time, best_diff))
+
+    def _scan_flat(self, times, values, first, delta, gaps):
+        flat = np.abs(delta) <= self.settings["flat_tolerance"]
+        flat[gaps] = False  # Пропуск данных прерывает залипание
+        run_starts, run_ends = _runs(flat)
+        if self.flat_start is not None and (not len(run_starts) or run_starts[0] != 0):
+            # Залипание закончилось на границе блоков
+            self._add_flat(self.flat_start[0], float(times[first - 1]), self.flat_start[1])
+            self.flat_start = None
+        for run_start, run_end in zip(run_starts, run_ends):
+            if run_start == 0 and self.flat_start is not None:
+                start_time, level = self.flat_start
+                self.flat_start = None
+            else:
+                start_time, level = float(times[first + run_start - 1]), float(values[first + run_start])
+            if run_end == len(flat):
+                self.flat_start = (start_time, level)
+                continue
+            self._add_flat(start_time, float(times[first + run_end - 1]), level)
+
+    def _add_flat(self, start, end, level):
+        if end - start >= self.settings["flat_duration"]:
+            self.events.append((FLAT, start, end, level))
+
+
+def detect_events(csv_path, progress=None, cancelled=None, chunk_bytes=recording.SCAN_CHUNK_SIZE, **settings):
+    """Ищет события во всей записи одним потоковым проходом"""
+    rec = recording.open_recording(csv_path)
+    duration = rec.end_time or 0.0
+    detector = EventDetector(**settings)
+    for chunk in rec.iter_chunks(chunk_bytes):
+        if cancelled is not None and cancelled():
+            return None
+        detector.feed(chunk.times, chunk.voltages)
+        if progress is not None and duration > 0:
+            progress(min(chunk.times[-1] / duration, 1.0))
+    return detector.finish()
+
+
+def _cache_key(csv_path, settings):
+    file_stat = os.stat(csv_path)
+    return json.dumps({"size": file_stat.st_size, "mtime": file_stat.st_mtime, "settings": settings},
+                      sort_keys=True)
+
+
+def load_cached_events(csv_path, **settings):
+    """События из кэша, если он построен для этого же файла и настроек, иначе None"""
+    full_settings = dict(DEFAULT_SETTINGS)
+    full_settings.update(settings)
+    try:
+        with np.load(events_path(csv_path)) as cached:
+            if str(cached["key"]) != _cache_key(csv_path, full_settings):
+                return None
+            return cached["events"]
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def save_events(csv_path, events, **settings):
+    """Сохраняет события; если каталог недоступен для записи, кэш не создается"""
+    full_settings = dict(DEFAULT_SETTINGS)
+    full_settings.update(settings)
+    path = events_path(csv_path)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, events=events, key=np.array(_cache_key(csv_path, full_settings)))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def find_events(csv_path, progress=None, cancelled=None, **settings):
+    """События записи из кэша или, если его нет, новым проходом с сохранением в кэш"""
+    events = load_cached_events(csv_path, **settings)
+    if events is not None:
+        return events
+    events = detect_events(csv_path, progress, cancelled, **settings)
+    if events is not None:
+        save_events(csv_path, events, **settings)
+    return events
@@ -0,0 +1,250 @@
+"""Потоковый экспорт записей в NumPy (.npy/.npz) и WAV без загрузки файла целиком.
+
+Использование из командной строки:
+
+    python export.py measurements.csv measurements.npy
+    python export.py measurements.csv measurements.wav --rate 100
+"""
+import argparse
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import wave
+import zipfile
+
+import numpy as np
+
+import recording
+from models import VoltageRange
+
+FORMATS = ("npy", "npz", "wav")
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_SIZE = 128  # Заголовок фиксированной длины, чтобы дописать размер в конце
+CHUNK_BYTES = 4 * 1024 * 1024
+WAV_FULL_SCALE = VoltageRange.RANGES[0]  # мВ, соответствует полной шкале int16
+
+
+class ExportCancelled(Exception):
+    """Экспорт прерван пользователем"""
+
+
+def npy_header(shape, descr="<f8"):
+    """Заголовок .npy версии 1.0 фиксированной длины NPY_HEADER_SIZE"""
+    header = repr({"descr": descr, "fortran_order": False, "shape": shape})
+    header = header.ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - 1) + "\n"
+    return NPY_MAGIC + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+class NpyWriter:
+    """Дописывает строки в .npy; число строк фиксируется в заголовке при закрытии"""
+
+    def __init__(self, path, columns=None):
+        self.path = path
+        self.columns = columns
+        self.rows = 0
+        self.file = open(path, "wb")
+        self.file.write(npy_header(self.shape()))
+
+    def shape(self):
+        return (self.rows,) if self.columns is None else (self.rows, self.columns)
+
+    def write(self, array):
+        self.file.write(np.ascontiguousarray(array, dtype="<f8").tobytes())
+        self.rows += len(array)
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(npy_header(self.shape()))
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.path)
+
+
+class NpzWriter:
+    """Пишет time.npy и voltage.npy во временные файлы и упаковывает их в архив .npz"""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)))
+        self.time_writer = NpyWriter(os.path.join(self.tmp_dir, "time.npy"))
+        self.voltage_writer = NpyWriter(os.path.join(self.tmp_dir, "voltage.npy"))
+
+    def write(self, times, voltages):
+        self.time_writer.write(times)
+        self.voltage_writer.write(voltages)
+
+    def close(self):
+        self.time_writer.close()
+        self.voltage_writer.close()
+        # zipfile копирует члены архива блоками, память не растет
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for writer, name in ((self.time_writer, "time.npy"), (self.voltage_writer, "voltage.npy")):
+                archive.write(writer.path, name)
+                os.remove(writer.path)
+        os.rmdir(self.tmp_dir)
+
+    def abort(self):
+        self.time_writer.file.close()
+        self.voltage_writer.file.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+class WavWriter:
+    """Моно WAV 16 бит; напряжение full_scale мВ соответствует максимуму int16"""
+
+    def __init__(self, path, rate, full_scale=WAV_FULL_SCALE):
+        self.path = path
+        self.scale = 32767 / full_scale
+        self.file = wave.open(path, "wb")
+        self.file.setnchannels(1)
+        self.file.setsampwidth(2)
+        self.file.setframerate(int(round(rate)))
+
+    def write(self, voltages):
+        samples = np.clip(np.round(voltages * self.scale), -32768, 32767).astype("<i2")
+        self.file.writeframes(samples.tobytes())
+
+    def close(self):
+        # wave сам дописывает число кадров в заголовок при закрытии
+        self.file.close()
+
+    def abort(self):
+        self.file.close()
+        os.remove(self.path)
+
+
+class UniformResampler:
+    """Потоковая линейная интерполяция на равномерную сетку с частотой rate, Гц"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.origin = None
+        self.next_index = 0
+        self.last_time = None
+        self.last_value = None
+
+    def feed(self, times, values):
+        if not len(times):
+            return np.empty(0), np.empty(0)
+        if self.origin is None:
+            self.origin = times[0]
+        elif self.last_time is not None:
+            # Последний отсчет прошлого блока связывает интерполяцию через границу блоков
+            times = np.concatenate(([self.last_time], times))
+            values = np.concatenate(([self.last_value], values))
+        self.last_time = times[-1]
+        self.last_value = values[-1]
+
+        last_index = int(np.floor((times[-1] - self.origin) * self.rate + 1e-9))
+        if last_index < self.next_index:
+            return np.empty(0), np.empty(0)
+        # Узлы сетки считаются от индекса, чтобы не накапливать ошибку округления
+        grid = self.origin + np.arange(self.next_index, last_index + 1) / self.rate
+        self.next_index = last_index + 1
+        return grid, np.interp(grid, times, values)
+
+
+def estimate_rate(times):
+    """Оценивает частоту дискретизации по медианному интервалу между отсчетами"""
+    intervals = np.diff(times)
+    intervals = intervals[intervals > 0]
+    if not len(intervals):
+        return None
+    return 1.0 / float(np.median(intervals))
+
+
+def export_recording(src, dst, fmt=None, rate=None, chunk_bytes=CHUNK_BYTES, progress=None, cancelled=None):
+    """Экспортирует запись блоками с постоянным расходом памяти.
+
+    fmt - "npy", "npz" или "wav" (по умолчанию по расширению dst);
+    rate - частота равномерной сетки, Гц (None - без передискретизации,
+    для WAV оценивается по данным); progress(доля) вызывается после
+    каждого блока; cancelled() возвращает True, чтобы прервать экспорт.
+    Данные пишутся во временный <dst>.part, который заменяет dst только
+    после успешного завершения; при ошибке или отмене он удаляется.
+    Возвращает число записанных отсчетов.
+    """
+    fmt = fmt or os.path.splitext(dst)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат экспорта: {fmt}")
+    duration = recording.read_last_time(src) or 0.0
+
+    chunks = recording.iter_chunks(src, chunk_bytes)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError("Файл не содержит данных")
+    if fmt == "wav" and rate is None:
+        rate = estimate_rate(first[0])
+        if rate is None:
+            raise ValueError("Не удалось определить частоту дискретизации для WAV")
+
+    resampler = UniformResampler(rate) if rate else None
+    tmp_path = dst + ".part"
+    if fmt == "npy":
+        writer = NpyWriter(tmp_path, columns=2)
+    elif fmt == "npz":
+        writer = NpzWriter(tmp_path)
+    else:
+        writer = WavWriter(tmp_path, rate)
+
+    written = 0
+    try:
+        for chunk_times, chunk_voltages in _prepend(first, chunks):
+            if cancelled is not None and cancelled():
+                raise ExportCancelled()
+            if resampler is not None:
+                chunk_times, chunk_voltages = resampler.feed(chunk_times, chunk_voltages)
+            if fmt == "npy":
+                writer.write(np.column_stack((chunk_times, chunk_voltages)))
+            elif fmt == "npz":
+                writer.write(chunk_times, chunk_voltages)
+            else:
+                writer.write(chunk_voltages)
+            written += len(chunk_times)
+            if progress is not None and duration > 0 and len(chunk_times):
+                progress(min(chunk_times[-1] / duration, 1.0))
+        writer.close()
+        os.replace(tmp_path, dst)
+    except BaseException:
+        # Недописанный файл не должен выглядеть как готовый результат
+        try:
+            writer.abort()
+        except OSError:
+            pass
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+def _prepend(first, chunks):
+    yield first
+    yield from chunks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Потоковый экспорт записи Serial Voltmeter")
+    parser.add_argument("src", help="Исходный CSV-файл записи")
+    parser.add_argument("dst", help="Файл назначения (.npy, .npz или .wav)")
+    parser.add_argument("--format", choices=FORMATS, help="Формат (по умолчанию по расширению)")
+    parser.add_argument("--rate", type=float, help="Передискретизация на равномерную сетку, Гц")
+    args = parser.parse_args(argv)
+
+    def report(fraction):
+        print(f"\r{fraction * 100:5.1f}%", end="", flush=True)
+
+    try:
+        count = export_recording(args.src, args.dst, args.format, args.rate, progress=report)
+    except (OSError, ValueError) as e:
+        print(f"\nОШИБКА: {e}", file=sys.stderr)
+        return 1
+    print(f"\nЭкспортировано отсчетов: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""Завершение записи: перенос файла под итоговое имя без копирования данных"""
+import errno
+import os
+import shutil
+
+import recording
+
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def move_sidecars(src, dst):
+    """Переносит служебные файлы записи (индекс и т.п.) вслед за основным файлом"""
+    for suffix in recording.SIDECAR_SUFFIXES:
+        if os.path.exists(src + suffix):
+            shutil.move(src + suffix, dst + suffix)
+
+
+def move_recording(src, dst):
+    """Переносит запись под итоговое имя без копирования данных.
+
+    На той же файловой системе выполняется атомарное переименование.
+    Возвращает False, если dst на другой файловой системе: тогда остается
+    только полное копирование (см. copy_recording).
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        return False
+    move_sidecars(src, dst)
+    return True
+
+
+def copy_recording(src, dst, progress=None):
+    """Копирует запись блоками с отчетом о прогрессе и удаляет исходный файл"""
+    total = os.path.getsize(src)
+    copied = 0
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        while True:
+            chunk = src_file.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            dst_file.write(chunk)
+            copied += len(chunk)
+            if progress is not None and total:
+                progress(copied / total)
+    shutil.copystat(src, dst)
+    os.remove(src)
+    move_sidecars(src, dst)
@@ -0,0 +1,276 @@
+"""Встроенное инструментирование горячего пути: таймеры стадий, очереди, потери отсчетов"""
+import json
+import os
+import time
+from collections import deque
+
+STAGES = ("parse", "calibrate", "alarms", "filter", "write", "render")
+# Границы корзин гистограммы времени кадра, мс
+FRAME_BINS_MS = (5, 10, 20, 50, 100, 200)
+
+
+class _NullTimer:
+    """Пустой контекстный менеджер для выключенного инструментирования"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class StageTimer:
+    """Накопительный таймер одной стадии обработки"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.add(time.perf_counter() - self._started)
+        return False
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def as_dict(self):
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "calls": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(mean * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class FrameHistogram:
+    """Гистограмма длительности отрисовки кадров"""
+
+    def __init__(self, bins_ms=FRAME_BINS_MS):
+        self.bins_ms = bins_ms
+        self.counts = [0] * (len(bins_ms) + 1)
+
+    def add(self, elapsed):
+        elapsed_ms = elapsed * 1000
+        for i, bound in enumerate(self.bins_ms):
+            if elapsed_ms < bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def as_dict(self):
+        labels = []
+        lower = 0
+        for bound in self.bins_ms:
+            labels.append(f"{lower}-{bound} мс")
+            lower = bound
+        labels.append(f">{lower} мс")
+        return dict(zip(labels, self.counts))
+
+
+class SequenceMonitor:
+    """Отслеживает пропуски и дубликаты по последовательности millis прибора.
+
+    Ожидаемый период оценивается медианой последних интервалов, поэтому
+    монитор подстраивается под частоту отправки прибора без настройки.
+    Если прибор надолго замедлился, RETRAIN_RUN подряд «пропусков» с
+    одинаковым интервалом считаются новым периодом: история интервалов
+    начинается заново, а эти «пропуски» из счетчиков вычитаются.
+    """
+
+    GAP_FACTOR = 1.5
+    RETRAIN_RUN = 8
+
+    def __init__(self, history=101):
+        self.last_millis = None
+        self.intervals = deque(maxlen=history)
+        self.gap_run = []  # Подряд идущие пропуски: (интервал, потерянные отсчеты)
+        self.gaps = 0
+        self.lost_samples = 0
+        self.duplicates = 0
+        self.resets = 0
+
+    def expected_interval(self):
+        if not self.intervals:
+            return None
+        ordered = sorted(self.intervals)
+        return ordered[len(ordered) // 2]
+
+    def observe(self, millis_values):
+        for millis in millis_values:
+            last = self.last_millis
+            self.last_millis = millis
+            if last is None:
+                continue
+            delta = millis - last
+            if delta == 0:
+                self.duplicates += 1
+                continue
+            if delta < 0:
+                # Время ушло назад - прибор перезагрузился
+                self.resets += 1
+                self.gap_run.clear()
+                continue
+            expected = self.expected_interval()
+            if expected and delta > expected * self.GAP_FACTOR:
+                lost = max(round(delta / expected) - 1, 1)
+                self.gaps += 1
+                self.lost_samples += lost
+                self.observe_gap(delta, lost)
+            else:
+                self.gap_run.clear()
+                self.intervals.append(delta)
+
+    def observe_gap(self, delta, lost):
+        """Переобучает период, если пропуски идут подряд с одинаковым интервалом"""
+        if self.gap_run and not self.similar(self.gap_run[0][0], delta):
+            self.gap_run.clear()
+        self.gap_run.append((delta, lost))
+        if len(self.gap_run) < self.RETRAIN_RUN:
+            return
+        self.gaps -= len(self.gap_run)
+        self.lost_samples -= sum(run_lost for _, run_lost in self.gap_run)
+        self.intervals.clear()
+        self.intervals.extend(run_delta for run_delta, _ in self.gap_run)
+        self.gap_run.clear()
+
+    def similar(self, first, second):
+        return max(first, second) <= min(first, second) * self.GAP_FACTOR
+
+    def as_dict(self):
+        return {
+            "expected_interval_ms": self.expected_interval(),
+            "gaps": self.gaps,
+            "lost_samples": self.lost_samples,
+            "duplicates": self.duplicates,
+            "resets": self.resets,
+        }
+
+
+class Instrumentation:
+    """Сборщик метрик горячего пути.
+
+    При выключенном состоянии stage() возвращает общий пустой контекстный
+    менеджер, а остальные методы сразу возвращаются, так что накладные
+    расходы сводятся к проверке флага.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.stages = {name: StageTimer() for name in STAGES}
+        self.frames = FrameHistogram()
+        self.sequence = SequenceMonitor()
+        self.queue_depths = {}
+        self.alarm_latency = None  # (последняя, максимальная) задержка проверки пределов, с
+        self.total_bytes = 0
+        self.bytes_per_second = 0.0
+        self._tick_bytes = 0
+        self._tick_time = time.monotonic()
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_TIMER
+        return self.stages[name]
+
+    def add_bytes(self, count):
+        if self.enabled:
+            self.total_bytes += count
+
+    def set_queue_depth(self, name, depth):
+        if self.enabled:
+            self.queue_depths[name] = depth
+
+    def set_alarm_latency(self, last, maximum):
+        """Задержка AlarmEngine.process: только проверка правил, без подготовки пачки"""
+        if self.enabled:
+            self.alarm_latency = (last, maximum)
+
+    def add_frame(self, elapsed):
+        """Учитывает отрисованный кадр в стадии render и в гистограмме"""
+        if self.enabled:
+            self.stages["render"].add(elapsed)
+            self.frames.add(elapsed)
+
+    def observe_millis(self, millis_values):
+        if self.enabled:
+            self.sequence.observe(millis_values)
+
+    def tick(self):
+        """Обновляет скоростные метрики; вызывается периодически (раз в секунду)"""
+        now = time.monotonic()
+        elapsed = now - self._tick_time
+        if elapsed > 0:
+            self.bytes_per_second = (self.total_bytes - self._tick_bytes) / elapsed
+        self._tick_bytes = self.total_bytes
+        self._tick_time = now
+
+    def snapshot(self):
+        return {
+            "timestamp": time.time(),
+            "enabled": self.enabled,
+            "stages": {name: timer.as_dict() for name, timer in self.stages.items()},
+            "queue_depths": dict(self.queue_depths),
+            "serial_bytes_total": self.total_bytes,
+            "serial_bytes_per_second": round(self.bytes_per_second, 1),
+            "frame_time_histogram": self.frames.as_dict(),
+            "sequence": self.sequence.as_dict(),
+            "alarm_latency": None if self.alarm_latency is None else {
+                "last_ms": round(self.alarm_latency[0] * 1000, 3),
+                "max_ms": round(self.alarm_latency[1] * 1000, 3),
+            },
+        }
+
+    def dump_json(self, path):
+        """Атомарно записывает снимок метрик в JSON-файл"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def format_text(self):
+        """Человекочитаемое представление снимка для панели статистики"""
+        snapshot = self.snapshot()
+        lines = ["Стадии обработки:"]
+        for name, stage in snapshot["stages"].items():
+            lines.append(
+                f"  {name}: вызовов {stage['calls']}, среднее {stage['mean_ms']:.3f} мс, "
+                f"макс. {stage['max_ms']:.3f} мс, всего {stage['total_ms']:.1f} мс"
+            )
+        lines.append("Очереди:")
+        for name, depth in snapshot["queue_depths"].items():
+            lines.append(f"  {name}: {depth}")
+        lines.append(
+            f"Последовательный порт: {snapshot['serial_bytes_per_second']:.0f} байт/с "
+            f"(всего {snapshot['serial_bytes_total']} байт)"
+        )
+        lines.append("Время отрисовки кадра:")
+        for label, count in snapshot["frame_time_histogram"].items():
+            lines.append(f"  {label}: {count}")
+        sequence = snapshot["sequence"]
+        lines.append(
+            f"Последовательность millis: период {sequence['expected_interval_ms']} мс, "
+            f"пропусков {sequence['gaps']} (~{sequence['lost_samples']} отсчетов), "
+            f"дубликатов {sequence['duplicates']}, перезапусков {sequence['resets']}"
+        )
+        alarm_latency = snapshot["alarm_latency"]
+        if alarm_latency is not None:
+            lines.append(
+                f"Проверка пределов: последняя {alarm_latency['last_ms']:.3f} мс, "
+                f"макс. {alarm_latency['max_ms']:.3f} мс"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,83 @@
+"""Инкрементальная агрегация всей сессии записи для обзорного графика"""
+import numpy as np
+
+
+class OverviewAggregator:
+    """Хранит min/max/среднее по корзинам времени для всей сессии.
+
+    Корзины фиксированной ширины заполняются по мере поступления пачек.
+    Когда сессия перестает помещаться в max_buckets корзин, соседние
+    корзины попарно сливаются, а ширина удваивается, так что память
+    ограничена max_buckets независимо от длительности записи.
+    """
+
+    def __init__(self, max_buckets=4096, initial_width=0.05):
+        self.max_buckets = max_buckets
+        self.initial_width = initial_width
+        self.reset()
+
+    def reset(self):
+        self.width = self.initial_width  # Ширина корзины, с
+        self.origin = None
+        self.used = 0  # Число корзин от начала до последней заполненной
+        self.mins = np.full(self.max_buckets, np.inf)
+        self.maxs = np.full(self.max_buckets, -np.inf)
+        self.sums = np.zeros(self.max_buckets)
+        self.counts = np.zeros(self.max_buckets, dtype=np.int64)
+
+    def add(self, times, values):
+        """Добавляет пачку отсчетов (массивы времени и напряжения)"""
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if not len(times):
+            return
+        if self.origin is None:
+            self.origin = times[0]
+
+        last = int((times[-1] - self.origin) // self.width)
+        while last >= self.max_buckets:
+            self.merge()
+            last = int((times[-1] - self.origin) // self.width)
+
+        indices = ((times - self.origin) // self.width).astype(np.int64)
+        np.clip(indices, 0, self.max_buckets - 1, out=indices)
+        np.minimum.at(self.mins, indices, values)
+        np.maximum.at(self.maxs, indices, values)
+        np.add.at(self.sums, indices, values)
+        np.add.at(self.counts, indices, 1)
+        self.used = max(self.used, last + 1)
+
+    def merge(self):
+        """Сливает соседние корзины попарно и удваивает их ширину"""
+        half = self.max_buckets // 2
+        self.mins[:half] = np.minimum(self.mins[0::2], self.mins[1::2])
+        self.maxs[:half] = np.maximum(self.maxs[0::2], self.maxs[1::2])
+        self.sums[:half] = self.sums[0::2] + self.sums[1::2]
+        self.counts[:half] = self.counts[0::2] + self.counts[1::2]
+        self.mins[half:] = np.inf
+        self.maxs[half:] = -np.inf
+        self.sums[half:] = 0
+        self.counts[half:] = 0
+        self.used = (self.used + 1) // 2
+        self.width *= 2
+
+    def buckets(self):
+        """Возвращает (начало корзины, min, max, среднее) для непустых корзин"""
+        counts = self.counts[:self.used]
+        filled = counts > 0
+        starts = self.origin + np.flatnonzero(filled) * self.width if self.origin is not None else np.empty(0)
+        means = self.sums[:self.used][filled] / counts[filled]
+        return starts, self.mins[:self.used][filled], self.maxs[:self.used][filled], means
+
+    def summary(self):
+        """Сводка по всей сессии: (min, max, среднее, число отсчетов) или None"""
+        counts = self.counts[:self.used]
+        total = int(counts.sum())
+        if not total:
+            return None
+        return (
+            float(self.mins[:self.used].min()),
+            float(self.maxs[:self.used].max()),
+            float(self.sums[:self.used].sum() / total),
+            total,
+        )
@@ -0,0 +1,127 @@
+"""Параллельный поиск вольтметра среди доступных последовательных портов"""
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import serial
+import serial.tools.list_ports
+
+BAUD_RATE = 115200
+# Arduino перезагружается при открытии порта, поэтому таймаут учитывает загрузчик
+PROBE_TIMEOUT = 2.5  # с
+IDENT_REQUEST = b'?\n'
+IDENT_REPLY = b'SerialVoltmeter'
+IDENT_INTERVAL = 0.5  # с, период повтора запроса идентификации
+VALID_LINES_REQUIRED = 3  # Сколько строк millis,voltage подряд считаем признаком прибора
+
+SAMPLE_LINE_RE = re.compile(rb'^\s*(\d+),(-?\d+(?:\.\d+)?)\s*$')
+
+
+def probe_port(device, timeout=PROBE_TIMEOUT, stop_event=None):
+    """Проверяет, что на порту отвечает вольтметр.
+
+    Порт считается подходящим, если прибор ответил на запрос идентификации
+    или прислал несколько строк формата millis,voltage с растущим временем.
+    """
+    deadline = time.monotonic() + timeout
+    try:
+        port = serial.Serial(device, BAUD_RATE, timeout=0.1, write_timeout=0.1)
+    except (serial.SerialException, OSError, ValueError):
+        return False
+
+    try:
+        valid_lines = 0
+        last_millis = None
+        last_ident = 0.0
+        while time.monotonic() < deadline:
+            if stop_event is not None and stop_event.is_set():
+                return False
+
+            # Периодически повторяем запрос: первые байты теряются, пока работает загрузчик
+            now = time.monotonic()
+            if now - last_ident >= IDENT_INTERVAL:
+                try:
+                    port.write(IDENT_REQUEST)
+                except (serial.SerialException, OSError):
+                    pass
+                last_ident = now
+
+            line = port.readline()
+            if not line:
+                continue
+            if IDENT_REPLY in line:
+                return True
+
+            match = SAMPLE_LINE_RE.match(line)
+            if not match:
+                valid_lines = 0
+                last_millis = None
+                continue
+            millis = int(match.group(1))
+            if last_millis is not None and millis <= last_millis:
+                valid_lines = 0
+            last_millis = millis
+            valid_lines += 1
+            if valid_lines >= VALID_LINES_REQUIRED:
+                return True
+        return False
+    except (serial.SerialException, OSError):
+        return False
+    finally:
+        try:
+            port.close()
+        except (serial.SerialException, OSError):
+            pass
+
+
+def find_device(ports, timeout=PROBE_TIMEOUT):
+    """Параллельно проверяет порты и возвращает первый, на котором найден прибор.
+
+    ports - список объектов serial.tools.list_ports.ListPortInfo.
+    Возвращает ListPortInfo найденного порта или None.
+    """
+    if not ports:
+        return None
+
+    stop_event = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+        futures = {
+            executor.submit(probe_port, port.device, timeout, stop_event): port
+            for port in ports
+        }
+        for future in as_completed(futures):
+            if future.result():
+                # Останавливаем остальные проверки, не дожидаясь их таймаута
+                stop_event.set()
+                return futures[future]
+    return None
+
+
+def device_key(port):
+    """Возвращает идентификатор USB-устройства (VID, PID, серийный номер) для кэша"""
+    if port.vid is None or port.pid is None:
+        return None
+    return {
+        "vid": port.vid,
+        "pid": port.pid,
+        "serial_number": port.serial_number or "",
+    }
+
+
+def device_id(port):
+    """Строковый идентификатор прибора (VID:PID:серийный номер) для профилей калибровки"""
+    key = device_key(port)
+    if key is None:
+        return None
+    return f"{key['vid']:04X}:{key['pid']:04X}:{key['serial_number']}"
+
+
+def find_cached_port(ports, key):
+    """Ищет среди портов устройство с сохраненными VID/PID и серийным номером"""
+    if not key:
+        return None
+    for port in ports:
+        if device_key(port) == key:
+            return port
+    return None
@@ -0,0 +1,657 @@
+"""Работа с файлами записей: формат CSV, запись и индекс смещений для быстрого доступа по времени.
+
+Модуль не зависит от Qt и matplotlib; для скриптов и блокнотов точка входа -
+open_recording().
+"""
+import io
+import os
+import struct
+
+import numpy as np
+
+CSV_HEADER = "time,voltage\n"
+
+# Индекс хранится рядом с записью: <файл>.csv.idx
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"SVIDX1\0\0"
+INDEX_HEADER = struct.Struct("<8sII")  # сигнатура, шаг по строкам, резерв
+INDEX_DTYPE = np.dtype([("time", "<f8"), ("offset", "<u8")])
+DEFAULT_INDEX_STRIDE = 1000  # Каждая N-я строка попадает в индекс
+
+ALARMS_SUFFIX = ".alarms.csv"  # Журнал тревог контроля пределов
+EVENTS_SUFFIX = ".events.npz"  # Кэш найденных событий (см. events.py)
+
+# Двоичная копия столбцов, которую RecordingWriter ведет по запросу
+# (columns=True): <файл>.csv.cols. Потоковые проходы по записи (события, каталог, экспорт) читают ее вместо
+# разбора CSV; строки, дописанные после нее, разбираются из CSV как обычно.
+COLUMNS_SUFFIX = ".cols"
+COLUMNS_MAGIC = b"SVCOL1\0\0"
+COLUMNS_HEADER = struct.Struct("<8sQQ")  # сигнатура, число строк, покрытые байты CSV
+COLUMNS_DTYPE = np.dtype([("time", "<f8"), ("voltage", "<f8")])
+
+# Служебные файлы рядом с записью, которые переносятся вместе с ней
+SIDECAR_SUFFIXES = [INDEX_SUFFIX, ALARMS_SUFFIX, EVENTS_SUFFIX, COLUMNS_SUFFIX]
+
+SCAN_CHUNK_SIZE = 16 * 1024 * 1024  # Размер блока при построении индекса, байт
+
+
+def index_path(csv_path):
+    """Путь к файлу индекса для записи"""
+    return csv_path + INDEX_SUFFIX
+
+
+def columns_path(csv_path):
+    return csv_path + COLUMNS_SUFFIX
+
+
+_pandas_module = None
+
+
+def _pandas():
+    """pandas загружается при первом разборе блока, а не при импорте модуля:
+    импорт pandas втрое замедляет запуск. Без pandas блоки разбирает numpy.loadtxt
+    """
+    global _pandas_module
+    if _pandas_module is None:
+        try:
+            import pandas
+        except ImportError:
+            pandas = False
+        _pandas_module = pandas
+    return _pandas_module or None
+
+
+def parse_block(data):
+    """Разбирает блок строк CSV в массивы времени и напряжения.
+
+    Блок должен состоять из целых строк; строка заголовка и строки
+    с ошибками пропускаются.
+    """
+    if data.startswith(b"time"):
+        newline = data.find(b"\n")
+        data = data[newline + 1:] if newline >= 0 else b""
+    if not data.strip():
+        return np.empty(0), np.empty(0)
+
+    pd = _pandas()
+    if pd is not None:
+        # Быстрый путь: C-парсер pandas
+        try:
+            values = pd.read_csv(io.BytesIO(data), header=None, usecols=(0, 1), dtype=np.float64,
+                                 engine="c").to_numpy()
+        except ValueError:
+            values = None
+        # Неполные строки pandas дополняет NaN; их отбрасывает медленный путь
+        if values is not None and not np.isnan(values).any():
+            return values[:, 0], values[:, 1]
+
+    try:
+        values = np.loadtxt(io.BytesIO(data), delimiter=",", usecols=(0, 1), ndmin=2)
+    except ValueError:
+        # Медленный путь: в блоке есть испорченные строки
+        rows = []
+        for line in data.splitlines():
+            parts = line.split(b",")
+            if len(parts) < 2:
+                continue
+            try:
+                rows.append((float(parts[0]), float(parts[1])))
+            except ValueError:
+                pass
+        values = np.array(rows, dtype=np.float64).reshape(-1, 2)
+    return values[:, 0], values[:, 1]
+
+
+def read_last_time(csv_path):
+    """Возвращает время последней полной строки записи или None"""
+    size = os.path.getsize(csv_path)
+    with open(csv_path, "rb") as f:
+        f.seek(max(0, size - 256))
+        tail = f.read()
+    for line in reversed(tail.splitlines()):
+        parts = line.split(b",")
+        if len(parts) < 2:
+            continue
+        try:
+            return float(parts[0])
+        except ValueError:
+            continue
+    return None
+
+
+class RecordingWriter:
+    """Записывает CSV и по ходу записи пополняет индекс смещений.
+
+    Файл открывается с newline="", чтобы смещения в индексе совпадали
+    с байтами на диске на любой платформе. С columns=True дополнительно
+    ведется двоичная копия столбцов (.cols) - это вдвое больше записи
+    на диск, но последующий анализ записи не разбирает CSV.
+    """
+
+    def __init__(self, csv_path, stride=DEFAULT_INDEX_STRIDE, columns=False):
+        self.path = csv_path
+        self.stride = stride
+        self.file = open(csv_path, "w", newline="")
+        self.file.write(CSV_HEADER)
+        self.file.flush()
+        self.offset = len(CSV_HEADER)
+        self.rows_written = 0
+        self.index_file = open(index_path(csv_path), "wb")
+        self.index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, stride, 0))
+        self.index_file.flush()
+        self.columns_file = None
+        if columns:
+            self.columns_file = open(columns_path(csv_path), "w+b")
+            self.columns_file.write(COLUMNS_HEADER.pack(COLUMNS_MAGIC, 0, self.offset))
+            self.columns_file.flush()
+        else:
+            # Копия от прежней записи с тем же именем не должна подменить новую
+            try:
+                os.remove(columns_path(csv_path))
+            except FileNotFoundError:
+                pass
+
+    def write_rows(self, rows):
+        """Записывает пачку строк (время, напряжение) и сбрасывает буферы"""
+        lines = []
+        entries = []
+        pairs = []
+        for time_val, voltage in rows:
+            line = f"{time_val},{voltage}\n"
+            if self.rows_written % self.stride == 0:
+                entries.append((time_val, self.offset))
+            lines.append(line)
+            if self.columns_file is not None:
+                pairs.append((time_val, voltage))
+            self.offset += len(line)
+            self.rows_written += 1
+
+        self.file.write("".join(lines))
+        self.file.flush()
+        if entries:
+            self.index_file.write(np.array(entries, dtype=INDEX_DTYPE).tobytes())
+            self.index_file.flush()
+        if self.columns_file is not None:
+            # Заголовок обновляется после данных: он описывает только уже записанные строки
+            self.columns_file.write(np.array(pairs, dtype=COLUMNS_DTYPE).tobytes())
+            self.columns_file.seek(0)
+            self.columns_file.write(COLUMNS_HEADER.pack(COLUMNS_MAGIC, self.rows_written, self.offset))
+            self.columns_file.seek(0, os.SEEK_END)
+            self.columns_file.flush()
+
+    def close(self):
+        self.file.close()
+        self.index_file.close()
+        if self.columns_file is not None:
+            self.columns_file.close()
+
+
+def load_columns_header(csv_path):
+    """Число строк и покрытые байты CSV из двоичной копии столбцов или None.
+
+    Копия принимается, только если ее последняя строка совпадает с той же
+    строкой CSV (файл не подменен и не укорочен).
+    """
+    try:
+        with open(columns_path(csv_path), "rb") as f:
+            magic, rows, csv_bytes = COLUMNS_HEADER.unpack(f.read(COLUMNS_HEADER.size))
+            if magic != COLUMNS_MAGIC or not rows:
+                return None
+            f.seek(COLUMNS_HEADER.size + (rows - 1) * COLUMNS_DTYPE.itemsize)
+            last = np.frombuffer(f.read(COLUMNS_DTYPE.itemsize), dtype=COLUMNS_DTYPE)
+        if len(last) != 1 or csv_bytes > os.path.getsize(csv_path):
+            return None
+        with open(csv_path, "rb") as f:
+            f.seek(max(0, csv_bytes - 64))
+            tail = f.read(csv_bytes - max(0, csv_bytes - 64))
+    except (OSError, struct.error):
+        return None
+    if not tail.endswith(b"\n"):
+        return None
+    parts = tail[:-1].rsplit(b"\n", 1)[-1].split(b",")
+    try:
+        if float(parts[0]) != last["time"][0]:
+            return None
+    except (ValueError, IndexError):
+        return None
+    return rows, csv_bytes
+
+
+def iter_columns(csv_path, rows, chunk_rows):
+    """Читает первые rows строк двоичной копии столбцов блоками по chunk_rows"""
+    with open(columns_path(csv_path), "rb") as f:
+        f.seek(COLUMNS_HEADER.size)
+        while rows > 0:
+            block = np.fromfile(f, dtype=COLUMNS_DTYPE, count=min(chunk_rows, rows))
+            if not len(block):
+                break
+            rows -= len(block)
+            yield block["time"], block["voltage"]
+
+
+class RecordingIndex:
+    """Разреженный индекс «время -> смещение в байтах» для файла записи"""
+
+    def __init__(self, csv_path, entries, stride):
+        self.csv_path = csv_path
+        self.entries = entries
+        self.stride = stride
+
+    @classmethod
+    def load(cls, csv_path):
+        """Загружает индекс с диска; возвращает None, если его нет или он не подходит"""
+        path = index_path(csv_path)
+        try:
+            with open(path, "rb") as f:
+                magic, stride, _ = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC:
+                    return None
+                raw = f.read()
+        except (OSError, struct.error):
+            return None
+
+        # Хвост неполной записи индекса (прерванная запись) отбрасываем
+        usable = len(raw) - len(raw) % INDEX_DTYPE.itemsize
+        entries = np.frombuffer(raw[:usable], dtype=INDEX_DTYPE)
+        index = cls(csv_path, entries, stride)
+        return index if index.matches_file() else None
+
+    @classmethod
+    def build(cls, csv_path, stride=DEFAULT_INDEX_STRIDE):
+        """Строит индекс одним проходом по файлу и сохраняет его рядом с записью"""
+        offsets = []
+        row = 0  # Номер строки данных, начинающейся после очередного перевода строки
+        position = 0
+        with open(csv_path, "rb") as f:
+            while True:
+                chunk = f.read(SCAN_CHUNK_SIZE)
+                if not chunk:
+                    break
+                newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10)
+                # Строка данных номер r начинается сразу после r-го перевода строки
+                rows = row + np.arange(len(newlines))
+                selected = newlines[rows % stride == 0]
+                offsets.extend((position + selected + 1).tolist())
+                row += len(newlines)
+                position += len(chunk)
+
+            entries = []
+            for offset in offsets:
+                f.seek(offset)
+                parts = f.read(32).split(b",", 1)
+                if len(parts) < 2:
+                    continue
+                try:
+                    entries.append((float(parts[0]), offset))
+                except ValueError:
+                    continue
+
+        index = cls(csv_path, np.array(entries, dtype=INDEX_DTYPE), stride)
+        index.save()
+        return index
+
+    @classmethod
+    def load_or_build(cls, csv_path, stride=DEFAULT_INDEX_STRIDE):
+        return cls.load(csv_path) or cls.build(csv_path, stride)
+
+    def save(self):
+        """Сохраняет индекс; если каталог недоступен для записи, индекс остается в памяти"""
+        path = index_path(self.csv_path)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, self.stride, 0))
+                f.write(self.entries.tobytes())
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def matches_file(self):
+        """Проверяет, что последняя запись индекса указывает на ту же строку файла"""
+        if not len(self.entries):
+            return os.path.getsize(self.csv_path) <= len(CSV_HEADER)
+        time_val, offset = self.entries[-1]
+        if offset >= os.path.getsize(self.csv_path):
+            return False
+        with open(self.csv_path, "rb") as f:
+            f.seek(int(offset))
+            parts = f.read(32).split(b",", 1)
+        try:
+            return float(parts[0]) == time_val
+        except ValueError:
+            return False
+
+    def byte_range(self, t0, t1):
+        """Возвращает диапазон байтов (start, end), покрывающий интервал времени.
+
+        end равен None, если диапазон доходит до конца файла.
+        """
+        times = self.entries["time"]
+        offsets = self.entries["offset"]
+        if not len(times):
+            return 0, None
+        start_i = max(np.searchsorted(times, t0, side="right") - 1, 0)
+        end_i = np.searchsorted(times, t1, side="right")
+        # До первой записи индекса читаем с начала файла (заголовок пропустит parse_block)
+        start = int(offsets[start_i]) if t0 > times[0] else 0
+        end = int(offsets[end_i]) if end_i < len(offsets) else None
+        # Перевернутый интервал (t1 < t0) дает пустой диапазон
+        return start, end if end is None else max(end, start)
+
+
+def read_byte_range(csv_path, start, end=None):
+    """Читает целые строки из диапазона байтов файла"""
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        data = f.read() if end is None else f.read(end - start)
+    # Неполную последнюю строку (запись еще идет) отбрасываем
+    last_newline = data.rfind(b"\n")
+    return data[:last_newline + 1]
+
+
+def iter_chunks(csv_path, chunk_bytes=SCAN_CHUNK_SIZE, start=0):
+    """Последовательно читает запись блоками целых строк, выдавая (время, напряжение).
+
+    Память ограничена размером блока независимо от размера файла. При чтении
+    с начала используется двоичная копия столбцов, если она есть.
+    """
+    columns = load_columns_header(csv_path) if start == 0 else None
+    if columns is not None:
+        rows, start = columns
+        yield from iter_columns(csv_path, rows, max(chunk_bytes // COLUMNS_DTYPE.itemsize, 1))
+    remainder = b""
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        while True:
+            chunk = f.read(chunk_bytes)
+            if not chunk:
+                break
+            data = remainder + chunk
+            last_newline = data.rfind(b"\n")
+            if last_newline < 0:
+                remainder = data
+                continue
+            remainder = data[last_newline + 1:]
+            times, voltages = parse_block(data[:last_newline + 1])
+            if len(times):
+                yield times, voltages
+    # Последняя строка без перевода строки тоже считается данными
+    if remainder.strip():
+        times, voltages = parse_block(remainder)
+        if len(times):
+            yield times, voltages
+
+
+def read_time_range(csv_path, t0=-np.inf, t1=np.inf, index=None):
+    """Читает из записи только строки, попадающие в интервал [t0, t1]"""
+    if index is None:
+        index = RecordingIndex.load_or_build(csv_path)
+    start, end = index.byte_range(t0, t1)
+    times, voltages = parse_block(read_byte_range(csv_path, start, end))
+    mask = (times >= t0) & (times <= t1)
+    return times[mask], voltages[mask]
+
+
+class RecordingStats:
+    """Сводка по отсчетам: число, границы по времени, min/max/среднее/СКО напряжения"""
+
+    def __init__(self, count=0, start=None, end=None, minimum=np.inf, maximum=-np.inf,
+                 total=0.0, total_sq=0.0):
+        self.count = count
+        self.start = start
+        self.end = end
+        self.minimum = minimum
+        self.maximum = maximum
+        self.total = total
+        self.total_sq = total_sq
+
+    @classmethod
+    def from_arrays(cls, times, voltages):
+        if not len(times):
+            return cls()
+        return cls(len(times), float(times[0]), float(times[-1]), float(voltages.min()),
+                   float(voltages.max()), float(voltages.sum()), float(np.dot(voltages, voltages)))
+
+    def merge(self, other):
+        """Сводка по двум последовательным участкам"""
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        return RecordingStats(
+            self.count + other.count, self.start, other.end,
+            min(self.minimum, other.minimum), max(self.maximum, other.maximum),
+            self.total + other.total, self.total_sq + other.total_sq,
+        )
+
+    @property
+    def duration(self):
+        return self.end - self.start if self.count else 0.0
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    @property
+    def std(self):
+        if not self.count:
+            return None
+        return float(np.sqrt(max(self.total_sq / self.count - self.mean ** 2, 0.0)))
+
+    def __repr__(self):
+        if not self.count:
+            return "RecordingStats(count=0)"
+        return (f"RecordingStats(count={self.count}, start={self.start:g}, end={self.end:g}, "
+                f"min={self.minimum:g}, max={self.maximum:g}, mean={self.mean:g}, std={self.std:g})")
+
+
+class RecordingSlice:
+    """Участок записи в памяти.
+
+    times и voltages - представления массивов NumPy; slice_time() возвращает
+    новые представления тех же данных без копирования.
+    """
+
+    def __init__(self, times, voltages):
+        self.times = times
+        self.voltages = voltages
+
+    def __len__(self):
+        return len(self.times)
+
+    def slice_time(self, t0=-np.inf, t1=np.inf):
+        """Отсчеты из интервала [t0, t1] (время в записи возрастает)"""
+        start = np.searchsorted(self.times, t0, side="left")
+        end = np.searchsorted(self.times, t1, side="right")
+        return RecordingSlice(self.times[start:end], self.voltages[start:end])
+
+    def stats(self):
+        return RecordingStats.from_arrays(self.times, self.voltages)
+
+    def decimate(self, max_points):
+        """Прореживание с сохранением пиков (см. decimate_minmax)"""
+        return RecordingSlice(*decimate_minmax(self.times, self.voltages, max_points))
+
+
+class Recording:
+    """Файл записи с ленивым доступом: данные читаются только по запросу.
+
+    Индекс смещений загружается (или строится) при первом обращении по
+    времени, сводка считается одним потоковым проходом и кэшируется,
+    пока не изменится размер файла.
+    """
+
+    def __init__(self, csv_path):
+        self.path = csv_path
+        self._index = None
+        self._stats = None
+        self._stats_size = None
+
+    def __repr__(self):
+        return f"Recording({self.path!r})"
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    @property
+    def index(self):
+        if self._index is None or not self._index.matches_file():
+            self._index = RecordingIndex.load_or_build(self.path)
+        return self._index
+
+    @property
+    def end_time(self):
+        """Время последней полной строки или None для пустой записи"""
+        return read_last_time(self.path)
+
+    def iter_chunks(self, chunk_bytes=SCAN_CHUNK_SIZE):
+        """Последовательно выдает запись участками RecordingSlice ограниченного размера"""
+        for times, voltages in iter_chunks(self.path, chunk_bytes):
+            yield RecordingSlice(times, voltages)
+
+    def slice_time(self, t0=-np.inf, t1=np.inf):
+        """Читает с диска только строки интервала [t0, t1]"""
+        return RecordingSlice(*read_time_range(self.path, t0, t1, index=self.index))
+
+    def load(self):
+        """Вся запись в памяти"""
+        return self.slice_time()
+
+    def tail(self):
+        """Читатель строк, которые будут дописаны в запись после этого момента"""
+        return RecordingTail(self.path)
+
+    def stats(self):
+        """Сводка по всей записи без загрузки ее в память целиком"""
+        size = self.size
+        if self._stats is None or self._stats_size != size:
+            stats = RecordingStats()
+            for chunk in self.iter_chunks():
+                stats = stats.merge(chunk.stats())
+            self._stats = stats
+            self._stats_size = size
+        return self._stats
+
+
+class RecordingTail:
+    """Читает только строки, дописанные в конец файла после предыдущего вызова.
+
+    Позиция всегда стоит на границе строки: неполная последняя строка
+    (запись еще идет) не разбирается, пока не будет дописана. Если файл
+    стал короче позиции (перезаписан заново), чтение начинается с начала.
+    """
+
+    TAIL_PROBE_SIZE = 64 * 1024  # Сколько байт с конца смотреть в поисках последней строки
+
+    def __init__(self, csv_path, offset=None):
+        self.path = csv_path
+        self.offset = self.end_offset() if offset is None else offset
+
+    def end_offset(self):
+        """Смещение сразу после последнего полного перевода строки в файле"""
+        size = os.path.getsize(self.path)
+        position = size
+        with open(self.path, "rb") as f:
+            while position > 0:
+                start = max(0, position - self.TAIL_PROBE_SIZE)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    return start + newline + 1
+                position = start
+        return 0
+
+    def poll(self):
+        """Новые полные строки в виде RecordingSlice (пустого, если дописанных строк нет)"""
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            self.offset = 0
+        if size == self.offset:
+            return RecordingSlice(np.empty(0), np.empty(0))
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        last_newline = data.rfind(b"\n")
+        if last_newline < 0:
+            return RecordingSlice(np.empty(0), np.empty(0))
+        self.offset += last_newline + 1
+        return RecordingSlice(*parse_block(data[:last_newline + 1]))
+
+
+def open_recording(csv_path):
+    """Открывает запись без чтения данных.
+
+        from recording import open_recording
+        rec = open_recording("data.csv")
+        part = rec.slice_time(10, 20)
+        print(rec.stats(), part.voltages.mean())
+    """
+    if not os.path.isfile(csv_path):
+        raise FileNotFoundError(csv_path)
+    return Recording(csv_path)
+
+
+def load_recording(csv_path, t0=-np.inf, t1=np.inf):
+    """Загружает интервал записи; функция верхнего уровня для пула процессов"""
+    part = open_recording(csv_path).slice_time(t0, t1)
+    return csv_path, part.times, part.voltages
+
+
+def load_decimated(csv_path, max_points, chunk_bytes=SCAN_CHUNK_SIZE):
+    """Обзор всей записи не больше чем из ~max_points точек с сохранением пиков.
+
+    Файл читается потоково, каждый блок прореживается сразу, поэтому память
+    и объем результата не зависят от размера записи.
+    """
+    chunk_count = max(-(-os.path.getsize(csv_path) // chunk_bytes), 1)
+    points_per_chunk = max(max_points // chunk_count, 3)
+    parts = [decimate_minmax(times, voltages, points_per_chunk) for times, voltages in iter_chunks(csv_path, chunk_bytes)]
+    if not parts:
+        return csv_path, np.empty(0), np.empty(0)
+    return csv_path, np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def decimate_minmax(times, values, max_points):
+    """Прореживает ряд, сохраняя минимум и максимум каждой корзины.
+
+    Результат содержит не более max_points точек, пики не теряются; последний
+    отсчет сохраняется всегда, чтобы кривая доходила до самых новых данных.
+    """
+    count = len(times)
+    if count <= max_points:
+        return times, values
+    buckets = max((max_points - 1) // 2, 1)
+    bucket_size = -(-count // buckets)
+    full = count // bucket_size
+    usable = full * bucket_size
+    shaped = values[:usable].reshape(full, bucket_size)
+    argmin = shaped.argmin(axis=1)
+    argmax = shaped.argmax(axis=1)
+    base = np.arange(full) * bucket_size
+    # Внутри корзины сохраняем порядок экстремумов по времени
+    first = base + np.minimum(argmin, argmax)
+    second = base + np.maximum(argmin, argmax)
+    order = [np.column_stack((first, second)).ravel()]
+    if usable < count:
+        # Неполная последняя корзина
+        tail = values[usable:]
+        tail_min, tail_max = usable + int(tail.argmin()), usable + int(tail.argmax())
+        order.append([min(tail_min, tail_max), max(tail_min, tail_max)])
+    order = np.concatenate(order)
+    if order[-1] != count - 1:
+        order = np.append(order, count - 1)
+    return times[order], values[order]
+
+
+def trigger_time(times, values, level, rising=True):
+    """Время первого пересечения уровня (по фронту или спаду) или None"""
+    if len(values) < 2:
+        return None
+    if rising:
+        crossings = np.flatnonzero((values[:-1] < level) & (values[1:] >= level))
+    else:
+        crossings = np.flatnonzero((values[:-1] > level) & (values[1:] <= level))
+    if not len(crossings):
+        return None
+    return float(times[crossings[0] + 1])
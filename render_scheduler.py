@@ -0,0 +1,71 @@
+"""Планировщик перерисовки графиков: объединяет запросы и подстраивает частоту кадров"""
+import time
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import QTimer
+
+
+class RenderScheduler(QtCore.QObject):
+    """Объединяет запросы на перерисовку в один кадр.
+
+    Представление помечается «грязным» через mark_dirty(); отрисовка
+    выполняется не чаще одного раза за интервал кадра. Интервал растет,
+    если сама отрисовка дорогая, чтобы она занимала не больше половины
+    времени GUI-потока. Пока окно свернуто или скрыто, отрисовка
+    откладывается и выполняется при его появлении.
+    """
+
+    MIN_INTERVAL_MS = 16  # ~60 кадров в секунду
+    MAX_INTERVAL_MS = 1000
+    COST_FACTOR = 2.0  # Интервал кадра не меньше удвоенной стоимости отрисовки
+    COST_SMOOTHING = 0.2  # Коэффициент экспоненциального сглаживания стоимости
+
+    def __init__(self, render, widget, min_interval_ms=MIN_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.render = render
+        self.widget = widget
+        self.min_interval_ms = min_interval_ms
+        self.interval_ms = min_interval_ms
+        self.render_cost = 0.0  # Сглаженная стоимость отрисовки, с
+        self.dirty = False
+        self.last_render = 0.0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+
+        # Следим за показом и разворачиванием окна, чтобы дорисовать отложенный кадр
+        self.widget.window().installEventFilter(self)
+
+    def mark_dirty(self):
+        """Помечает представление устаревшим и планирует кадр"""
+        self.dirty = True
+        if self.timer.isActive():
+            return
+        elapsed_ms = (time.monotonic() - self.last_render) * 1000
+        self.timer.start(int(max(0, self.interval_ms - elapsed_ms)))
+
+    def is_visible(self):
+        window = self.widget.window()
+        return self.widget.isVisible() and not window.isMinimized()
+
+    def on_timeout(self):
+        if not self.dirty or not self.is_visible():
+            return
+        self.dirty = False
+
+        started = time.perf_counter()
+        self.render()
+        cost = time.perf_counter() - started
+        self.last_render = time.monotonic()
+
+        # Подстраиваем интервал кадра под измеренную стоимость отрисовки
+        self.render_cost += (cost - self.render_cost) * self.COST_SMOOTHING
+        interval = self.render_cost * self.COST_FACTOR * 1000
+        self.interval_ms = int(min(max(interval, self.min_interval_ms), self.MAX_INTERVAL_MS))
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QtCore.QEvent.Show, QtCore.QEvent.WindowStateChange):
+            if self.dirty and not self.timer.isActive():
+                self.timer.start(0)
+        return False
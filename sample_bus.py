@@ -0,0 +1,215 @@
+"""Кольцевой буфер отсчетов в разделяемой памяти для локальных процессов-читателей.
+
+Сторона сбора данных публикует отсчеты через SampleBusWriter; любое число
+процессов (Jupyter, второй GUI, скрипты анализа) подключаются через
+SampleBusReader и читают без сокетов и повторного разбора CSV:
+
+    from sample_bus import SampleBusReader
+    reader = SampleBusReader()
+    times, voltages, lost = reader.read()
+
+Раскладка памяти: заголовок из HEADER_WORDS слов uint64 (сигнатура, емкость,
+счетчик записанных отсчетов, счетчик начатой записи, PID писателя), затем
+массив времени и массив напряжения float64 длиной capacity.
+
+Синхронизация - seqlock: перед записью пачки писатель объявляет, до какого
+номера отсчета он будет писать (BEGIN_WORD), а после записи публикует тот же
+номер в SEQ_WORD. Читатель берет только опубликованные отсчеты, а после
+копирования перечитывает BEGIN_WORD: все, что писатель мог за это время
+затереть, отбрасывается и засчитывается как потерянное.
+"""
+import os
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_NAME = "serial_voltmeter"
+DEFAULT_CAPACITY = 1 << 20  # Отсчетов в кольце (~2.9 ч при 100 Гц)
+MAGIC = 0x5356425553310000  # "SVBUS1"
+HEADER_WORDS = 8
+HEADER_SIZE = HEADER_WORDS * 8
+MAGIC_WORD, CAPACITY_WORD, SEQ_WORD, BEGIN_WORD, PID_WORD = 0, 1, 2, 3, 4
+
+
+def _attach_arrays(shm, capacity):
+    header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+    times = np.ndarray((capacity,), dtype=np.float64, buffer=shm.buf, offset=HEADER_SIZE)
+    voltages = np.ndarray((capacity,), dtype=np.float64, buffer=shm.buf, offset=HEADER_SIZE + capacity * 8)
+    return header, times, voltages
+
+
+def _process_alive(pid):
+    if sys.platform == "win32":
+        # В Windows именованная память исчезает вместе с последним владельцем,
+        # поэтому существующий сегмент всегда принадлежит живому процессу
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_stale(name):
+    """Удаляет сегмент, оставшийся от аварийно завершенного писателя.
+
+    Чужой сегмент или сегмент живого писателя не трогаем - FileExistsError.
+    """
+    existing = shared_memory.SharedMemory(name=name)
+    try:
+        header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=existing.buf)
+        magic, pid = int(header[MAGIC_WORD]), int(header[PID_WORD])
+        del header
+        if magic != MAGIC:
+            raise FileExistsError(f"Разделяемая память «{name}» занята другим приложением")
+        if pid and _process_alive(pid):
+            raise FileExistsError(f"Шина отсчетов «{name}» уже используется процессом {pid}")
+    finally:
+        existing.close()
+    existing.unlink()
+
+
+class SampleBusWriter:
+    """Публикует отсчеты в кольцевой буфер разделяемой памяти"""
+
+    def __init__(self, name=DEFAULT_NAME, capacity=DEFAULT_CAPACITY):
+        self.name = name
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * 16
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            _remove_stale(name)
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.header, self.times, self.voltages = _attach_arrays(self.shm, capacity)
+        self.header[:] = 0
+        self.header[CAPACITY_WORD] = capacity
+        self.header[PID_WORD] = os.getpid()
+        self.header[MAGIC_WORD] = MAGIC
+
+    @property
+    def write_seq(self):
+        return int(self.header[SEQ_WORD])
+
+    def publish(self, times, voltages):
+        """Дописывает пачку отсчетов в кольцо"""
+        times = np.asarray(times, dtype=np.float64)
+        voltages = np.asarray(voltages, dtype=np.float64)
+        count = len(times)
+        if not count:
+            return
+        seq = self.write_seq
+        if count > self.capacity:
+            # В кольцо помещаются только последние capacity отсчетов
+            times = times[-self.capacity:]
+            voltages = voltages[-self.capacity:]
+            seq += count - self.capacity
+            count = self.capacity
+
+        # Сначала объявляем, какие слоты будут затерты, затем пишем данные
+        self.header[BEGIN_WORD] = seq + count
+        start = seq % self.capacity
+        first = min(count, self.capacity - start)
+        self.times[start:start + first] = times[:first]
+        self.voltages[start:start + first] = voltages[:first]
+        if first < count:
+            self.times[:count - first] = times[first:]
+            self.voltages[:count - first] = voltages[first:]
+        # Счетчик публикуется последним: данные до него уже записаны
+        self.header[SEQ_WORD] = seq + count
+
+    def close(self):
+        del self.header, self.times, self.voltages
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SampleBusReader:
+    """Читает отсчеты из кольцевого буфера, отслеживая свою позицию.
+
+    Если читатель отстал больше чем на емкость кольца, пропущенные
+    отсчеты не возвращаются, а их число сообщается как lost.
+    """
+
+    def __init__(self, name=DEFAULT_NAME, from_start=False):
+        self.shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Читатель не владеет памятью: не даем resource_tracker удалить ее при выходе
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        except (ImportError, AttributeError, KeyError):
+            pass
+        header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=self.shm.buf)
+        if int(header[MAGIC_WORD]) != MAGIC:
+            del header
+            self.shm.close()
+            raise ValueError(f"Разделяемая память {name} не является шиной отсчетов")
+        self.capacity = int(header[CAPACITY_WORD])
+        del header
+        self.header, self.times, self.voltages = _attach_arrays(self.shm, self.capacity)
+        write_seq = self.write_seq
+        self.next_seq = max(0, write_seq - self.capacity) if from_start else write_seq
+
+    @property
+    def write_seq(self):
+        return int(self.header[SEQ_WORD])
+
+    @property
+    def begin_seq(self):
+        return int(self.header[BEGIN_WORD])
+
+    def _copy(self, seq, count):
+        start = seq % self.capacity
+        first = min(count, self.capacity - start)
+        if first == count:
+            return self.times[start:start + count].copy(), self.voltages[start:start + count].copy()
+        return (
+            np.concatenate((self.times[start:], self.times[:count - first])),
+            np.concatenate((self.voltages[start:], self.voltages[:count - first])),
+        )
+
+    def read(self, max_samples=None):
+        """Возвращает новые отсчеты (время, напряжение) и число потерянных"""
+        end = self.write_seq
+        lost = 0
+        if end - self.next_seq > self.capacity:
+            lost = end - self.capacity - self.next_seq
+            self.next_seq = end - self.capacity
+        count = end - self.next_seq
+        if max_samples is not None:
+            count = min(count, max_samples)
+        if count <= 0:
+            return np.empty(0), np.empty(0), lost
+
+        times, voltages = self._copy(self.next_seq, count)
+        # Писатель мог начать затирать начало участка во время копирования
+        overwritten = self.begin_seq - self.capacity - self.next_seq
+        if overwritten > 0:
+            overwritten = min(overwritten, count)
+            times = times[overwritten:]
+            voltages = voltages[overwritten:]
+            lost += overwritten
+        self.next_seq += count
+        return times, voltages, lost
+
+    def latest(self, count):
+        """Последние count отсчетов без сдвига позиции читателя.
+
+        Если участок не пересекает границу кольца, возвращаются представления
+        разделяемой памяти без копирования; они действительны, пока писатель
+        не сделает еще один оборот (начало участка он может затереть первым).
+        """
+        end = self.write_seq
+        count = min(count, end, self.capacity)
+        seq = end - count
+        start = seq % self.capacity
+        if start + count <= self.capacity:
+            return self.times[start:start + count], self.voltages[start:start + count]
+        return self._copy(seq, count)
+
+    def close(self):
+        del self.header, self.times, self.voltages
+        self.shm.close()
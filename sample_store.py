@@ -0,0 +1,96 @@
+"""Общее хранилище отсчетов текущей сессии для всех живых графиков"""
+import numpy as np
+
+DEFAULT_MAX_SAMPLES = 1 << 22  # Хранимые отсчеты (~11.6 ч при 100 Гц, 64 МБ)
+
+
+class SampleStore:
+    """Отсчеты сессии в двух непрерывных массивах float64.
+
+    Каждая пачка добавляется один раз, а графики получают окна как
+    представления массивов (без копирования), поэтому новый график не
+    увеличивает ни память, ни работу приема данных. Массивы растут
+    удвоением; при достижении max_samples старшая половина отсчетов
+    отбрасывается сдвигом, так что добавление остается амортизированно O(1).
+    Представления действительны до следующего append().
+    """
+
+    def __init__(self, max_samples=DEFAULT_MAX_SAMPLES, initial_capacity=4096):
+        self.max_samples = max_samples
+        self.initial_capacity = min(initial_capacity, max_samples)
+        # Растет с каждым изменением (и при очистке): графики пропускают кадр, если он не изменился
+        self.version = 0
+        self.clear()
+
+    def clear(self):
+        self.times_buffer = np.empty(self.initial_capacity)
+        self.voltages_buffer = np.empty(self.initial_capacity)
+        self.count = 0
+        self.discarded = 0  # Отсчеты, отброшенные из-за предела max_samples
+        self.version += 1
+
+    def __len__(self):
+        return self.count
+
+    def append(self, times, voltages):
+        times = np.asarray(times, dtype=np.float64)
+        voltages = np.asarray(voltages, dtype=np.float64)
+        added = len(times)
+        if not added:
+            return
+        if added >= self.max_samples:
+            self.discarded += self.count + added - self.max_samples
+            times = times[-self.max_samples:]
+            voltages = voltages[-self.max_samples:]
+            self.count = 0
+            added = len(times)
+
+        needed = self.count + added
+        if needed > len(self.times_buffer):
+            if needed <= self.max_samples:
+                capacity = min(max(2 * len(self.times_buffer), needed), self.max_samples)
+                self.times_buffer = np.resize(self.times_buffer, capacity)
+                self.voltages_buffer = np.resize(self.voltages_buffer, capacity)
+            else:
+                # Оставляем последнюю половину хранилища вместе с новой пачкой
+                keep = min(self.count, self.max_samples // 2, self.max_samples - added)
+                if len(self.times_buffer) < self.max_samples:
+                    self.times_buffer = np.resize(self.times_buffer, self.max_samples)
+                    self.voltages_buffer = np.resize(self.voltages_buffer, self.max_samples)
+                self.times_buffer[:keep] = self.times_buffer[self.count - keep:self.count]
+                self.voltages_buffer[:keep] = self.voltages_buffer[self.count - keep:self.count]
+                self.discarded += self.count - keep
+                self.count = keep
+                needed = keep + added
+
+        self.times_buffer[self.count:needed] = times
+        self.voltages_buffer[self.count:needed] = voltages
+        self.count = needed
+        self.version += 1
+
+    @property
+    def times(self):
+        return self.times_buffer[:self.count]
+
+    @property
+    def voltages(self):
+        return self.voltages_buffer[:self.count]
+
+    @property
+    def last_time(self):
+        return float(self.times_buffer[self.count - 1]) if self.count else None
+
+    def window(self, duration):
+        """Отсчеты последних duration секунд: представления (время, напряжение).
+
+        Если часть окна уже отброшена из-за предела max_samples, окно
+        начинается с самого старого хранимого отсчета (см. is_truncated).
+        """
+        if not self.count:
+            return self.times, self.voltages
+        start = np.searchsorted(self.times, self.last_time - duration, side="left")
+        return self.times_buffer[start:self.count], self.voltages_buffer[start:self.count]
+
+    def is_truncated(self, duration):
+        """Проверяет, что окно duration секунд не помещается в хранимые отсчеты"""
+        return bool(self.discarded) and self.count > 0 and self.last_time - duration < self.times_buffer[0]
@@ -0,0 +1,215 @@
+"""Источники данных для записи и графика: последовательный порт и воспроизведение записи"""
+import abc
+import time
+
+import numpy as np
+from PyQt5 import QtCore
+from PyQt5.QtCore import QIODevice, QTimer
+from PyQt5.QtSerialPort import QSerialPort
+
+import recording
+
+
+class _SourceMeta(type(QtCore.QObject), abc.ABCMeta):
+    """Метакласс, совмещающий QObject и abc.ABC"""
+
+
+class AcquisitionSource(QtCore.QObject, abc.ABC, metaclass=_SourceMeta):
+    """Базовый источник отсчетов.
+
+    Источник выдает пачки сырых строк формата millis,voltage через сигнал
+    lines_ready, поэтому разбор, фильтрация, запись и отрисовка работают
+    одинаково для прибора и для воспроизводимой записи. Все, что нужно
+    для открытия (порт, файл), передается в конструктор.
+    """
+
+    lines_ready = QtCore.pyqtSignal(list)
+    finished = QtCore.pyqtSignal()
+
+    @abc.abstractmethod
+    def open(self):
+        """Открывает источник; возвращает True при успехе"""
+
+    @abc.abstractmethod
+    def close(self):
+        pass
+
+    @abc.abstractmethod
+    def is_open(self):
+        pass
+
+    @abc.abstractmethod
+    def description(self):
+        pass
+
+    def start(self):
+        """Вызывается в начале записи (прибор передает данные непрерывно)"""
+
+    def pause(self):
+        """Вызывается при остановке записи"""
+
+    def bytes_available(self):
+        """Объем данных, ожидающих чтения (для метрик очередей)"""
+        return 0
+
+
+class SerialSource(AcquisitionSource):
+    """Прибор на последовательном порту"""
+
+    BAUD_RATE = 115200
+
+    def __init__(self, port_name, parent=None):
+        super().__init__(parent)
+        self.port = QSerialPort(self)
+        self.port.setPortName(port_name)
+        self.port.setBaudRate(self.BAUD_RATE)
+        self.port.readyRead.connect(self.on_ready_read)
+
+    def open(self):
+        return self.port.open(QIODevice.ReadOnly)
+
+    def close(self):
+        if self.port.isOpen():
+            self.port.close()
+
+    def is_open(self):
+        return self.port.isOpen()
+
+    def bytes_available(self):
+        return self.port.bytesAvailable()
+
+    def description(self):
+        return self.port.portName()
+
+    def on_ready_read(self):
+        # Забираем из порта все полные строки одной пачкой
+        lines = []
+        while self.port.canReadLine():
+            lines.append(bytes(self.port.readLine()))
+        if lines:
+            self.lines_ready.emit(lines)
+
+
+class ReplaySource(AcquisitionSource):
+    """Воспроизведение существующей записи с заданным ускорением.
+
+    speed - множитель скорости (1.0 - реальное время) или None для
+    воспроизведения с максимальной скоростью. Как и прибор, источник после
+    open() готов к работе, но отсчеты выдает только между start() и pause(),
+    то есть пока идет запись, чтобы весь файл прошел через конвейер.
+    """
+
+    SPEEDS = {
+        "1×": 1.0,
+        "10×": 10.0,
+        "100×": 100.0,
+        "Максимальная": None,
+    }
+    TICK_MS = 10  # Период выдачи пачек при воспроизведении в масштабе времени
+    MAX_BATCH_ROWS = 5000  # Размер пачки при максимальной скорости
+    CHUNK_BYTES = 1024 * 1024  # Файл читается блоками, память не зависит от размера записи
+
+    def __init__(self, csv_path, speed=1.0, parent=None):
+        super().__init__(parent)
+        self.csv_path = csv_path
+        self.speed = speed
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.on_tick)
+        self.chunks = None
+        self.times = np.empty(0)
+        self.voltages = np.empty(0)
+        self.pos = 0
+        self.exhausted = False
+        self.first_time = None
+        self.started = 0.0
+        self.elapsed = 0.0  # Время воспроизведения до последней паузы, с
+
+    def open(self):
+        try:
+            self.chunks = recording.iter_chunks(self.csv_path, self.CHUNK_BYTES)
+            self.exhausted = not self.load_next_chunk()
+        except OSError:
+            return False
+        if self.exhausted:
+            self.chunks = None
+            return False
+        self.first_time = self.times[0]
+        self.elapsed = 0.0
+        return True
+
+    def start(self):
+        if self.chunks is None or self.timer.isActive():
+            return
+        self.started = time.monotonic() - self.elapsed
+        # При максимальной скорости пачки выдаются при каждом проходе цикла событий
+        self.timer.start(0 if self.speed is None else self.TICK_MS)
+
+    def pause(self):
+        if self.timer.isActive():
+            self.timer.stop()
+            self.elapsed = time.monotonic() - self.started
+
+    def close(self):
+        self.timer.stop()
+        self.chunks = None
+
+    def is_open(self):
+        return self.chunks is not None
+
+    def bytes_available(self):
+        return len(self.times) - self.pos
+
+    def description(self):
+        speed = "макс." if self.speed is None else f"{self.speed:g}×"
+        return f"воспроизведение {self.csv_path} ({speed})"
+
+    def load_next_chunk(self):
+        try:
+            self.times, self.voltages = next(self.chunks)
+        except StopIteration:
+            return False
+        self.pos = 0
+        return True
+
+    def take_rows(self, max_rows=None, max_time=None):
+        """Забирает следующие строки записи: не больше max_rows и не позже max_time"""
+        times_parts = []
+        voltage_parts = []
+        taken = 0
+        while not self.exhausted:
+            if self.pos >= len(self.times) and not self.load_next_chunk():
+                self.exhausted = True
+                break
+            end = len(self.times)
+            if max_time is not None:
+                end = self.pos + np.searchsorted(self.times[self.pos:], max_time, side="right")
+            if max_rows is not None:
+                end = min(end, self.pos + max_rows - taken)
+            times_parts.append(self.times[self.pos:end])
+            voltage_parts.append(self.voltages[self.pos:end])
+            taken += end - self.pos
+            self.pos = end
+            if self.pos < len(self.times):
+                break  # Остаток блока позже текущего момента воспроизведения
+        if not times_parts:
+            return np.empty(0), np.empty(0)
+        return np.concatenate(times_parts), np.concatenate(voltage_parts)
+
+    def on_tick(self):
+        if self.speed is None:
+            times, voltages = self.take_rows(max_rows=self.MAX_BATCH_ROWS)
+        else:
+            elapsed = time.monotonic() - self.started
+            times, voltages = self.take_rows(max_time=self.first_time + elapsed * self.speed)
+
+        if len(times):
+            # Восстанавливаем формат прибора, чтобы весь конвейер отработал как вживую
+            lines = [
+                f"{int(round(time_val * 1000))},{voltage}\n".encode()
+                for time_val, voltage in zip(times.tolist(), voltages.tolist())
+            ]
+            self.lines_ready.emit(lines)
+
+        if self.exhausted:
+            self.close()
+            self.finished.emit()
@@ -0,0 +1,83 @@
+"""Тестовый клиент трансляции отсчетов: печатает скорость потока, задержку и потери"""
+import argparse
+import socket
+import time
+
+import numpy as np
+
+from stream_server import DEFAULT_HOST, DEFAULT_PORT, FRAME_HEADER, FRAME_MAGIC, SAMPLE_DTYPE
+
+
+def read_exact(sock, size):
+    """Читает ровно size байт или возвращает None при закрытии соединения"""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def iter_frames(sock):
+    """Возвращает кадры (номер первого отсчета, время публикации, массив отсчетов)"""
+    while True:
+        header = read_exact(sock, FRAME_HEADER.size)
+        if header is None:
+            return
+        magic, count, seq, published = FRAME_HEADER.unpack(header)
+        if magic != FRAME_MAGIC:
+            raise ValueError("Неверная сигнатура кадра")
+        payload = read_exact(sock, count * SAMPLE_DTYPE.itemsize)
+        if payload is None:
+            return
+        yield seq, published, np.frombuffer(payload, dtype=SAMPLE_DTYPE)
+
+
+def connect(host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+    if unix_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(unix_path)
+    else:
+        sock = socket.create_connection((host, port))
+    return sock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Тестовый клиент трансляции Serial Voltmeter")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Путь к Unix-сокету вместо TCP")
+    args = parser.parse_args()
+
+    sock = connect(args.host, args.port, args.unix)
+    print("Подключено, ожидание данных...")
+
+    expected_seq = None
+    samples = 0
+    lost = 0
+    latencies = []
+    report_time = time.monotonic()
+    for seq, published, frame in iter_frames(sock):
+        latencies.append(time.time() - published)
+        if expected_seq is not None and seq > expected_seq:
+            lost += seq - expected_seq  # Кадры вытеснены из очереди сервера
+        expected_seq = seq + len(frame)
+        samples += len(frame)
+
+        now = time.monotonic()
+        if now - report_time >= 1.0:
+            print(
+                f"{samples / (now - report_time):.0f} отсчетов/с, "
+                f"задержка: средняя {np.mean(latencies) * 1000:.2f} мс, "
+                f"макс. {np.max(latencies) * 1000:.2f} мс, "
+                f"потеряно: {lost}, последнее: {frame['voltage'][-1]:.2f} мВ"
+            )
+            samples = 0
+            latencies = []
+            report_time = now
+    print("Соединение закрыто")
+
+
+if __name__ == "__main__":
+    main()
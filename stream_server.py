@@ -0,0 +1,237 @@
+"""Локальная трансляция отсчетов внешним потребителям по TCP или Unix-сокету.
+
+Формат кадра: заголовок FRAME_HEADER (сигнатура, число отсчетов, номер
+первого отсчета, время публикации time.time()), затем count записей
+SAMPLE_DTYPE (время прибора в секундах, напряжение в мВ).
+"""
+import collections
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+FRAME_MAGIC = b"SVMF"
+FRAME_HEADER = struct.Struct("<4sIQd")
+SAMPLE_DTYPE = np.dtype([("time", "<f8"), ("voltage", "<f8")])
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5757
+DEFAULT_QUEUE_FRAMES = 256  # Очередь клиента в кадрах; при переполнении теряются старые
+
+
+def encode_frame(seq, samples, published=None):
+    """Упаковывает пачку отсчетов (время, напряжение) в двоичный кадр"""
+    payload = np.array(samples, dtype=SAMPLE_DTYPE).tobytes()
+    header = FRAME_HEADER.pack(FRAME_MAGIC, len(samples), seq, published or time.time())
+    return header + payload
+
+
+class _Client:
+    """Состояние одного подписчика: ограниченная очередь и недописанный кадр"""
+
+    def __init__(self, sock, max_frames):
+        self.sock = sock
+        self.queue = collections.deque(maxlen=max_frames)
+        self.pending = None  # memoryview недоотправленного кадра
+        self.pending_enqueued = 0.0
+        self.dropped = 0
+
+
+class SampleStreamServer:
+    """Раздает пачки отсчетов всем подключенным клиентам.
+
+    publish() вызывается из потока сбора данных и только кладет готовый
+    кадр в очереди клиентов; отправкой занимается отдельный поток.
+    Очереди ограничены и при переполнении вытесняют самые старые кадры,
+    поэтому медленный клиент не может задержать сбор данных.
+    """
+
+    def __init__(self, address=(DEFAULT_HOST, DEFAULT_PORT), max_queue_frames=DEFAULT_QUEUE_FRAMES):
+        self.address = address
+        self.max_queue_frames = max_queue_frames
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.latency_mean = 0.0  # Сглаженная задержка от publish() до отправки, с
+        self.latency_max = 0.0
+        self.running = False
+        self.thread = None
+        self.listener = None
+        self.selector = None
+        self.wake_reader, self.wake_writer = socket.socketpair()
+        self.wake_reader.setblocking(False)
+        self.wake_writer.setblocking(False)
+
+    @property
+    def is_unix(self):
+        return isinstance(self.address, str)
+
+    def start(self):
+        if self.is_unix:
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(self.address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.selector.register(self.wake_reader, selectors.EVENT_READ)
+
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, name="SampleStreamServer", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+        with self.lock:
+            for client in self.clients.values():
+                client.sock.close()
+            self.clients.clear()
+        if self.listener is not None:
+            self.listener.close()
+        if self.selector is not None:
+            self.selector.close()
+        self.wake_reader.close()
+        self.wake_writer.close()
+        if self.is_unix and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def wake(self):
+        try:
+            self.wake_writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # Поток и так будет разбужен уже записанными байтами
+
+    def publish(self, samples):
+        """Ставит пачку отсчетов в очереди всех клиентов (не блокируется)"""
+        if not samples or not self.clients:
+            self.seq += len(samples)
+            return
+        frame = encode_frame(self.seq, samples)
+        self.seq += len(samples)
+        enqueued = time.perf_counter()
+        with self.lock:
+            for client in self.clients.values():
+                if len(client.queue) == client.queue.maxlen:
+                    client.dropped += 1
+                    self.frames_dropped += 1
+                client.queue.append((frame, enqueued))
+        self.wake()
+
+    def max_queue_depth(self):
+        with self.lock:
+            return max((len(client.queue) for client in self.clients.values()), default=0)
+
+    def stats(self):
+        """Согласованный снимок счетчиков; вызывается из потока интерфейса"""
+        with self.lock:
+            return {
+                "clients": len(self.clients),
+                "frames_sent": self.frames_sent,
+                "frames_dropped": self.frames_dropped,
+                "latency_mean_ms": round(self.latency_mean * 1000, 3),
+                "latency_max_ms": round(self.latency_max * 1000, 3),
+                "max_queue_depth": max((len(client.queue) for client in self.clients.values()), default=0),
+            }
+
+    def serve(self):
+        while self.running:
+            with self.lock:
+                # Подписываемся на запись только для клиентов, которым есть что отправить
+                for client in self.clients.values():
+                    events = selectors.EVENT_READ
+                    if client.pending is not None or client.queue:
+                        events |= selectors.EVENT_WRITE
+                    self.selector.modify(client.sock, events, client)
+
+            for key, events in self.selector.select(timeout=0.5):
+                if key.fileobj is self.listener:
+                    self.accept()
+                elif key.fileobj is self.wake_reader:
+                    try:
+                        while self.wake_reader.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                else:
+                    client = key.data
+                    if events & selectors.EVENT_READ and not self.read_client(client):
+                        continue
+                    if events & selectors.EVENT_WRITE:
+                        self.send_client(client)
+
+    def accept(self):
+        try:
+            sock, _ = self.listener.accept()
+        except (BlockingIOError, OSError):
+            return
+        sock.setblocking(False)
+        if not self.is_unix:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = _Client(sock, self.max_queue_frames)
+        with self.lock:
+            self.clients[sock.fileno()] = client
+        self.selector.register(sock, selectors.EVENT_READ, client)
+
+    def read_client(self, client):
+        """Клиенты ничего не присылают; пустое чтение означает отключение"""
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return True
+        except OSError:
+            data = b""
+        if not data:
+            self.drop_client(client)
+            return False
+        return True
+
+    def drop_client(self, client):
+        with self.lock:
+            self.clients.pop(client.sock.fileno(), None)
+        try:
+            self.selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+    def send_client(self, client):
+        while True:
+            if client.pending is None:
+                with self.lock:
+                    if not client.queue:
+                        return
+                    frame, client.pending_enqueued = client.queue.popleft()
+                client.pending = memoryview(frame)
+            try:
+                sent = client.sock.send(client.pending)
+            except BlockingIOError:
+                return
+            except OSError:
+                self.drop_client(client)
+                return
+            client.pending = client.pending[sent:]
+            if len(client.pending):
+                return  # Буфер сокета заполнен, продолжим при следующем EVENT_WRITE
+
+            client.pending = None
+            latency = time.perf_counter() - client.pending_enqueued
+            with self.lock:
+                self.frames_sent += 1
+                self.latency_mean += (latency - self.latency_mean) * 0.05
+                if latency > self.latency_max:
+                    self.latency_max = latency
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import alarms
+
+
+def run_batches(rule, times, values, batch):
+    """Подает сигнал правилу пачками и возвращает (время, состояние) событий по порядку"""
+    found = []
+    for start in range(0, len(times), batch):
+        part_times = times[start:start + batch]
+        for i, state, _ in rule.evaluate(part_times, values[start:start + batch]):
+            found.append((float(part_times[i]), state))
+    # Внутри пачки правило выдает сначала срабатывания, потом снятия; порядок наводит AlarmEngine
+    return sorted(found)
+
+
+@pytest.mark.parametrize("batch", [1, 3, 100])
+def test_threshold_hysteresis(batch):
+    rule = alarms.ThresholdRule("threshold", high=10.0, hysteresis=2.0)
+    times = np.arange(9.0)
+    # 9.5 и 8.5 лежат внутри полосы гистерезиса и состояние не меняют
+    values = np.array([0, 11, 9.5, 12, 8.5, 7.9, 9.5, 10.5, 0])
+    assert run_batches(rule, times, values, batch) == [
+        (1.0, alarms.RAISED), (5.0, alarms.CLEARED), (7.0, alarms.RAISED), (8.0, alarms.CLEARED),
+    ]
+
+
+def test_threshold_low_limit_and_state_between_batches():
+    rule = alarms.ThresholdRule("threshold", low=-5.0, hysteresis=1.0)
+    assert rule.evaluate(np.array([0.0, 1.0]), np.array([0.0, -6.0])) == [
+        (1, alarms.RAISED, "напряжение ниже нижнего предела -5 мВ")
+    ]
+    # Тревога уже поднята: повтор ниже предела нового события не дает
+    assert rule.evaluate(np.array([2.0, 3.0]), np.array([-7.0, -4.5])) == []
+    assert [state for _, state, _ in rule.evaluate(np.array([4.0]), np.array([-3.0]))] == [alarms.CLEARED]
+
+
+@pytest.mark.parametrize("batch", [1, 2, 50])
+def test_rate_of_change_across_batches(batch):
+    rule = alarms.RateOfChangeRule("rate", max_rate=100.0)
+    times = np.arange(6) * 0.1
+    # Скачок на 20 мВ за 0,1 с (200 мВ/с) между отсчетами 2 и 3
+    values = np.array([0.0, 1.0, 2.0, 22.0, 23.0, 24.0])
+    assert run_batches(rule, times, values, batch) == [
+        (pytest.approx(0.3), alarms.RAISED), (pytest.approx(0.4), alarms.CLEARED),
+    ]
+
+
+@pytest.mark.parametrize("batch", [1, 4, 100])
+def test_sustained_deviation_holds_before_raising(batch):
+    rule = alarms.SustainedDeviationRule("deviation", reference=0.0, deviation=5.0, duration=2.0)
+    times = np.arange(12.0)
+    values = np.zeros(12)
+    values[1:3] = 10.0  # Короткое отклонение (1 с) тревоги не вызывает
+    values[5:10] = -10.0  # Отклонение с 5 с: тревога через 2 с, на 7 с
+    assert run_batches(rule, times, values, batch) == [(7.0, alarms.RAISED), (10.0, alarms.CLEARED)]
+
+
+def test_engine_orders_events_and_measures_latency():
+    engine = alarms.AlarmEngine.from_config({"high": 10.0, "max_rate": 5.0})
+    assert [rule.name for rule in engine.rules] == ["threshold", "rate"]
+    found = engine.process([0.0, 1.0, 2.0, 3.0, 4.0], [0.0, 2.0, 20.0, 20.0, 0.0])
+    # По времени; одновременные события - в порядке правил
+    assert [(event.time, event.rule, event.state) for event in found] == [
+        (2.0, "threshold", alarms.RAISED), (2.0, "rate", alarms.RAISED),
+        (3.0, "rate", alarms.CLEARED), (4.0, "threshold", alarms.CLEARED), (4.0, "rate", alarms.RAISED),
+    ]
+    assert 0.0 < engine.last_latency <= engine.max_latency
+    assert engine.process([], []) == []
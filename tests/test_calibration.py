@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import calibration
+
+
+@pytest.fixture
+def cal():
+    return calibration.RangeCalibration(6144, [1e-6, 0.0, 1.001, 0.5])
+
+
+def test_lut_matches_polynomial(cal):
+    codes = np.array([-32768, -1, 0, 1, 12345, 32767])
+    expected = np.polyval(cal.coefficients, codes * cal.lsb)
+    assert np.allclose(cal.apply_counts(codes), expected)
+    assert len(cal.lut) == calibration.LUT_SIZE
+
+
+def test_printed_codes_use_table_values(cal):
+    codes = np.concatenate((np.arange(-32768, 32768, 7), [32767]))
+    printed = np.round(codes * cal.lsb, 2)  # Так напряжение печатает прибор
+    assert np.array_equal(cal.apply_mv(printed), cal.apply_counts(codes))
+    assert cal.out_of_range == 0
+
+
+def test_values_between_codes_are_interpolated(cal):
+    values = np.array([0.3 * cal.lsb, 100.5 * cal.lsb, 6143.8])
+    # Без привязки к сетке: поправка идет по многочлену, а не ступенькой в 1 МЗР
+    assert np.allclose(cal.apply_mv(values), np.polyval(cal.coefficients, values), atol=1e-6)
+    assert cal.apply_mv([0.25 * cal.lsb])[0] != cal.apply_mv([0.0])[0]
+
+
+def test_out_of_range_values_are_not_clipped(cal):
+    values = np.array([-7000.0, 0.0, 6144.0, 9000.0])
+    result = cal.apply_mv(values)
+    assert np.allclose(result, np.polyval(cal.coefficients, values))
+    assert cal.out_of_range == 3
+
+
+def test_fine_ranges_use_polynomial():
+    cal = calibration.RangeCalibration(256, [1.002, -0.1])
+    assert not cal.codes_recoverable
+    values = np.array([0.01, 100.0, 300.0])
+    assert np.allclose(cal.apply_mv(values), 1.002 * values - 0.1)
+
+
+def test_profile_round_trip(tmp_path):
+    profile = calibration.CalibrationProfile("dev", {
+        6144: calibration.RangeCalibration.from_dict(6144, {"offset": -1.2, "gain": 1.0015}),
+    })
+    path = tmp_path / "dev.json"
+    profile.save(path)
+    loaded = calibration.CalibrationProfile.load(path)
+    assert loaded.for_range(6144).coefficients.tolist() == [1.0015, -1.2]
+    assert loaded.for_range(2048) is None
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import events
+import recording
+
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(0)
+    times = np.arange(20000) * 0.01
+    times[12000:] += 5.0  # Пропуск данных
+    values = np.round(rng.standard_normal(len(times)), 2)
+    values[3000] += 500.0  # Пик
+    values[6000:] += 200.0  # Ступенька
+    values[9000:9500] = values[9000]  # Залипание на 5 с
+    return times, values
+
+
+def detect(times, values, chunk):
+    detector = events.EventDetector()
+    for i in range(0, len(times), chunk):
+        detector.feed(times[i:i + chunk], values[i:i + chunk])
+    return detector.finish()
+
+
+def test_finds_each_kind(signal):
+    found = detect(*signal, chunk=4096)
+    by_kind = {kind: found[found["kind"] == kind] for kind in (events.PEAK, events.STEP, events.FLAT, events.DROPOUT)}
+    assert by_kind[events.PEAK]["start"].tolist() == [pytest.approx(30.0)]
+    assert by_kind[events.STEP]["start"].tolist() == [pytest.approx(60.0)]
+    assert len(by_kind[events.FLAT]) == 1 and by_kind[events.FLAT]["end"][0] - by_kind[events.FLAT]["start"][0] >= 4.9
+    assert len(by_kind[events.DROPOUT]) == 1
+
+
+@pytest.mark.parametrize("chunk", [997, 5000, 20000])
+def test_result_does_not_depend_on_chunk_size(signal, chunk):
+    reference = detect(*signal, chunk=len(signal[0]))
+    found = detect(*signal, chunk=chunk)
+    assert found["kind"].tolist() == reference["kind"].tolist()
+    assert np.allclose(found["start"], reference["start"])
+    assert np.allclose(found["value"], reference["value"])
+
+
+def test_find_events_uses_cache(signal, tmp_path):
+    path = str(tmp_path / "rec.csv")
+    writer = recording.RecordingWriter(path)
+    writer.write_rows(zip(*(a.tolist() for a in signal)))
+    writer.close()
+    found = events.find_events(path)
+    assert events.load_cached_events(path) is not None
+    assert np.array_equal(events.find_events(path), found)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import export
+import recording
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "rec.csv"
+    times = np.arange(100000) * 0.01
+    writer = recording.RecordingWriter(str(path))
+    writer.write_rows(zip(times.tolist(), np.sin(times).tolist()))
+    writer.close()
+    return str(path)
+
+
+@pytest.mark.parametrize("fmt", export.FORMATS)
+def test_cancel_leaves_no_partial_file(source, tmp_path, fmt):
+    dst = tmp_path / f"out.{fmt}"
+    dst.write_bytes(b"previous")
+    calls = []
+
+    def cancelled():
+        calls.append(None)
+        return len(calls) > 2
+
+    with pytest.raises(export.ExportCancelled):
+        export.export_recording(source, str(dst), chunk_bytes=64 * 1024, cancelled=cancelled)
+    assert dst.read_bytes() == b"previous"
+    assert not [p.name for p in tmp_path.iterdir() if p.name.startswith("out.") and p.name != dst.name]
+
+
+def test_npy_export(source, tmp_path):
+    dst = tmp_path / "out.npy"
+    count = export.export_recording(source, str(dst), chunk_bytes=64 * 1024)
+    data = np.load(dst)
+    assert count == 100000
+    assert data.shape == (100000, 2)
+    assert data[-1, 0] == pytest.approx(999.99)
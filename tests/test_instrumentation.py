@@ -0,0 +1,49 @@
+from instrumentation import Instrumentation, SequenceMonitor
+
+
+def millis(start, step, count):
+    return list(range(start, start + step * count, step))
+
+
+def test_counts_isolated_gap():
+    monitor = SequenceMonitor()
+    monitor.observe(millis(0, 10, 50) + millis(530, 10, 50))
+    assert monitor.gaps == 1
+    assert monitor.lost_samples == 3
+    assert monitor.expected_interval() == 10
+
+
+def test_adapts_to_permanently_slower_device():
+    monitor = SequenceMonitor()
+    monitor.observe(millis(0, 10, 100))
+    # Прибор перешел на период 40 мс и больше не возвращается к 10 мс
+    monitor.observe(millis(1000, 40, 500))
+    assert monitor.expected_interval() == 40
+    assert monitor.gaps == 0
+    assert monitor.lost_samples == 0
+
+    monitor.observe([monitor.last_millis + 200])
+    assert monitor.gaps == 1
+
+
+def test_repeated_irregular_gaps_are_still_counted():
+    monitor = SequenceMonitor()
+    values = millis(0, 10, 50)
+    for size in (30, 80, 30, 80, 30, 80, 30, 80, 30, 80):
+        values += millis(values[-1] + size, 10, 5)
+    monitor.observe(values)
+    assert monitor.gaps == 10
+    assert monitor.expected_interval() == 10
+
+
+def test_alarm_latency_in_snapshot():
+    instr = Instrumentation()
+    instr.set_alarm_latency(0.001, 0.002)
+    assert instr.snapshot()["alarm_latency"] is None  # Выключенный сборщик ничего не копит
+
+    instr.enabled = True
+    instr.set_alarm_latency(0.0005, 0.0025)
+    assert instr.snapshot()["alarm_latency"] == {"last_ms": 0.5, "max_ms": 2.5}
+    assert "Проверка пределов: последняя 0.500 мс, макс. 2.500 мс" in instr.format_text()
+    instr.reset()
+    assert "Проверка пределов" not in instr.format_text()
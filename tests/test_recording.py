@@ -0,0 +1,159 @@
+import os
+
+import numpy as np
+import pytest
+
+import recording
+
+
+@pytest.mark.parametrize("count, max_points", [(10000, 4000), (10001, 4000), (12345, 101), (1000, 3)])
+def test_decimate_minmax_keeps_tail(count, max_points):
+    times = np.arange(count, dtype=np.float64)
+    values = np.zeros(count)
+    values[-1] = 500.0  # Пик на самом последнем отсчете
+    values[count // 3] = -500.0
+
+    dec_times, dec_values = recording.decimate_minmax(times, values, max_points)
+
+    assert len(dec_times) <= max_points
+    assert dec_times[-1] == times[-1]
+    assert dec_values.max() == 500.0
+    assert dec_values.min() == -500.0
+    assert np.all(np.diff(dec_times) >= 0)
+
+
+def test_decimate_minmax_short_series_unchanged():
+    times = np.arange(10.0)
+    dec_times, dec_values = recording.decimate_minmax(times, times, 10)
+    assert dec_times is times and dec_values is times
+
+
+def test_load_decimated(tmp_path):
+    path = tmp_path / "rec.csv"
+    times = np.arange(50000) * 0.01
+    values = np.sin(times)
+    values[-1] = 10.0
+    writer = recording.RecordingWriter(str(path))
+    writer.write_rows(zip(times.tolist(), values.tolist()))
+    writer.close()
+
+    _, dec_times, dec_values = recording.load_decimated(str(path), 1000, chunk_bytes=64 * 1024)
+    assert len(dec_times) <= 1000
+    assert dec_times[-1] == pytest.approx(times[-1])
+    assert dec_values.max() == pytest.approx(10.0)
+
+
+def write_recording(path, times, values):
+    writer = recording.RecordingWriter(str(path), columns=True)
+    writer.write_rows(zip(times.tolist(), values.tolist()))
+    return writer
+
+
+def read_all(path, chunk_bytes=64 * 1024):
+    parts = list(recording.iter_chunks(str(path), chunk_bytes))
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def test_column_cache_matches_csv(tmp_path):
+    path = tmp_path / "rec.csv"
+    times = np.round(np.arange(30000) * 0.01, 3)
+    values = np.round(np.sin(times) * 1000, 2)
+    write_recording(path, times, values).close()
+    assert recording.load_columns_header(str(path)) == (30000, path.stat().st_size)
+
+    cached = read_all(path)
+    parsed = recording.parse_block(path.read_bytes())
+    assert np.array_equal(cached[0], parsed[0]) and np.array_equal(cached[1], parsed[1])
+    assert np.array_equal(cached[0], times)
+
+
+def test_column_cache_is_opt_in(tmp_path):
+    path = tmp_path / "rec.csv"
+    write_recording(path, np.arange(100.0), np.zeros(100)).close()
+    writer = recording.RecordingWriter(str(path))
+    writer.write_rows([(0.0, 1.0), (1.0, 2.0)])
+    writer.close()
+    # Копия от прежней записи с тем же именем удаляется
+    assert not os.path.exists(recording.columns_path(str(path)))
+    assert read_all(path)[1].tolist() == [1.0, 2.0]
+
+
+def test_rows_after_column_cache_are_parsed_from_csv(tmp_path):
+    path = tmp_path / "rec.csv"
+    times = np.arange(1000) * 0.5
+    writer = write_recording(path, times, times)
+    writer.close()
+    # Строки, дописанные в CSV помимо RecordingWriter (например, после сбоя)
+    with open(path, "a") as f:
+        f.write("500.0,1.0\n500.5,2.0\n")
+    read_times, read_values = read_all(path, chunk_bytes=4096)
+    assert len(read_times) == 1002
+    assert read_values[-2:].tolist() == [1.0, 2.0]
+
+
+def test_replaced_csv_ignores_column_cache(tmp_path):
+    path = tmp_path / "rec.csv"
+    write_recording(path, np.arange(100.0), np.zeros(100)).close()
+    path.write_text(recording.CSV_HEADER + "".join(f"{t},{t}\n" for t in range(200, 300)))
+    assert recording.load_columns_header(str(path)) is None
+    read_times, _ = read_all(path)
+    assert read_times[0] == 200
+
+
+def test_built_index_matches_writer_index(tmp_path, monkeypatch):
+    path = tmp_path / "rec.csv"
+    times = np.round(np.arange(5000) * 0.01, 3)
+    writer = recording.RecordingWriter(str(path), stride=100)
+    writer.write_rows(zip(times.tolist(), times.tolist()))
+    writer.close()
+    written = recording.RecordingIndex.load(str(path))
+    assert written is not None and len(written.entries) == 50
+
+    os.remove(recording.index_path(str(path)))
+    # Маленькие блоки проверяют строки на границе блоков
+    monkeypatch.setattr(recording, "SCAN_CHUNK_SIZE", 777)
+    built = recording.RecordingIndex.build(str(path), stride=100)
+    assert np.array_equal(built.entries, written.entries)
+    assert os.path.exists(recording.index_path(str(path)))
+
+
+@pytest.mark.parametrize("t0, t1", [(-1.0, 3.0), (0.0, 0.0), (12.345, 20.0), (49.0, 100.0), (20.0, 10.0)])
+def test_byte_range_covers_interval(tmp_path, t0, t1):
+    path = tmp_path / "rec.csv"
+    times = np.round(np.arange(5000) * 0.01, 3)
+    writer = recording.RecordingWriter(str(path), stride=64)
+    writer.write_rows(zip(times.tolist(), times.tolist()))
+    writer.close()
+    index = recording.RecordingIndex.load(str(path))
+
+    start, end = index.byte_range(t0, t1)
+    read_times, _ = recording.parse_block(recording.read_byte_range(str(path), start, end))
+    expected = times[(times >= t0) & (times <= t1)]
+    assert set(expected.tolist()) <= set(read_times.tolist())
+    # Диапазон ограничен соседними записями индекса, а не всем файлом
+    assert len(read_times) <= len(expected) + 2 * index.stride
+
+
+def test_matches_file_detects_replaced_recording(tmp_path):
+    path = tmp_path / "rec.csv"
+    write_recording(path, np.arange(3000.0), np.zeros(3000)).close()
+    index = recording.RecordingIndex.load(str(path))
+    assert index.matches_file()
+
+    path.write_text(recording.CSV_HEADER + "".join(f"{t + 0.5},0\n" for t in range(3000)))
+    assert not index.matches_file()
+    path.write_text(recording.CSV_HEADER + "0,0\n")
+    assert not index.matches_file()
+
+
+def test_stale_index_is_rebuilt(tmp_path):
+    path = tmp_path / "rec.csv"
+    write_recording(path, np.arange(3000.0), np.zeros(3000)).close()
+    path.write_text(recording.CSV_HEADER + "".join(f"{t},{t}\n" for t in range(5000, 8000)))
+    assert recording.RecordingIndex.load(str(path)) is None
+
+    index = recording.RecordingIndex.load_or_build(str(path))
+    assert index.entries["time"][0] == 5000
+    assert index.matches_file()
+    # Перестроенный индекс сохранен и подходит к новому файлу
+    assert recording.RecordingIndex.load(str(path)) is not None
@@ -0,0 +1,121 @@
+import os
+import threading
+import uuid
+
+import numpy as np
+import pytest
+
+import sample_bus
+from sample_bus import SampleBusReader, SampleBusWriter
+
+
+@pytest.fixture
+def bus():
+    writer = SampleBusWriter(f"svbus_test_{uuid.uuid4().hex[:12]}", capacity=16)
+    yield writer
+    writer.close()
+
+
+def publish_range(writer, start, stop):
+    # Время отсчета равно его порядковому номеру, чтобы проверять целостность
+    seqs = np.arange(start, stop, dtype=np.float64)
+    writer.publish(seqs, -seqs)
+
+
+def test_wrap_around(bus):
+    reader = SampleBusReader(bus.name)
+    try:
+        publish_range(bus, 0, 10)
+        times, voltages, lost = reader.read()
+        assert times.tolist() == list(range(10))
+        assert lost == 0
+
+        # Следующая пачка пересекает границу кольца
+        publish_range(bus, 10, 22)
+        times, voltages, lost = reader.read()
+        assert times.tolist() == list(range(10, 22))
+        assert voltages.tolist() == [-t for t in range(10, 22)]
+        assert lost == 0
+    finally:
+        reader.close()
+
+
+def test_reader_lagging_past_capacity(bus):
+    reader = SampleBusReader(bus.name)
+    try:
+        publish_range(bus, 0, 40)
+        times, _, lost = reader.read()
+        assert lost == 40 - bus.capacity
+        assert times.tolist() == list(range(40 - bus.capacity, 40))
+    finally:
+        reader.close()
+
+
+def test_overwrite_during_copy_is_reported_as_lost(bus, monkeypatch):
+    reader = SampleBusReader(bus.name)
+    try:
+        publish_range(bus, 0, 16)
+        copy = reader._copy
+
+        def copy_while_writer_starts_next_batch(seq, count):
+            # Писатель объявил следующую пачку и затирает первые слоты, пока читатель копирует
+            bus.header[sample_bus.BEGIN_WORD] = 18
+            bus.times[:2] = [16, 17]
+            return copy(seq, count)
+
+        monkeypatch.setattr(reader, "_copy", copy_while_writer_starts_next_batch)
+        times, _, lost = reader.read()
+        assert lost == 2
+        assert times.tolist() == list(range(2, 16))
+    finally:
+        reader.close()
+
+
+def test_concurrent_writer(bus):
+    reader = SampleBusReader(bus.name)
+    total = 20000
+    stop = threading.Event()
+
+    def write():
+        seq = 0
+        while seq < total:
+            size = 1 + seq % 7
+            publish_range(bus, seq, seq + size)
+            seq += size
+        stop.set()
+
+    writer_thread = threading.Thread(target=write)
+    writer_thread.start()
+    expected = 0
+    try:
+        while not stop.is_set() or reader.next_seq < bus.write_seq:
+            times, voltages, lost = reader.read()
+            expected += lost
+            assert times.tolist() == list(range(expected, expected + len(times)))
+            assert np.array_equal(voltages, -times)
+            expected += len(times)
+    finally:
+        writer_thread.join()
+        reader.close()
+    assert expected == bus.write_seq
+
+
+def test_live_segment_is_not_replaced(bus):
+    with pytest.raises(FileExistsError):
+        SampleBusWriter(bus.name, capacity=16)
+    # Исходный писатель продолжает работать
+    publish_range(bus, 0, 3)
+    assert bus.write_seq == 3
+
+
+def test_stale_segment_is_replaced(monkeypatch):
+    name = f"svbus_test_{uuid.uuid4().hex[:12]}"
+    crashed = SampleBusWriter(name, capacity=16)
+    publish_range(crashed, 0, 5)
+    # Писатель "упал", не вызвав close(); его процесса больше нет
+    monkeypatch.setattr(sample_bus, "_process_alive", lambda pid: False)
+    replacement = SampleBusWriter(name, capacity=16)
+    try:
+        assert replacement.write_seq == 0
+    finally:
+        replacement.close()
@@ -0,0 +1,90 @@
+import socket
+import time
+
+import numpy as np
+import pytest
+
+import stream_client
+import stream_server
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("условие не выполнилось за отведенное время")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def server():
+    server = stream_server.SampleStreamServer(("127.0.0.1", 0), max_queue_frames=4)
+    server.start()
+    yield server
+    server.stop()
+
+
+def connect(server):
+    sock = socket.create_connection(server.listener.getsockname())
+    sock.settimeout(5.0)
+    return sock
+
+
+def batch(start, count):
+    return [(t * 0.01, t * 0.5) for t in range(start, start + count)]
+
+
+def test_frames_round_trip(server):
+    sock = connect(server)
+    wait_for(lambda: server.stats()["clients"] == 1)
+    server.publish(batch(0, 3))
+    server.publish(batch(3, 1000))
+
+    frames = stream_client.iter_frames(sock)
+    seq, published, samples = next(frames)
+    assert seq == 0 and len(samples) == 3
+    assert abs(time.time() - published) < 5
+    seq, _, samples = next(frames)
+    assert seq == 3
+    assert np.allclose(samples["time"], np.arange(3, 1003) * 0.01)
+    assert np.allclose(samples["voltage"], np.arange(3, 1003) * 0.5)
+    sock.close()
+
+
+def test_slow_client_loses_oldest_frames(server):
+    sock = connect(server)
+    wait_for(lambda: server.stats()["clients"] == 1)
+    # Клиент не читает: буферы сокета заполняются, очередь из 4 кадров вытесняет старые
+    started = time.perf_counter()
+    for i in range(200):
+        server.publish(batch(i * 10000, 10000))
+    assert time.perf_counter() - started < 5  # publish не ждет клиента
+    wait_for(lambda: server.stats()["frames_dropped"] > 0)
+
+    seqs = []
+    for seq, _, samples in stream_client.iter_frames(sock):
+        assert len(samples) == 10000
+        seqs.append(seq)
+        if seq == 199 * 10000:
+            break
+    assert seqs == sorted(seqs)
+    # Дошли все кадры, кроме вытесненных из очереди
+    assert len(seqs) + server.stats()["frames_dropped"] == 200
+    sock.close()
+
+
+def test_client_reconnects(server):
+    first = connect(server)
+    wait_for(lambda: server.stats()["clients"] == 1)
+    server.publish(batch(0, 10))
+    assert next(stream_client.iter_frames(first))[0] == 0
+    first.close()
+    wait_for(lambda: server.stats()["clients"] == 0)
+
+    server.publish(batch(10, 10))  # Без подписчиков кадр не строится, но номер растет
+    second = connect(server)
+    wait_for(lambda: server.stats()["clients"] == 1)
+    server.publish(batch(20, 10))
+    seq, _, samples = next(stream_client.iter_frames(second))
+    assert seq == 20 and samples["time"][0] == pytest.approx(0.2)
+    second.close()